@@ -1,71 +1,271 @@
-from typing import Dict, List
+import copy
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
 
 from custom_dataclasses import Meta, Node, RoutingNode, RoutingEdge, Edge
 
+# Bit-Flags der kompilierten Kanten (csr_flags)
+EDGE_FLOOR_TRANSITION = 1
+EDGE_STAIRS = 2
+EDGE_ELEVATOR = 4
+EDGE_ACCESSIBLE = 8
+EDGE_LEVEL_CHANGE = 16  # Endpunkte auf unterschiedlichen Levels
+
+# Routing-Profile: welche Kanten (nach Flags) ein Profil benutzen darf
+PROFILES: Dict[str, Callable[[int], bool]] = {
+    "default": lambda f: True,
+    # Rollstuhl: nur barrierefreie Kanten, keine Treppen
+    "accessible": lambda f: bool(f & EDGE_ACCESSIBLE) and not f & EDGE_STAIRS,
+    # Etagenwechsel nur über Treppen
+    "stairs_only": lambda f: not f & EDGE_ELEVATOR and (
+        not f & EDGE_LEVEL_CHANGE or bool(f & EDGE_STAIRS)),
+    "no_elevator": lambda f: not f & EDGE_ELEVATOR,
+}
+
 
 class BuildingGraph:
     def __init__(self, meta: Meta,
-                 nodes: Dict[str, Node],
-                 edges: List[Edge]):
+                 nodes: Optional[Dict[str, Node]],
+                 edges: Optional[List[Edge]]):
         self.meta = meta
-        self.raw_nodes = nodes
-        self.raw_edges = edges
+        self._raw_nodes = nodes
+        self._raw_edges = edges
+        # Lädt (raw_nodes, raw_edges) nach, falls sie nicht mitgegeben wurden
+        self._raw_loader: Optional[Callable[[], Tuple[Dict[str, Node], List[Edge]]]] = None
 
         # Filled after compile_for_routing()
-        self.routing_nodes: List[RoutingNode] = []
+        self._routing_nodes: Optional[List[RoutingNode]] = []
         self.routing_edges: List[List[RoutingEdge]] = []
+        self.node_ids: List[str] = []
         self.node_index: Dict[str, int] = {}
         self.level_index: Dict[int, List[int]] = {}
 
+        # CSR-Adjazenz: Kanten von Knoten i liegen in den Slots
+        # csr_offsets[i] .. csr_offsets[i + 1] - 1
+        self.csr_offsets = array("l")
+        self.csr_targets = array("l")
+        self.csr_weights = array("d")
+        self.csr_flags = array("B")
+        self.node_levels = array("l")
+        # Positionen als gepackte Floats (x, y, z pro Knoten; NaN ohne pos)
+        self.node_pos = array("d")
+
+        # Vorberechnete ALT-Tabellen, pro Gewichtskonfiguration
+        # (siehe RoutingModel.prepare_landmarks)
+        self.landmark_tables: Dict[tuple, object] = {}
+
+        # Gefilterte Profil-Sichten (siehe profile()), teilen die Knotendaten
+        self.profile_name = "default"
+        self._profile_views: Dict[str, "BuildingGraph"] = {}
+
         self.compiled = False
+        self.compact = False
+        # Wird bei jeder Änderung der kompilierten Struktur erhöht
+        # (z.B. für Caches, die davon abgeleitet sind)
+        self.version = 0
+
+    # ----------------- Rohdaten (ggf. nachgeladen) -----------------
+
+    @property
+    def raw_nodes(self) -> Dict[str, Node]:
+        if self._raw_nodes is None and self._raw_loader is not None:
+            self._load_raw()
+        return self._raw_nodes
+
+    @raw_nodes.setter
+    def raw_nodes(self, nodes: Dict[str, Node]):
+        self._raw_nodes = nodes
+
+    @property
+    def raw_edges(self) -> List[Edge]:
+        if self._raw_edges is None and self._raw_loader is not None:
+            self._load_raw()
+        return self._raw_edges
 
-    def compile_for_routing(self):
+    @raw_edges.setter
+    def raw_edges(self, edges: List[Edge]):
+        self._raw_edges = edges
+
+    def _load_raw(self):
+        self._raw_nodes, self._raw_edges = self._raw_loader()
+
+    @property
+    def routing_nodes(self) -> List[RoutingNode]:
+        # Graphen aus dem Binär-Cache erzeugen die Objekte erst bei Bedarf
+        if self._routing_nodes is None:
+            pos = self.node_pos
+            self._routing_nodes = [
+                RoutingNode(id=nid, level=self.node_levels[i],
+                            pos=tuple(pos[3 * i:3 * i + 3]) if pos[3 * i] == pos[3 * i] else None)
+                for i, nid in enumerate(self.node_ids)
+            ]
+        return self._routing_nodes
+
+    @routing_nodes.setter
+    def routing_nodes(self, nodes: Optional[List[RoutingNode]]):
+        self._routing_nodes = nodes
+
+    def compile_for_routing(self, compact: bool = False):
+        """
+        Kompiliert den Graphen für die Suche.
+        Die CSR-Arrays werden immer aufgebaut; mit compact=True entfallen
+        die RoutingEdge-Listen und neighbors() erzeugt sie bei Bedarf.
+        """
         # stable ordering
         all_ids = list(self.raw_nodes.keys())
-        self.node_index = {nid: i for i, nid in enumerate(all_ids)}
+        node_index = {nid: i for i, nid in enumerate(all_ids)}
 
-        # Compile nodes
-        self.routing_nodes = []
-        self.level_index = {}
+        nan = float("nan")
+        levels = array("l")
+        pos = array("d")
         for nid in all_ids:
             n = self.raw_nodes[nid]
-            idx = self.node_index[nid]
-            rn = RoutingNode(id=n.id, level=n.level, pos=n.pos)
-            self.routing_nodes.append(rn)
+            levels.append(n.level)
+            pos.extend(n.pos if n.pos else (nan, nan, nan))
+
+        # Kanten einmal auflösen (Indizes + gepackte Flags)
+        edge_a, edge_b = array("l"), array("l")
+        edge_w, edge_f = array("d"), array("B")
+        for e in self.raw_edges:
+            edge_a.append(node_index[e.a])
+            edge_b.append(node_index[e.b])
+            edge_w.append(e.weight)
+            edge_f.append(_pack_edge_flags(e.attrs))
 
-            self.level_index.setdefault(n.level, []).append(idx)
+        self.compile_from_arrays(all_ids, levels, pos, edge_a, edge_b, edge_w, edge_f,
+                                 compact=compact, node_index=node_index)
 
-        # adjacency
-        n = len(self.routing_nodes)
-        self.routing_edges = [[] for _ in range(n)]
+    def compile_from_arrays(self, node_ids: List[str], levels: array, pos: array,
+                            edge_a: array, edge_b: array, edge_w: array, edge_f: array,
+                            compact: bool = False,
+                            node_index: Optional[Dict[str, int]] = None):
+        """
+        Kompiliert aus bereits aufgelösten Arrays (Knoten in Indexreihenfolge,
+        Kanten als Endpunkt-Indizes, Gewichte und gepackte Flags), ohne
+        raw_nodes/raw_edges zu benutzen (siehe stream_loader.py).
+        """
+        n = len(node_ids)
+        self.node_ids = node_ids
+        self.node_index = node_index if node_index is not None else {
+            nid: i for i, nid in enumerate(node_ids)}
+        self.node_levels = levels
+        self.node_pos = pos
 
-        # Compile edges
-        for e in self.raw_edges:
-            ai = self.node_index[e.a]
-            bi = self.node_index[e.b]
-
-            flags = {
-                "is_floor_transition": bool(e.attrs.get("floor_transition", False)),
-                "is_stairs": bool(e.attrs.get("stairs", False)),
-                "is_elevator": bool(
-                    e.attrs.get("elevator_enter", False)
-                    or e.attrs.get("elevator_exit", False)
-                    or e.attrs.get("elevator_move", False)
-                ),
-                "accessible": bool(e.attrs.get("accessible", True)),
-            }
-
-            ra = RoutingEdge(
-                target=bi, weight=e.weight, **flags
-            )
-            rb = RoutingEdge(
-                target=ai, weight=e.weight, **flags
-            )
-
-            self.routing_edges[ai].append(ra)
-            self.routing_edges[bi].append(rb)
+        self.level_index = {}
+        for idx, lvl in enumerate(levels):
+            self.level_index.setdefault(lvl, []).append(idx)
+
+        if compact:
+            # RoutingNode-Objekte erst bei Zugriff (siehe routing_nodes)
+            self.routing_nodes = None
+        else:
+            self.routing_nodes = []
+            for idx, nid in enumerate(node_ids):
+                p = tuple(pos[3 * idx:3 * idx + 3])
+                self.routing_nodes.append(RoutingNode(id=nid, level=levels[idx],
+                                                      pos=p if p[0] == p[0] else None))
+
+        degree = array("l", [0]) * n
+        for ai in edge_a:
+            degree[ai] += 1
+        for bi in edge_b:
+            degree[bi] += 1
+
+        # CSR: Offsets aus den Knotengraden, dann Slots in Kantenreihenfolge
+        # füllen (gleiche Nachbarreihenfolge wie die RoutingEdge-Listen)
+        offsets = array("l", [0]) * (n + 1)
+        for i in range(n):
+            offsets[i + 1] = offsets[i] + degree[i]
+        m = offsets[n]
+        targets = array("l", [0]) * m
+        weights = array("d", [0.0]) * m
+        flags = array("B", [0]) * m
+        cursor = array("l", offsets[:n])
+        for ai, bi, w, f in zip(edge_a, edge_b, edge_w, edge_f):
+            if levels[ai] != levels[bi]:
+                f |= EDGE_LEVEL_CHANGE
+            for fr, to in ((ai, bi), (bi, ai)):
+                slot = cursor[fr]
+                targets[slot] = to
+                weights[slot] = w
+                flags[slot] = f
+                cursor[fr] = slot + 1
+
+        self.csr_offsets = offsets
+        self.csr_targets = targets
+        self.csr_weights = weights
+        self.csr_flags = flags
 
+        # Objekt-Adjazenz nur im nicht-kompakten Modus
+        if compact:
+            self.routing_edges = []
+        else:
+            self.routing_edges = [
+                [self._edge_at(slot) for slot in range(offsets[i], offsets[i + 1])]
+                for i in range(n)
+            ]
+
+        self.landmark_tables = {}
+        self._profile_views = {}
+        self.compact = compact
         self.compiled = True
+        self.version += 1
+
+    def profile(self, name: str) -> "BuildingGraph":
+        """
+        Kompilierte Sicht für ein Routing-Profil (siehe PROFILES).
+
+        Die Sicht hat eine eigene, gefilterte CSR-Adjazenz, teilt aber
+        Knoten, Indizes und Positionen mit diesem Graphen. Sie verhält sich
+        wie ein kompakt kompilierter BuildingGraph, RoutingModel und alle
+        Suchen laufen unverändert darauf; Vorberechnungen (z.B. Landmarks)
+        werden pro Sicht gecacht.
+        """
+        if name == self.profile_name:
+            return self
+        if name not in PROFILES:
+            raise ValueError(f"Unknown routing profile: {name}")
+        view = self._profile_views.get(name)
+        if view is None:
+            view = self._filtered_view(name, PROFILES[name])
+            self._profile_views[name] = view
+        return view
+
+    def _filtered_view(self, name: str, keep: Callable[[int], bool]) -> "BuildingGraph":
+        view = copy.copy(self)
+        n = self.num_nodes()
+        offsets = array("l", [0]) * (n + 1)
+        targets, weights, flags = array("l"), array("d"), array("B")
+        for i in range(n):
+            for slot in self.edge_slots(i):
+                f = self.csr_flags[slot]
+                if keep(f):
+                    targets.append(self.csr_targets[slot])
+                    weights.append(self.csr_weights[slot])
+                    flags.append(f)
+            offsets[i + 1] = len(targets)
+
+        view.csr_offsets = offsets
+        view.csr_targets = targets
+        view.csr_weights = weights
+        view.csr_flags = flags
+        view.routing_edges = []
+        view.compact = True
+        view.profile_name = name
+        view.landmark_tables = {}
+        view._profile_views = {}
+        return view
+
+    def _edge_at(self, slot: int) -> RoutingEdge:
+        f = self.csr_flags[slot]
+        return RoutingEdge(
+            target=self.csr_targets[slot],
+            weight=self.csr_weights[slot],
+            is_floor_transition=bool(f & EDGE_FLOOR_TRANSITION),
+            is_stairs=bool(f & EDGE_STAIRS),
+            is_elevator=bool(f & EDGE_ELEVATOR),
+            accessible=bool(f & EDGE_ACCESSIBLE),
+        )
 
     # ----------------- Helpers -----------------
 
@@ -73,40 +273,68 @@ class BuildingGraph:
         return self.node_index[node_id]
 
     def id(self, idx: int) -> str:
-        return self.routing_nodes[idx].id
+        return self.node_ids[idx]
 
     def neighbors(self, idx: int) -> List[RoutingEdge]:
+        if self.compact:
+            return [self._edge_at(slot) for slot in self.edge_slots(idx)]
         return self.routing_edges[idx]
 
+    def edge_slots(self, idx: int) -> range:
+        """CSR-Slots der ausgehenden Kanten von idx (für die Hot Loops)."""
+        return range(self.csr_offsets[idx], self.csr_offsets[idx + 1])
+
+    def num_nodes(self) -> int:
+        return len(self.node_levels)
+
+    def num_edges(self) -> int:
+        """Anzahl ungerichteter Kanten."""
+        return len(self.csr_targets) // 2
+
     # ----------------- Layer-specific helpers -----------------
 
     def nodes_on_level(self, level: int) -> List[int]:
         return self.level_index.get(level, [])
 
     def vertical_edges_from(self, idx: int) -> List[RoutingEdge]:
-        lvl = self.routing_nodes[idx].level
+        lvl = self.node_levels[idx]
         return [
-            e for e in self.routing_edges[idx]
-            if self.routing_nodes[e.target].level != lvl
+            e for e in self.neighbors(idx)
+            if self.node_levels[e.target] != lvl
         ]
 
     def intralevel_edges_from(self, idx: int) -> List[RoutingEdge]:
-        lvl = self.routing_nodes[idx].level
+        lvl = self.node_levels[idx]
         return [
-            e for e in self.routing_edges[idx]
-            if self.routing_nodes[e.target].level == lvl
+            e for e in self.neighbors(idx)
+            if self.node_levels[e.target] == lvl
         ]
 
     def visualize_ascii(self):
         print("=== ASCII Building Graph View ===")
         print(f"Building: {self.meta.building_name}")
-        print(f"Nodes: {len(self.routing_nodes)}")
-        print(f"Edges: {sum(len(lst) for lst in self.routing_edges) // 2}")
+        print(f"Nodes: {self.num_nodes()}")
+        print(f"Edges: {self.num_edges()}")
         print("----------------------------------")
 
         for idx, node in enumerate(self.routing_nodes):
             print(f"[{idx}] {node.id} (level={node.level}, pos={node.pos})")
-            for e in self.routing_edges[idx]:
+            for e in self.neighbors(idx):
                 target_name = self.routing_nodes[e.target].id
                 print(f"     -> {target_name} (w={e.weight})")
-        print("----------------------------------")
\ No newline at end of file
+        print("----------------------------------")
+
+
+def _pack_edge_flags(attrs) -> int:
+    f = 0
+    if attrs.get("floor_transition", False):
+        f |= EDGE_FLOOR_TRANSITION
+    if attrs.get("stairs", False):
+        f |= EDGE_STAIRS
+    if (attrs.get("elevator_enter", False)
+            or attrs.get("elevator_exit", False)
+            or attrs.get("elevator_move", False)):
+        f |= EDGE_ELEVATOR
+    if attrs.get("accessible", True):
+        f |= EDGE_ACCESSIBLE
+    return f
@@ -0,0 +1,207 @@
+import time
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Set, Tuple
+
+from BuildingGraph import BuildingGraph, EDGE_ELEVATOR, EDGE_LEVEL_CHANGE, EDGE_STAIRS
+from RoutingModel import RoutingModel
+
+INF = float("inf")
+
+
+class ContractionHierarchy:
+    """
+    Contraction Hierarchy auf dem kompilierten Graphen (Gewichte aus RoutingModel).
+
+    Vorverarbeitung: Knoten werden nach Priorität (Kanten-Differenz +
+    kontrahierte Nachbarn) kontrahiert; Übergangsknoten (Treppen, Aufzüge,
+    Etagenwechsel) bekommen einen Bonus und landen dadurch spät in der
+    Ordnung. Für jeden kontrahierten Knoten v wird ein Shortcut u–x angelegt,
+    falls keine Witness-Route u→x ohne v existiert, die höchstens so lang ist.
+
+    Anfrage: bidirektionaler Dijkstra nur über Kanten zu höherem Rang,
+    anschließend rekursives Entpacken der Shortcuts in Originalknoten.
+    """
+
+    def __init__(self, graph: BuildingGraph, model: RoutingModel,
+                 late_bonus: float = 10.0, witness_settle_limit: int = 64):
+        self.g = graph
+        self.weights_key = model.weights_key()
+        self.late_bonus = late_bonus
+        self.witness_settle_limit = witness_settle_limit
+
+        n = graph.num_nodes()
+        self.rank: List[int] = [0] * n
+        # Kanten zu höher gerankten Knoten (Original + Shortcuts)
+        self.up: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+        # Shortcut (u, x) -> kontrahierter Mittelknoten
+        self._middle: Dict[Tuple[int, int], int] = {}
+
+        self.n_shortcuts = 0
+        t0 = time.perf_counter()
+        self._build(model.weights)
+        self.preprocess_s = time.perf_counter() - t0
+
+    # ----------------- Vorverarbeitung -----------------
+
+    def _build(self, weights):
+        g = self.g
+        n = g.num_nodes()
+        adj: List[Dict[int, float]] = [{} for _ in range(n)]
+        late: Set[int] = set()
+        transition_flags = EDGE_LEVEL_CHANGE | EDGE_STAIRS | EDGE_ELEVATOR
+        for u in range(n):
+            for slot in g.edge_slots(u):
+                v = g.csr_targets[slot]
+                if v == u:
+                    continue
+                w = weights[slot]
+                if w < adj[u].get(v, INF):
+                    adj[u][v] = w
+                if g.csr_flags[slot] & transition_flags:
+                    late.add(u)
+
+        deleted = [0] * n
+
+        def priority(v: int) -> float:
+            shortcuts = self._shortcuts_for(adj, v)
+            p = len(shortcuts) - len(adj[v]) + deleted[v]
+            return p + self.late_bonus if v in late else p
+
+        heap = [(priority(v), v) for v in range(n)]
+        heap.sort()
+        order = 0
+        while heap:
+            _, v = heappop(heap)
+            # Lazy Update: Priorität neu berechnen, ggf. zurücklegen
+            p = priority(v)
+            if heap and p > heap[0][0]:
+                heappush(heap, (p, v))
+                continue
+
+            for u, x, w in self._shortcuts_for(adj, v):
+                if w < adj[u].get(x, INF):
+                    if x not in adj[u]:
+                        self.n_shortcuts += 1
+                    adj[u][x] = w
+                    adj[x][u] = w
+                    self._middle[(u, x)] = v
+                    self._middle[(x, u)] = v
+
+            self.rank[v] = order
+            order += 1
+            self.up[v] = list(adj[v].items())
+            for u in adj[v]:
+                del adj[u][v]
+                deleted[u] += 1
+            adj[v] = {}
+
+    def _shortcuts_for(self, adj: List[Dict[int, float]], v: int) -> List[Tuple[int, int, float]]:
+        nbrs = list(adj[v].items())
+        result = []
+        for i, (u, w_uv) in enumerate(nbrs):
+            rest = nbrs[i + 1:]
+            if not rest:
+                continue
+            limit = w_uv + max(w for _, w in rest)
+            dist = self._witness_search(adj, u, v, limit)
+            for x, w_vx in rest:
+                via = w_uv + w_vx
+                if dist.get(x, INF) > via:
+                    result.append((u, x, via))
+        return result
+
+    def _witness_search(self, adj: List[Dict[int, float]], source: int,
+                        skip: int, limit: float) -> Dict[int, float]:
+        """Begrenzter Dijkstra ohne den zu kontrahierenden Knoten."""
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        settled = 0
+        while heap and settled < self.witness_settle_limit:
+            d, u = heappop(heap)
+            if d > dist[u]:
+                continue
+            if d > limit:
+                break
+            settled += 1
+            for x, w in adj[u].items():
+                if x == skip:
+                    continue
+                nd = d + w
+                if nd < dist.get(x, INF):
+                    dist[x] = nd
+                    heappush(heap, (nd, x))
+        return dist
+
+    # ----------------- Anfrage -----------------
+
+    def query(self, model: RoutingModel, start_id: str,
+              goal_id: str) -> Tuple[Optional[List[str]], Optional[float], float]:
+        """Gleiche Signatur/Rückgabe wie layered_a_star: (Pfad-IDs, Kosten, Zeit)."""
+        if model.weights_key() != self.weights_key:
+            raise RuntimeError("RoutingModel weights changed; rebuild the hierarchy.")
+        start_time = time.perf_counter()
+        s, t = self.g.idx(start_id), self.g.idx(goal_id)
+        cost, path = self.query_idx(s, t)
+        if path is None:
+            return None, None, time.perf_counter() - start_time
+        return [self.g.id(i) for i in path], cost, time.perf_counter() - start_time
+
+    def query_idx(self, s: int, t: int) -> Tuple[Optional[float], Optional[List[int]]]:
+        dist = ({s: 0.0}, {t: 0.0})
+        parent = ({s: -1}, {t: -1})
+        heaps = ([(0.0, s)], [(0.0, t)])
+        best, meet = (0.0, s) if s == t else (INF, -1)
+        up = self.up
+
+        while heaps[0] or heaps[1]:
+            for side in (0, 1):
+                heap = heaps[side]
+                if not heap:
+                    continue
+                d, u = heappop(heap)
+                if d > dist[side][u]:
+                    continue
+                if d >= best:
+                    # Diese Richtung kann den besten Pfad nicht mehr verbessern
+                    heap.clear()
+                    continue
+                other = dist[1 - side].get(u)
+                if other is not None and d + other < best:
+                    best, meet = d + other, u
+                for x, w in up[u]:
+                    nd = d + w
+                    if nd < dist[side].get(x, INF):
+                        dist[side][x] = nd
+                        parent[side][x] = u
+                        heappush(heap, (nd, x))
+
+        if meet == -1:
+            return None, None
+
+        # Hochpfade s -> meet und meet -> t
+        fwd = []
+        v = meet
+        while v != -1:
+            fwd.append(v)
+            v = parent[0][v]
+        fwd.reverse()
+        v = parent[1][meet]
+        while v != -1:
+            fwd.append(v)
+            v = parent[1][v]
+        return best, self._unpack(fwd)
+
+    def _unpack(self, path: List[int]) -> List[int]:
+        result = [path[0]]
+        for a, b in zip(path, path[1:]):
+            stack = [(a, b)]
+            while stack:
+                u, x = stack.pop()
+                mid = self._middle.get((u, x))
+                if mid is None:
+                    result.append(x)
+                else:
+                    # Zweite Hälfte zuerst auf den Stack (LIFO)
+                    stack.append((mid, x))
+                    stack.append((u, mid))
+        return result
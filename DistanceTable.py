@@ -0,0 +1,201 @@
+import argparse
+import hashlib
+import struct
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+
+from BuildingGraph import BuildingGraph
+from RoutingModel import RoutingModel
+
+# Dateiformat (little endian):
+#   Header (HEADER_SIZE Bytes): Magic, Version, |V|, Distanz-Typ, Skalierung,
+#                               SHA-256 über Graph + Gewichte
+#   Distanzmatrix  [|V| x |V|]  float32 oder uint16 (quantisiert)
+#   Next-Hop-Matrix [|V| x |V|] int32, zeilenweise pro Ziel:
+#                               next_hop[t, u] = nächster Knoten von u Richtung t
+MAGIC = b"BGAPSP"
+VERSION = 1
+HEADER = struct.Struct("<6sHIBxxxd32s")
+HEADER_SIZE = 64
+
+DIST_FLOAT32 = 0
+DIST_UINT16 = 1
+UINT16_INF = np.iinfo(np.uint16).max
+
+
+def graph_fingerprint(graph: BuildingGraph, weights) -> bytes:
+    """SHA-256 über Knoten-IDs, CSR-Topologie und effektive Gewichte."""
+    h = hashlib.sha256()
+    for nid in graph.node_ids:
+        h.update(nid.encode("utf8"))
+        h.update(b"\0")
+    h.update(bytes(graph.csr_offsets))
+    h.update(bytes(graph.csr_targets))
+    h.update(np.asarray(weights, dtype=np.float64).tobytes())
+    return h.digest()
+
+
+def _to_scipy(graph: BuildingGraph, weights) -> csr_matrix:
+    n = graph.num_nodes()
+    rows = np.repeat(np.arange(n), np.diff(np.asarray(graph.csr_offsets)))
+    cols = np.asarray(graph.csr_targets)
+    w = np.asarray(weights, dtype=np.float64)
+    # Parallele Kanten: nur das Minimum behalten (csr_matrix würde summieren)
+    order = np.lexsort((w, cols, rows))
+    rows, cols, w = rows[order], cols[order], w[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    return csr_matrix((w[first], (rows[first], cols[first])), shape=(n, n))
+
+
+# --------------------------------------------------------
+# Offline-Pipeline
+# --------------------------------------------------------
+
+def build_distance_table(graph: BuildingGraph, model: RoutingModel, path: str,
+                         quantize: bool = False, chunk: int = 256) -> float:
+    """
+    Berechnet Distanz- und Next-Hop-Matrix für alle Paare und schreibt sie
+    direkt (chunkweise) in eine memory-mapbare Datei. Gibt die Laufzeit (s) zurück.
+
+    Der Graph ist ungerichtet mit symmetrischen Gewichten, daher liefert der
+    Vorgängerbaum ab t für jeden Knoten u direkt den nächsten Schritt u -> t.
+    """
+    t0 = time.perf_counter()
+    n = graph.num_nodes()
+    if n >= np.iinfo(np.int32).max:
+        raise ValueError("Graph too large for int32 next-hop table.")
+    adj = _to_scipy(graph, model.weights)
+    dist_dtype = np.uint16 if quantize else np.float32
+    dist_bytes = n * n * np.dtype(dist_dtype).itemsize
+    table_bytes = HEADER_SIZE + dist_bytes + n * n * 4
+    # Quantisiert: float32-Distanzen zunächst in einen Zwischenbereich hinter
+    # den Tabellen, das Maximum (-> Skalierung) fällt im selben Durchlauf ab
+    scratch_bytes = n * n * 4 if quantize else 0
+    with open(path, "wb") as f:
+        f.truncate(table_bytes + scratch_bytes)
+
+    dist_mm = np.memmap(path, dtype=dist_dtype, mode="r+", offset=HEADER_SIZE, shape=(n, n))
+    nh_mm = np.memmap(path, dtype=np.int32, mode="r+",
+                      offset=HEADER_SIZE + dist_bytes, shape=(n, n))
+    raw_mm = np.memmap(path, dtype=np.float32, mode="r+", offset=table_bytes,
+                       shape=(n, n)) if quantize else dist_mm
+
+    max_d = 0.0
+    for lo in range(0, n, chunk):
+        idx = np.arange(lo, min(lo + chunk, n))
+        d, pred = csgraph_dijkstra(adj, indices=idx, return_predecessors=True)
+        raw_mm[lo:lo + len(idx)] = d
+        if quantize:
+            finite = d[np.isfinite(d)]
+            if finite.size:
+                max_d = max(max_d, float(finite.max()))
+        # scipy: -9999 = kein Vorgänger
+        nh_mm[lo:lo + len(idx)] = np.where(pred < 0, -1, pred)
+
+    scale = 1.0
+    if quantize:
+        # Skalierung für uint16, dann nur noch umrechnen (kein zweiter Dijkstra)
+        scale = max_d / (UINT16_INF - 1) if max_d > 0 else 1.0
+        for lo in range(0, n, chunk):
+            d = np.asarray(raw_mm[lo:lo + chunk], dtype=np.float64)
+            q = np.full(d.shape, UINT16_INF, dtype=np.uint16)
+            finite = np.isfinite(d)
+            q[finite] = np.rint(d[finite] / scale).astype(np.uint16)
+            dist_mm[lo:lo + len(d)] = q
+
+    dist_mm.flush()
+    nh_mm.flush()
+    del dist_mm, nh_mm, raw_mm
+
+    header = HEADER.pack(MAGIC, VERSION, n,
+                         DIST_UINT16 if quantize else DIST_FLOAT32,
+                         scale, graph_fingerprint(graph, model.weights))
+    with open(path, "r+b") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.truncate(table_bytes)
+    return time.perf_counter() - t0
+
+
+# --------------------------------------------------------
+# Abfrage über die gemappte Datei
+# --------------------------------------------------------
+
+class DistanceTable:
+    """
+    Vorberechnete All-Pairs-Tabelle, per np.memmap geöffnet (read-only, die
+    Seiten werden von mehreren Prozessen geteilt). Pfade werden über die
+    Next-Hop-Zeiger in O(Pfadlänge) rekonstruiert.
+    """
+
+    def __init__(self, path: str, graph: BuildingGraph, model: RoutingModel):
+        with open(path, "rb") as f:
+            magic, version, n, dist_code, scale, fingerprint = HEADER.unpack(
+                f.read(HEADER_SIZE)[:HEADER.size])
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a distance table (version {VERSION}).")
+        if n != graph.num_nodes() or fingerprint != graph_fingerprint(graph, model.weights):
+            raise ValueError(f"{path}: table does not match graph/model configuration.")
+
+        self.g = graph
+        self.n = n
+        self.quantized = dist_code == DIST_UINT16
+        self.scale = scale
+        dist_dtype = np.uint16 if self.quantized else np.float32
+        dist_bytes = n * n * np.dtype(dist_dtype).itemsize
+        self.dist = np.memmap(path, dtype=dist_dtype, mode="r", offset=HEADER_SIZE, shape=(n, n))
+        self.next_hop = np.memmap(path, dtype=np.int32, mode="r",
+                                  offset=HEADER_SIZE + dist_bytes, shape=(n, n))
+
+    def distance_idx(self, s: int, t: int) -> Optional[float]:
+        # Zeile t: gleiche Zeile wie die Next-Hop-Zeiger der Rekonstruktion
+        d = self.dist[t, s]
+        if self.quantized:
+            return None if d == UINT16_INF else float(d) * self.scale
+        return None if not np.isfinite(d) else float(d)
+
+    def path_idx(self, s: int, t: int) -> Optional[List[int]]:
+        if self.distance_idx(s, t) is None:
+            return None
+        row = self.next_hop[t]
+        path = [s]
+        u = s
+        while u != t:
+            u = int(row[u])
+            path.append(u)
+        return path
+
+    def query(self, start_id: str, goal_id: str) -> Tuple[Optional[List[str]], Optional[float], float]:
+        """Gleiche Rückgabe wie layered_a_star: (Pfad-IDs, Kosten, Zeit)."""
+        start_time = time.perf_counter()
+        s, t = self.g.idx(start_id), self.g.idx(goal_id)
+        cost = self.distance_idx(s, t)
+        if cost is None:
+            return None, None, time.perf_counter() - start_time
+        path = [self.g.id(i) for i in self.path_idx(s, t)]
+        return path, cost, time.perf_counter() - start_time
+
+
+def main():
+    from layered_a_star_ChatGPT import load_building
+
+    ap = argparse.ArgumentParser(description="Precompute an all-pairs distance table.")
+    ap.add_argument("building")
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--penalty", type=float, default=5.0)
+    ap.add_argument("--quantize", action="store_true", help="uint16 statt float32")
+    args = ap.parse_args()
+
+    graph, model = load_building(args.building)
+    model.floor_transition_penalty = args.penalty
+    out = args.out or args.building.rsplit(".", 1)[0] + ".apsp"
+    dt = build_distance_table(graph, model, out, quantize=args.quantize)
+    print(f"{graph.num_nodes()} Knoten, Tabelle '{out}' in {dt:.2f}s geschrieben.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import random
+from typing import List, Optional, Sequence
+
+from BuildingGraph import BuildingGraph
+from shortest_paths import dijkstra, INF
+
+
+class LandmarkTable:
+    """
+    ALT-Vorberechnung (A*, Landmarks, Dreiecksungleichung).
+
+    Für jeden Landmark L werden d(L, v) (forward) und d(v, L) (backward) für
+    alle Knoten gespeichert. Daraus folgt die zulässige, konsistente Schranke
+        h(v, t) = max_L max(d(L, t) - d(L, v), d(v, L) - d(t, L)).
+    Die Kanten des Graphen sind ungerichtet mit symmetrischen Gewichten, daher
+    teilen sich forward und backward dieselben Listen.
+    """
+
+    def __init__(self, graph: BuildingGraph, weights: Sequence[float],
+                 n_landmarks: int = 8, strategy: str = "avoid", seed: int = 0):
+        if strategy not in ("avoid", "farthest"):
+            raise ValueError(f"Unknown landmark strategy: {strategy}")
+        self.graph = graph
+        self.weights = weights
+        self.strategy = strategy
+        self.landmarks: List[int] = []
+        self.forward: List[List[float]] = []
+        self.backward: List[List[float]] = []
+
+        n = graph.num_nodes()
+        rnd = random.Random(seed)
+        for _ in range(min(n_landmarks, n)):
+            if strategy == "avoid" and self.landmarks:
+                lm = self._pick_avoid(rnd)
+            else:
+                lm = self._pick_farthest(rnd)
+            if lm is None:
+                break
+            self._add(lm)
+
+    # ----------------- Auswahl -----------------
+
+    def _add(self, lm: int):
+        dist, _ = dijkstra(self.graph, self.weights, lm)
+        self.landmarks.append(lm)
+        self.forward.append(dist)
+        self.backward.append(dist)
+
+    def _pick_farthest(self, rnd: random.Random) -> Optional[int]:
+        """Knoten mit maximaler Distanz zum nächstgelegenen Landmark."""
+        n = self.graph.num_nodes()
+        if not self.landmarks:
+            # Start: am weitesten entfernter Knoten von einem Zufallsknoten
+            dist, _ = dijkstra(self.graph, self.weights, rnd.randrange(n))
+            return max(range(n), key=lambda v: dist[v] if dist[v] != INF else -1.0)
+
+        chosen = set(self.landmarks)
+        best, best_d = None, -1.0
+        for v in range(n):
+            if v in chosen:
+                continue
+            d = min(row[v] for row in self.forward)
+            if d == INF:
+                # Komponente ohne Landmark: zuerst abdecken
+                return v
+            if d > best_d:
+                best, best_d = v, d
+        return best
+
+    def _pick_avoid(self, rnd: random.Random) -> Optional[int]:
+        """
+        Avoid-Strategie (Goldberg/Harrelson): im Kürzeste-Wege-Baum einer
+        Zufallswurzel den Teilbaum mit der größten Summe an Schranken-Lücken
+        d(r, v) - h(r, v) suchen, der noch keinen Landmark enthält, und bis
+        zu einem Blatt absteigen.
+        """
+        n = self.graph.num_nodes()
+        r = rnd.randrange(n)
+        dist, parent = dijkstra(self.graph, self.weights, r)
+
+        reached = [v for v in range(n) if dist[v] != INF]
+        reached.sort(key=lambda v: dist[v], reverse=True)
+        children: List[List[int]] = [[] for _ in range(n)]
+        for v in reached:
+            if parent[v] != -1:
+                children[parent[v]].append(v)
+
+        chosen = set(self.landmarks)
+        size = [0.0] * n
+        has_landmark = [False] * n
+        for v in reached:  # Blätter zuerst
+            gap = dist[v] - self._bound(v, r, range(len(self.landmarks)))
+            s = gap
+            lm_in = v in chosen
+            for c in children[v]:
+                s += size[c]
+                lm_in = lm_in or has_landmark[c]
+            has_landmark[v] = lm_in
+            size[v] = 0.0 if lm_in else s
+
+        v = r
+        while True:
+            best = max(children[v], key=lambda c: size[c], default=None)
+            if best is None or size[best] <= 0.0:
+                break
+            v = best
+        if v in chosen or v == r:
+            return self._pick_farthest(rnd)
+        return v
+
+    # ----------------- Abfrage -----------------
+
+    def _bound(self, v: int, t: int, active) -> float:
+        best = 0.0
+        for i in active:
+            fw, bw = self.forward[i], self.backward[i]
+            if fw[t] == INF or fw[v] == INF:
+                continue
+            d = max(fw[t] - fw[v], bw[v] - bw[t])
+            if d > best:
+                best = d
+        return best
+
+    def select(self, start: int, goal: int, k: int) -> List[int]:
+        """Die k Landmarks mit der besten Schranke für (start, goal)."""
+        ranked = sorted(
+            range(len(self.landmarks)),
+            key=lambda i: self._bound(start, goal, (i,)),
+            reverse=True
+        )
+        return ranked[:k]
+
+    def bound(self, v: int, goal: int) -> float:
+        return self._bound(v, goal, range(len(self.landmarks)))
+
+
+class AltHeuristic:
+    """Zielgebundene ALT-Heuristik mit den pro Anfrage aktiven Landmarks."""
+
+    def __init__(self, table: LandmarkTable, goal_idx: int, active: Sequence[int]):
+        self.goal_idx = goal_idx
+        self.values = None
+        # (forward, backward, d(L, goal), d(goal, L)) pro aktivem Landmark
+        self._rows = [
+            (table.forward[i], table.backward[i],
+             table.forward[i][goal_idx], table.backward[i][goal_idx])
+            for i in active
+            if table.forward[i][goal_idx] != INF
+        ]
+
+    def __call__(self, idx: int, goal_idx: int = -1) -> float:
+        best = 0.0
+        for fw, bw, fw_goal, bw_goal in self._rows:
+            fv = fw[idx]
+            if fv == INF:
+                continue
+            d = fw_goal - fv
+            if d > best:
+                best = d
+            d = bw[idx] - bw_goal
+            if d > best:
+                best = d
+        return best
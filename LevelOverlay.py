@@ -0,0 +1,134 @@
+import time
+from heapq import heappush, heappop
+from typing import Callable, Dict, List, Optional, Tuple
+
+from BuildingGraph import BuildingGraph, EDGE_LEVEL_CHANGE
+from RoutingModel import RoutingModel
+from shortest_paths import level_dijkstra
+
+INF = float("inf")
+
+
+class LevelOverlay:
+    """
+    Mehrstufiger Overlay-Graph über BuildingGraph.level_index.
+
+    Übergangsknoten sind die Endpunkte vertikaler Kanten (Treppen,
+    Aufzugskabinen, Etagenwechsel). Pro Level werden die Distanzen zwischen
+    seinen Übergangsknoten vorberechnet (nur Kanten innerhalb des Levels).
+
+    Eine Anfrage sucht dann im Start- und Ziel-Level Knoten für Knoten,
+    auf allen anderen Levels nur über die Overlay-Kanten zwischen den
+    Übergangsknoten plus die vertikalen Kanten.
+    """
+
+    def __init__(self, graph: BuildingGraph, model: RoutingModel):
+        self.g = graph
+        self.weights = model.weights
+        self.weights_key = model.weights_key()
+
+        n = graph.num_nodes()
+        self.is_transition = [False] * n
+        for u in range(n):
+            for slot in graph.edge_slots(u):
+                if graph.csr_flags[slot] & EDGE_LEVEL_CHANGE:
+                    self.is_transition[u] = True
+                    break
+
+        # Übergangsknoten pro Level und Overlay-Kanten (Ziel, Distanz)
+        self.transitions: Dict[int, List[int]] = {}
+        self.overlay: Dict[int, List[Tuple[int, float]]] = {}
+
+        t0 = time.perf_counter()
+        for level, nodes in graph.level_index.items():
+            trans = [u for u in nodes if self.is_transition[u]]
+            self.transitions[level] = trans
+            targets = set(trans)
+            for u in trans:
+                dist, _ = level_dijkstra(graph, self.weights, u, targets)
+                self.overlay[u] = [(v, dist[v]) for v in trans if v != u and v in dist]
+        self.preprocess_s = time.perf_counter() - t0
+        self.n_overlay_edges = sum(len(e) for e in self.overlay.values())
+        self.last_expanded = 0
+
+    # ----------------- Anfrage -----------------
+
+    def query(self, model: RoutingModel, start_id: str, goal_id: str,
+              heuristic_fn: Optional[Callable[[int, int], float]] = None
+              ) -> Tuple[Optional[List[str]], Optional[float], float]:
+        """Gleiche Rückgabe wie layered_a_star: (Pfad-IDs, Kosten, Zeit)."""
+        if model.weights_key() != self.weights_key:
+            raise RuntimeError("RoutingModel weights changed; rebuild the overlay.")
+        start_time = time.perf_counter()
+        s, t = self.g.idx(start_id), self.g.idx(goal_id)
+        cost, path = self.query_idx(s, t, heuristic_fn)
+        if path is None:
+            return None, None, time.perf_counter() - start_time
+        return [self.g.id(i) for i in path], cost, time.perf_counter() - start_time
+
+    def query_idx(self, s: int, t: int,
+                  heuristic_fn: Optional[Callable[[int, int], float]] = None
+                  ) -> Tuple[Optional[float], Optional[List[int]]]:
+        g = self.g
+        levels, targets, weights = g.node_levels, g.csr_targets, self.weights
+        open_levels = {levels[s], levels[t]}
+        h = heuristic_fn if heuristic_fn is not None else (lambda i, j: 0.0)
+
+        dist = {s: 0.0}
+        parent: Dict[int, int] = {s: -1}
+        closed = set()
+        heap = [(h(s, t), s)]
+        expanded = 0
+
+        while heap:
+            _, u = heappop(heap)
+            if u in closed:
+                continue
+            closed.add(u)
+            expanded += 1
+            if u == t:
+                break
+            d = dist[u]
+
+            if levels[u] in open_levels:
+                # Start-/Ziel-Level: echte Kanten (inkl. vertikaler)
+                edges = ((targets[slot], weights[slot]) for slot in g.edge_slots(u))
+            else:
+                # Zwischen-Level: Overlay + vertikale Kanten des Übergangsknotens
+                vertical = (
+                    (targets[slot], weights[slot]) for slot in g.edge_slots(u)
+                    if levels[targets[slot]] != levels[u]
+                )
+                edges = (*self.overlay.get(u, ()), *vertical)
+
+            for v, w in edges:
+                nd = d + w
+                if nd < dist.get(v, INF):
+                    dist[v] = nd
+                    parent[v] = u
+                    heappush(heap, (nd + h(v, t), v))
+
+        self.last_expanded = expanded
+        if t not in closed:
+            return None, None
+
+        hops = [t]
+        while parent[hops[-1]] != -1:
+            hops.append(parent[hops[-1]])
+        hops.reverse()
+        return dist[t], self._unpack(hops, open_levels)
+
+    def _unpack(self, hops: List[int], open_levels) -> List[int]:
+        """Ersetzt Overlay-Kanten durch den Pfad innerhalb ihres Levels."""
+        levels = self.g.node_levels
+        path = [hops[0]]
+        for u, v in zip(hops, hops[1:]):
+            if levels[u] == levels[v] and levels[u] not in open_levels:
+                _, parent = level_dijkstra(self.g, self.weights, u, {v})
+                seg = [v]
+                while parent[seg[-1]] != u:
+                    seg.append(parent[seg[-1]])
+                path.extend(reversed(seg))
+            else:
+                path.append(v)
+        return path
@@ -0,0 +1,77 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Spalten pro (Gebäude, Algorithmus); eine .npz-Datei pro Eintrag
+COLUMNS = ("start", "goal", "expanded", "cost", "wall_s")
+
+
+class ResultStore:
+    """
+    Persistenter, spaltenorientierter Cache der Benchmark-Rohdaten.
+
+    Ein Eintrag enthält alle Anfragen eines Algorithmus auf einem Gebäude
+    als NumPy-Spalten (Start, Ziel, Expansionen, Kosten, Laufzeit) plus
+    Metadaten (n_nodes, n_floors, Seed, ggf. Vorberechnungszeit).
+    Schlüssel: SHA-256 des Gebäude-JSON, Algorithmus + Version und die
+    Parameter der Paarauswahl. Ändert sich ein Gebäude oder wird eine
+    Algorithmus-Version erhöht (benchmark_core.ALGORITHM_VERSIONS), fehlt
+    nur dieser Eintrag und wird neu berechnet.
+    """
+
+    def __init__(self, directory: str = "benchmark_results"):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(digest: bytes, algorithm: str, version: int, params: tuple) -> str:
+        p = hashlib.sha256(repr(params).encode("utf8")).hexdigest()[:12]
+        return f"{digest.hex()[:24]}_{algorithm}_v{version}_{p}"
+
+    def _path(self, key: str) -> Path:
+        return self.dir / f"{key}.npz"
+
+    def has(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, float]]]:
+        """(Spalten, Metadaten) oder None, falls nicht (lesbar) vorhanden."""
+        try:
+            with np.load(self._path(key)) as data:
+                columns = {c: data[c] for c in COLUMNS}
+                meta = {k[5:]: data[k].item() for k in data.files if k.startswith("meta_")}
+        except (OSError, ValueError, KeyError):
+            return None
+        return columns, meta
+
+    def put(self, key: str, columns: Dict[str, np.ndarray], meta: Dict[str, float]):
+        # Atomar ersetzen: parallele Worker / abgebrochene Läufe hinterlassen keine halben Dateien;
+        # die Endung .tmp (nicht .npz) hält Reste aus frame() heraus
+        tmp = self.dir / f"{key}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **{c: np.asarray(columns[c]) for c in COLUMNS},
+                     **{f"meta_{k}": np.asarray(v) for k, v in meta.items()})
+        os.replace(tmp, self._path(key))
+
+    def frame(self) -> pd.DataFrame:
+        """Alle gespeicherten Anfragen als eine Tabelle (eine Zeile pro Anfrage)."""
+        parts = []
+        for path in sorted(self.dir.glob("*.npz")):
+            if path.stem.endswith(".tmp"):  # Rest älterer put()-Versionen
+                continue
+            building, algorithm, version, _ = path.stem.rsplit("_", 3)
+            got = self.get(path.stem)
+            if got is None:
+                continue
+            columns, meta = got
+            df = pd.DataFrame(columns)
+            df["building"] = meta.get("name", building)
+            df["algorithm"] = algorithm
+            df["version"] = int(version[1:])
+            df["seed"] = meta.get("seed")
+            parts.append(df)
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
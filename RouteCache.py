@@ -0,0 +1,202 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from BuildingGraph import BuildingGraph
+from RoutingModel import RoutingModel
+from SearchContext import SearchContext
+
+RouteResult = Tuple[Optional[List[str]], Optional[float], float]
+
+# Grobe Speicherschätzung pro Eintrag (Objekt-Overhead + pro Pfadknoten)
+ENTRY_OVERHEAD_BYTES = 400
+BYTES_PER_PATH_NODE = 120
+
+
+class _Entry:
+    __slots__ = ("path", "cum", "pos", "cost", "size")
+
+    def __init__(self, path: Optional[List[str]], cum: List[float], cost: Optional[float]):
+        self.path = path
+        self.cum = cum
+        self.pos = {nid: i for i, nid in enumerate(path)} if path else {}
+        self.cost = cost
+        self.size = ENTRY_OVERHEAD_BYTES + BYTES_PER_PATH_NODE * (len(path) if path else 0)
+
+
+def alt_route(graph: BuildingGraph, model: RoutingModel, start_id: str, goal_id: str) -> RouteResult:
+    """Exakte Suche (A* mit ALT-Heuristik) mit der Signatur von layered_a_star."""
+    from layered_a_star_ChatGPT import astar_search
+
+    start_time = time.perf_counter()
+    s, t = graph.idx(start_id), graph.idx(goal_id)
+    ctx = SearchContext.for_graph(graph)
+    cost = astar_search(graph, model, s, t, model.bind_alt(s, t), ctx)
+    if cost is None:
+        return None, None, time.perf_counter() - start_time
+    return [graph.id(i) for i in ctx.path_to(t)], cost, time.perf_counter() - start_time
+
+
+class RouteCache:
+    """
+    LRU-Cache vor einer exakten Suche (Standard: alt_route; andere Suchen mit
+    der Signatur von layered_a_star möglich).
+
+    Schlüssel: (Start, Ziel) unter der aktuellen Konfiguration; ändern sich
+    Graph (BuildingGraph.version) oder Penalty/Profil, wird der Cache beim
+    nächsten Zugriff geleert. Verdrängt wird nach geschätzter Speichergröße.
+
+    Live-Overlay (RoutingModel.block_edge usw.): Sperren/Verteuerungen
+    entfernen nur Einträge, deren Pfad die geänderte Kante benutzt; alle
+    anderen bleiben optimal. Sinkt ein Gewicht, wird alles verworfen.
+
+    Optimale Teilstruktur: jeder Teilpfad eines gecachten kürzesten Pfads
+    ist selbst ein kürzester Pfad, daher beantwortet ein Eintrag s -> g auch
+    jedes Paar (a, b) auf diesem Pfad (in beiden Richtungen, da die Kanten
+    ungerichtet sind). Das gilt nur für exakte Suchen: layered_a_star ist
+    wegen der Ebenen-Heuristik nicht zulässig und darf hier nur mit
+    subpaths=False eingesetzt werden.
+    """
+
+    def __init__(self, graph: BuildingGraph, model: RoutingModel,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 search_fn: Optional[Callable[..., RouteResult]] = None,
+                 subpaths: bool = True):
+        self.g = graph
+        self.model = model
+        self.search_fn = search_fn if search_fn is not None else alt_route
+        self.subpaths = subpaths
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        # Knoten-ID -> Schlüssel aller Einträge, deren Pfad den Knoten enthält
+        self._on_path: Dict[str, Set[Tuple[str, str]]] = {}
+        self._config = self._current_config()
+        self.bytes = 0
+        model.add_listener(self._on_weights_changed)
+
+        self.hits = 0
+        self.subpath_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _current_config(self) -> tuple:
+        # Overlay-Änderungen kommen über _on_weights_changed
+        return self.g.version, self.model.lower_bound_key()
+
+    def _on_weights_changed(self, pairs: List[Tuple[int, int]], decreased: bool):
+        if decreased:
+            self.clear()
+            self.invalidations += 1
+            return
+        for a_idx, b_idx in pairs:
+            a, b = self.g.id(a_idx), self.g.id(b_idx)
+            keys_a = self._on_path.get(a)
+            keys_b = self._on_path.get(b)
+            if not keys_a or not keys_b:
+                continue
+            for key in keys_a & keys_b:
+                entry = self._entries[key]
+                if abs(entry.pos[a] - entry.pos[b]) == 1:
+                    del self._entries[key]
+                    self._forget(key, entry)
+                    self.invalidations += 1
+
+    # ----------------- Abfrage -----------------
+
+    def route(self, start_id: str, goal_id: str) -> RouteResult:
+        """Wie layered_a_star: (Pfad-IDs, Kosten, Zeit)."""
+        start_time = time.perf_counter()
+        config = self._current_config()
+        if config != self._config:
+            self.clear()
+            self._config = config
+            self.invalidations += 1
+
+        key = (start_id, goal_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.path, entry.cost, time.perf_counter() - start_time
+
+        sub = self._lookup_subpath(start_id, goal_id) if self.subpaths else None
+        if sub is not None:
+            self.subpath_hits += 1
+            return sub[0], sub[1], time.perf_counter() - start_time
+
+        self.misses += 1
+        path, cost, _ = self.search_fn(self.g, self.model, start_id, goal_id)
+        self._insert(key, path, cost)
+        return path, cost, time.perf_counter() - start_time
+
+    def _lookup_subpath(self, a: str, b: str) -> Optional[Tuple[List[str], float]]:
+        keys_a = self._on_path.get(a)
+        keys_b = self._on_path.get(b)
+        if not keys_a or not keys_b:
+            return None
+        if len(keys_a) > len(keys_b):
+            keys_a, keys_b = keys_b, keys_a
+        for key in keys_a:
+            if key not in keys_b:
+                continue
+            entry = self._entries[key]
+            self._entries.move_to_end(key)
+            i, j = entry.pos[a], entry.pos[b]
+            if i <= j:
+                return entry.path[i:j + 1], entry.cum[j] - entry.cum[i]
+            return entry.path[j:i + 1][::-1], entry.cum[i] - entry.cum[j]
+        return None
+
+    # ----------------- Verwaltung -----------------
+
+    def _insert(self, key: Tuple[str, str], path: Optional[List[str]], cost: Optional[float]):
+        entry = _Entry(path, self._cumulative_costs(path), cost)
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self.bytes += entry.size
+        for nid in entry.pos:
+            self._on_path.setdefault(nid, set()).add(key)
+
+        while self.bytes > self.max_bytes:
+            old_key, old = self._entries.popitem(last=False)
+            self._forget(old_key, old)
+            self.evictions += 1
+
+    def _forget(self, key: Tuple[str, str], entry: _Entry):
+        self.bytes -= entry.size
+        for nid in entry.pos:
+            keys = self._on_path.get(nid)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._on_path[nid]
+
+    def _cumulative_costs(self, path: Optional[List[str]]) -> List[float]:
+        if not path:
+            return []
+        g, weights = self.g, self.model.weights
+        cum = [0.0]
+        for a, b in zip(path, path[1:]):
+            ai, bi = g.idx(a), g.idx(b)
+            w = min(weights[slot] for slot in g.edge_slots(ai) if g.csr_targets[slot] == bi)
+            cum.append(cum[-1] + w)
+        return cum
+
+    def clear(self):
+        self._entries.clear()
+        self._on_path.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "subpath_hits": self.subpath_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -1,45 +1,262 @@
 import math
+from array import array
+from bisect import bisect_right
+from typing import Callable, Dict, List, Optional, Tuple
 
-from BuildingGraph import BuildingGraph
+import numpy as np
+
+from BuildingGraph import BuildingGraph, EDGE_LEVEL_CHANGE
+from Landmarks import AltHeuristic, LandmarkTable
 from custom_dataclasses import RoutingEdge
 
+INF = float("inf")
+# Standard-Penalty pro Etagenwechsel (load_building, RoutingService)
+FLOOR_TRANSITION_PENALTY = 5.0
+
 
 class RoutingModel:
+    # Konservative Fixkosten pro Etagenwechsel (Treppen/Aufzüge, siehe heuristic)
+    fixed_entry_cost = 5.0
+
     def __init__(self, graph: BuildingGraph,
                  floor_transition_penalty: float = 0.0,
                  use_3d_heuristic: bool = True):
         if not graph.compiled:
             raise RuntimeError("Graph must be compiled first.")
         self.g = graph
-        self.floor_transition_penalty = floor_transition_penalty
         self.use_3d_heuristic = use_3d_heuristic
 
+        # Effektive Kantengewichte pro CSR-Slot (eigene Sicht pro Modell,
+        # Topologie wird mit dem Graphen geteilt)
+        self.weights = array("d")
+        self._base_weights = array("d")
+        self.landmarks: Optional[LandmarkTable] = None
+        # Parameter der letzten prepare_landmarks (für den Neuaufbau)
+        self._landmark_params: Tuple[int, str] = (8, "avoid")
+        # Modelle der Routing-Profile (siehe for_profile)
+        self._profile_models: Dict[str, "RoutingModel"] = {}
+
+        # Live-Overlay: gesperrte Kanten/Knoten und Gewichts-Overrides,
+        # direkt in self.weights eingerechnet (gesperrt = inf)
+        self.blocked_edges = bytearray(len(graph.csr_targets))
+        self.blocked_nodes = bytearray(graph.num_nodes())
+        self.weight_overrides: Dict[int, float] = {}
+        # Zähler für jede Änderung am Overlay (Teil von weights_key)
+        self.overlay_version = 0
+        self._listeners: List[Callable[[List[Tuple[int, int]], bool], None]] = []
+
+        self._floor_transition_penalty = floor_transition_penalty
+        self.compile_weights()
+
         self.min_floor_transition_cost = (
             self._estimate_min_floor_transition_cost()
         )
 
+    @property
+    def floor_transition_penalty(self) -> float:
+        return self._floor_transition_penalty
+
+    @floor_transition_penalty.setter
+    def floor_transition_penalty(self, value: float):
+        # Nur die Gewichte neu berechnen, nicht den Graphen
+        self._floor_transition_penalty = value
+        self.compile_weights()
+        for m in self._profile_models.values():
+            m.floor_transition_penalty = value
+
+    def compile_weights(self):
+        """Backt Penalties in ein Gewichts-Array ein (ein Array-Read pro Relaxation)."""
+        penalty = self._floor_transition_penalty
+        self._base_weights = array("d", (
+            w + penalty if f & EDGE_LEVEL_CHANGE else w
+            for w, f in zip(self.g.csr_weights, self.g.csr_flags)
+        ))
+        self.weights = array("d", self._base_weights)
+        # Live-Overlay erneut anwenden
+        for u in range(len(self.blocked_nodes)):
+            if self.blocked_nodes[u]:
+                for slot in self.g.edge_slots(u):
+                    self._refresh_pair(u, self.g.csr_targets[slot])
+        for slot, blocked in enumerate(self.blocked_edges):
+            if blocked:
+                self.weights[slot] = INF
+        for slot in self.weight_overrides:
+            self._refresh_slot(slot)
+        # Landmark-Distanzen hängen an den Gewichten
+        self.landmarks = None
+
+    def weights_key(self) -> tuple:
+        """Identifiziert die exakte Gewichtskonfiguration (inkl. Live-Overlay)."""
+        return self.g.profile_name, self._floor_transition_penalty, self.overlay_version
+
+    def lower_bound_key(self) -> tuple:
+        """
+        Identifiziert lower_bound_weights(): ohne Sperren, nur mit Overrides,
+        die ein Gewicht senken. Sperren und Verteuerungen lassen daraus
+        abgeleitete untere Schranken (Landmarks) gültig.
+        """
+        lowered = tuple(sorted(
+            (slot, w) for slot, w in self.weight_overrides.items()
+            if w < self._base_weights[slot]
+        ))
+        return self.g.profile_name, self._floor_transition_penalty, lowered
+
+    def lower_bound_weights(self) -> array:
+        """Gewichte, die nie über den aktuellen effektiven Gewichten liegen."""
+        weights = array("d", self._base_weights)
+        for slot, w in self.weight_overrides.items():
+            if w < weights[slot]:
+                weights[slot] = w
+        return weights
+
+    def for_profile(self, name: str) -> "RoutingModel":
+        """
+        Modell mit gleicher Konfiguration auf der Profil-Sicht des Graphen
+        (BuildingGraph.profile). Wird pro Profil gecacht, samt Landmarks.
+        Das Live-Overlay (Sperren, Overrides) wird beim Anlegen übernommen
+        und danach bei jeder Änderung weitergereicht.
+        """
+        if name == self.g.profile_name:
+            return self
+        m = self._profile_models.get(name)
+        if m is None or m.g is not self.g.profile(name):
+            m = RoutingModel(self.g.profile(name), self._floor_transition_penalty,
+                             self.use_3d_heuristic)
+            self._copy_overlay(m)
+            self._profile_models[name] = m
+        return m
+
+    def _copy_overlay(self, m: "RoutingModel"):
+        """Überträgt das Overlay auf ein Modell einer anderen Sicht (Slots über Knotenpaare)."""
+        slot_pair = self._slot_pair
+        for a, b in {slot_pair(slot) for slot, blocked in enumerate(self.blocked_edges) if blocked}:
+            m.block_edge(a, b)
+        for idx, blocked in enumerate(self.blocked_nodes):
+            if blocked:
+                m.block_node(idx)
+        for (a, b), w in {slot_pair(slot): w for slot, w in self.weight_overrides.items()}.items():
+            m.set_edge_weight(a, b, w)
+
+    # -------- live overlay (blocking / weight overrides) -------
+
+    def add_listener(self, fn: Callable[[List[Tuple[int, int]], bool], None]):
+        """fn(geänderte Knotenpaare, decreased) wird nach jeder Overlay-Änderung aufgerufen."""
+        self._listeners.append(fn)
+
+    def block_edge(self, a_idx: int, b_idx: int, blocked: bool = True):
+        """Sperrt (oder entsperrt) alle Kanten zwischen a und b, in beide Richtungen."""
+        slots = self._pair_slots(a_idx, b_idx)
+        for slot in slots:
+            self.blocked_edges[slot] = 1 if blocked else 0
+        self._apply([(a_idx, b_idx)], decreased=not blocked)
+        for m in self._profile_models.values():
+            m.block_edge(a_idx, b_idx, blocked)
+
+    def unblock_edge(self, a_idx: int, b_idx: int):
+        self.block_edge(a_idx, b_idx, blocked=False)
+
+    def block_node(self, idx: int, blocked: bool = True):
+        """Sperrt (oder entsperrt) einen Knoten, d.h. alle seine Kanten."""
+        self.blocked_nodes[idx] = 1 if blocked else 0
+        pairs = [(idx, self.g.csr_targets[slot]) for slot in self.g.edge_slots(idx)]
+        self._apply(pairs, decreased=not blocked)
+        for m in self._profile_models.values():
+            m.block_node(idx, blocked)
+
+    def unblock_node(self, idx: int):
+        self.block_node(idx, blocked=False)
+
+    def set_edge_weight(self, a_idx: int, b_idx: int, weight: Optional[float]):
+        """Überschreibt das Gewicht der Kanten a–b (None = Override entfernen)."""
+        decreased = False
+        for slot in self._pair_slots(a_idx, b_idx):
+            old = self.weight_overrides.get(slot, self._base_weights[slot])
+            if weight is None:
+                self.weight_overrides.pop(slot, None)
+            else:
+                self.weight_overrides[slot] = weight
+            new = self.weight_overrides.get(slot, self._base_weights[slot])
+            decreased = decreased or new < old
+        self._apply([(a_idx, b_idx)], decreased)
+        for m in self._profile_models.values():
+            m.set_edge_weight(a_idx, b_idx, weight)
+
+    def clear_overrides(self):
+        """Entfernt alle Sperren und Overrides."""
+        self.blocked_edges = bytearray(len(self.blocked_edges))
+        self.blocked_nodes = bytearray(len(self.blocked_nodes))
+        self.weight_overrides = {}
+        self.weights = array("d", self._base_weights)
+        self.landmarks = None
+        self.overlay_version += 1
+        for fn in self._listeners:
+            fn([], True)
+        for m in self._profile_models.values():
+            m.clear_overrides()
+
+    def _pair_slots(self, a_idx: int, b_idx: int) -> List[int]:
+        t = self.g.csr_targets
+        return ([slot for slot in self.g.edge_slots(a_idx) if t[slot] == b_idx]
+                + [slot for slot in self.g.edge_slots(b_idx) if t[slot] == a_idx])
+
+    def _slot_pair(self, slot: int) -> Tuple[int, int]:
+        """(kleinerer, größerer) Endpunkt der Kante in slot."""
+        fr_idx = bisect_right(self.g.csr_offsets, slot) - 1
+        to_idx = self.g.csr_targets[slot]
+        return (fr_idx, to_idx) if fr_idx < to_idx else (to_idx, fr_idx)
+
+    def _refresh_slot(self, slot: int, fr_idx: int = -1):
+        if fr_idx < 0:
+            fr_idx = bisect_right(self.g.csr_offsets, slot) - 1
+        to_idx = self.g.csr_targets[slot]
+        if (self.blocked_edges[slot] or self.blocked_nodes[fr_idx]
+                or self.blocked_nodes[to_idx]):
+            self.weights[slot] = INF
+        else:
+            self.weights[slot] = self.weight_overrides.get(slot, self._base_weights[slot])
+
+    def _refresh_pair(self, a_idx: int, b_idx: int):
+        t = self.g.csr_targets
+        for fr, to in ((a_idx, b_idx), (b_idx, a_idx)):
+            for slot in self.g.edge_slots(fr):
+                if t[slot] == to:
+                    self._refresh_slot(slot, fr)
+
+    def _apply(self, pairs: List[Tuple[int, int]], decreased: bool):
+        for a, b in pairs:
+            self._refresh_pair(a, b)
+        if decreased:
+            # Gesenkte Gewichte: Landmark-Schranken können überschätzen,
+            # beim nächsten Zugriff für den neuen lower_bound_key holen
+            self.landmarks = None
+        self.overlay_version += 1
+        for fn in self._listeners:
+            fn(pairs, decreased)
+
     def _estimate_min_floor_transition_cost(self):
         best = None
-        for fr_idx, edges in enumerate(self.g.routing_edges):
-            fr_lvl = self.g.routing_nodes[fr_idx].level
-            for e in edges:
-                to_lvl = self.g.routing_nodes[e.target].level
-                if fr_lvl != to_lvl:
-                    best = e.weight if best is None else min(best, e.weight)
+        for w, f in zip(self.g.csr_weights, self.g.csr_flags):
+            if f & EDGE_LEVEL_CHANGE:
+                best = w if best is None else min(best, w)
         return best or 0.0
 
     # -------- cost function -------
 
     def edge_cost(self, fr_idx: int, edge: RoutingEdge) -> float:
         """Basiskosten: weight + optional floor penalty."""
-        fr_lvl = self.g.routing_nodes[fr_idx].level
-        to_lvl = self.g.routing_nodes[edge.target].level
+        # Level direkt aus dem Array: kompakte Graphen (Cache, Streaming)
+        # erzeugen keine RoutingNode-Objekte
+        levels = self.g.node_levels
 
         base = edge.weight
-        if fr_lvl != to_lvl:
+        if levels[fr_idx] != levels[edge.target]:
             base += self.floor_transition_penalty
         return base
 
+    def edge_cost_at(self, fr_idx: int, slot: int) -> float:
+        """Wie edge_cost, aber direkt auf einem CSR-Slot (vorberechnet)."""
+        return self.weights[slot]
+
     # -------- heuristic -------
 
     def heuristic(self, idx: int, goal_idx: int) -> float:
@@ -47,14 +264,17 @@ class RoutingModel:
         Optimierte Layered-Heuristik.
         Kombiniert 3D-Tightness mit logischen Transitions-Kosten.
         """
-        a = self.g.routing_nodes[idx]
-        b = self.g.routing_nodes[goal_idx]
+        pos = self.g.node_pos
+        levels = self.g.node_levels
+        i, j = 3 * idx, 3 * goal_idx
 
         # 1. Physikalische Basis (3D-Distanz)
         # Sie ist die absolut kleinste Distanz im Raum und immer zulässig.
-        h_dist = math.dist(a.pos, b.pos)
+        h_dist = math.hypot(pos[i] - pos[j], pos[i + 1] - pos[j + 1], pos[i + 2] - pos[j + 2])
+        if h_dist != h_dist:  # Knoten ohne Position (NaN)
+            h_dist = 0.0
 
-        level_diff = abs(a.level - b.level)
+        level_diff = abs(levels[idx] - levels[goal_idx])
         if level_diff == 0:
             return h_dist
 
@@ -67,7 +287,7 @@ class RoutingModel:
         # Treppen und Aufzüge im Generator haben Fixkosten (ca. 5.0 - 6.0).
         # Indem wir einen konservativen Fixwert addieren, 'weiß' der A*,
         # dass ein Wechsel niemals 'umsonst' ist.
-        fixed_entry_cost = 5.0
+        fixed_entry_cost = self.fixed_entry_cost
 
         # Aggressive, aber zulässige Schranke:
         # Wir addieren die Kosten pro Etagen-Differenz.
@@ -75,6 +295,106 @@ class RoutingModel:
 
     def heuristic_3d_only(self, idx: int, goal_idx: int) -> float:
         """Reine 3D-Luftlinie ohne Layer-Logik für die Baseline."""
-        a = self.g.routing_nodes[idx]
-        b = self.g.routing_nodes[goal_idx]
-        return math.dist(a.pos, b.pos) if (a.pos and b.pos) else 0.0
+        pos = self.g.node_pos
+        i, j = 3 * idx, 3 * goal_idx
+        d = math.hypot(pos[i] - pos[j], pos[i + 1] - pos[j + 1], pos[i + 2] - pos[j + 2])
+        return d if d == d else 0.0
+
+    def bind_goal(self, goal_idx: int, kind: str = "layered",
+                  block_size: int = 0) -> "GoalHeuristic":
+        """
+        Zielgebundene Heuristik: berechnet heuristic (kind="layered") bzw.
+        heuristic_3d_only (kind="3d") für alle Knoten in einem NumPy-Durchlauf,
+        oder mit block_size > 0 blockweise erst beim ersten Zugriff.
+        """
+        return GoalHeuristic(self, goal_idx, kind, block_size)
+
+
+    # -------- ALT (landmarks) -------
+
+    def prepare_landmarks(self, n_landmarks: int = 8,
+                          strategy: str = "avoid") -> LandmarkTable:
+        """
+        Berechnet die Landmark-Distanztabellen (oder holt sie aus dem Cache
+        am Graphen, falls ein Modell mit gleichen Gewichten sie schon hat).
+        """
+        # Auf lower_bound_weights: Sperren im Live-Overlay erfordern keine
+        # Neuberechnung, nur gesenkte Gewichte (anderer lower_bound_key)
+        self._landmark_params = (n_landmarks, strategy)
+        key = (self.lower_bound_key(), n_landmarks, strategy)
+        table = self.g.landmark_tables.get(key)
+        if table is None:
+            table = LandmarkTable(self.g, self.lower_bound_weights(), n_landmarks, strategy)
+            self.g.landmark_tables[key] = table
+        self.landmarks = table
+        return table
+
+    def heuristic_alt(self, idx: int, goal_idx: int) -> float:
+        """ALT-Schranke über alle Landmarks (zulässig und konsistent)."""
+        if self.landmarks is None:
+            self.prepare_landmarks(*self._landmark_params)
+        return self.landmarks.bound(idx, goal_idx)
+
+    def bind_alt(self, start_idx: int, goal_idx: int,
+                 n_active: int = 4) -> AltHeuristic:
+        """ALT-Heuristik für eine Anfrage, mit den n_active besten Landmarks."""
+        if self.landmarks is None:
+            self.prepare_landmarks(*self._landmark_params)
+        active = self.landmarks.select(start_idx, goal_idx, n_active)
+        return AltHeuristic(self.landmarks, goal_idx, active)
+
+
+class GoalHeuristic:
+    """
+    Heuristikwerte gegen ein festes Ziel, vektorisiert über das gepackte
+    Positions-/Level-Array des Graphen.
+
+    Aufrufbar wie model.heuristic(idx, goal_idx). Im Voll-Modus liegt die
+    Tabelle zusätzlich als Liste in `values`, die Suche indiziert dann direkt.
+    """
+
+    def __init__(self, model: RoutingModel, goal_idx: int,
+                 kind: str = "layered", block_size: int = 0):
+        if kind not in ("layered", "3d"):
+            raise ValueError(f"Unknown heuristic kind: {kind}")
+        g = model.g
+        self.goal_idx = goal_idx
+        self.block_size = block_size
+
+        self._pos = np.frombuffer(g.node_pos, dtype=np.float64).reshape(-1, 3)
+        self._levels = np.asarray(g.node_levels, dtype=np.float64)
+        self._goal_pos = self._pos[goal_idx]
+        self._goal_level = self._levels[goal_idx]
+        # Pro Etagen-Differenz (wie in RoutingModel.heuristic); 0 = reine 3D-Distanz
+        self._per_level = (
+            model.floor_transition_penalty + model.fixed_entry_cost
+            if kind == "layered" else 0.0
+        )
+
+        n = len(self._levels)
+        self.values: Optional[List[float]] = None
+        self._blocks: List[Optional[List[float]]] = []
+        if block_size <= 0:
+            self.values = self._compute(0, n)
+        else:
+            self._blocks = [None] * ((n + block_size - 1) // block_size)
+
+    def _compute(self, lo: int, hi: int) -> List[float]:
+        diff = self._pos[lo:hi] - self._goal_pos
+        h = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+        # Knoten ohne Position: keine Distanz-Schranke
+        h = np.nan_to_num(h, nan=0.0)
+        if self._per_level:
+            h += np.abs(self._levels[lo:hi] - self._goal_level) * self._per_level
+        return h.tolist()
+
+    def __call__(self, idx: int, goal_idx: int = -1) -> float:
+        if self.values is not None:
+            return self.values[idx]
+        b, off = divmod(idx, self.block_size)
+        block = self._blocks[b]
+        if block is None:
+            lo = b * self.block_size
+            block = self._compute(lo, min(lo + self.block_size, len(self._levels)))
+            self._blocks[b] = block
+        return block[off]
@@ -0,0 +1,339 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from BuildingGraph import BuildingGraph, PROFILES
+from RoutingModel import FLOOR_TRANSITION_PENALTY, RoutingModel
+from benchmark_core import building_files
+from graph_cache import load_cached
+from shortest_paths import one_to_many, tree_path
+
+# Antwort eines Workers pro Ziel: (Pfad als Indizes, Kosten) bzw. (None, None)
+Solution = Tuple[Optional[List[int]], Optional[float]]
+LATENCY_WINDOW = 10000  # Anzahl Anfragen für p50/p95/p99
+
+
+# --------------------------------------------------------
+# Worker-Seite (eigener Prozess oder Thread)
+# --------------------------------------------------------
+
+# Pro Worker geladene Gebäude: mit dem Binär-Cache (mmap) teilen sich alle
+# Prozesse die Seiten der CSR-Arrays
+_worker_paths: Dict[str, str] = {}
+_worker_models: Dict[Tuple[str, str], RoutingModel] = {}
+_worker_penalty = FLOOR_TRANSITION_PENALTY
+
+
+def _init_worker(paths: Dict[str, str], penalty: float):
+    global _worker_penalty
+    _worker_paths.update(paths)
+    _worker_penalty = penalty
+
+
+def _worker_model(building: str, profile: str) -> RoutingModel:
+    model = _worker_models.get((building, profile))
+    if model is None:
+        base = _worker_models.get((building, "default"))
+        if base is None:
+            graph = load_cached(_worker_paths[building], compact=True)
+            base = RoutingModel(graph, floor_transition_penalty=_worker_penalty)
+            _worker_models[(building, "default")] = base
+        model = base.for_profile(profile)
+        _worker_models[(building, profile)] = model
+    return model
+
+
+def solve_batch(building: str, profile: str, source: int, goals: List[int]) -> List[Solution]:
+    """
+    Alle Ziele einer Quelle mit einem one-to-many-Dijkstra (endet, sobald
+    alle Ziele abgeschlossen sind). Auch ein einzelnes Ziel läuft so: die
+    Kosten sind exakt und hängen nicht davon ab, ob zusammengefasst wurde.
+    """
+    model = _worker_model(building, profile)
+    graph = model.g
+    tree = one_to_many(graph, model, source, set(goals))
+    out = []
+    for goal in goals:
+        path = tree_path(tree, goal)
+        out.append((path, tree.dist[goal]) if path is not None else (None, None))
+    return out
+
+
+# --------------------------------------------------------
+# Service
+# --------------------------------------------------------
+
+class RoutingService:
+    """
+    Lokaler Routing-Dienst (asyncio, JSON-Lines über TCP).
+
+    Die kompilierten Gebäude bleiben geladen; Suchen laufen in einem
+    Worker-Pool (Prozesse, mit workers=0 ein Thread im selben Prozess).
+    Anfragen mit gleichem Gebäude, Profil und Start werden zu einer
+    one-to-many-Suche zusammengefasst: eine Gruppe sammelt mindestens
+    batch_window Sekunden und wartet danach, bis ein Worker frei ist und
+    keine Suche vom selben Start mehr läuft. Unter Last wachsen die Gruppen
+    dadurch von selbst, auch wenn mehr Worker frei sind als Starts gefragt
+    werden (dann würde das kurze Fenster allein kaum etwas sammeln).
+
+    Protokoll: eine JSON-Anfrage pro Zeile, eine Antwort pro Zeile
+    (Reihenfolge beliebig, Zuordnung über "id"):
+      {"id": 1, "building": "K3_s05_i0", "start": "corr_f0_1", "goal": "room_f2_7", "profile": "default"}
+      {"id": 2, "op": "metrics"}
+      {"id": 3, "op": "buildings"}
+      {"id": 4, "op": "sample", "building": "K3_s05_i0", "k": 100, "seed": 0}
+    """
+
+    def __init__(self, buildings_dir: str, workers: Optional[int] = None,
+                 batch_window: float = 0.002, max_queue: int = 10000,
+                 penalty: float = FLOOR_TRANSITION_PENALTY):
+        self.paths = {p.stem: str(p) for p in sorted(building_files(buildings_dir))}
+        self.batch_window = batch_window
+        self.max_queue = max_queue
+        self.penalty = penalty
+        # Im Hauptprozess nur für ID <-> Index (mmap, ohne RoutingModel)
+        self.graphs: Dict[str, BuildingGraph] = {}
+
+        if workers == 0:
+            _init_worker(self.paths, penalty)
+            self.pool: Executor = ThreadPoolExecutor(max_workers=1)
+            self.slots = 1
+        else:
+            self.slots = workers or os.cpu_count() or 1
+            self.pool = ProcessPoolExecutor(max_workers=self.slots, initializer=_init_worker,
+                                            initargs=(self.paths, penalty))
+
+        # (Gebäude, Profil, Start) -> wartende (Ziel, Future)
+        self._pending: Dict[Tuple[str, str, int], List[Tuple[int, asyncio.Future]]] = {}
+        # Gruppen, deren Sammelzeit abgelaufen ist, in Ankunftsreihenfolge
+        self._ready: deque = deque()
+        # Starts mit laufender Suche (höchstens eine pro Schlüssel)
+        self._running: Set[Tuple[str, str, int]] = set()
+        self.inflight = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._started = time.perf_counter()
+
+    def graph(self, building: str) -> BuildingGraph:
+        graph = self.graphs.get(building)
+        if graph is None:
+            if building not in self.paths:
+                raise KeyError(f"Unknown building: {building}")
+            graph = load_cached(self.paths[building], compact=True)
+            self.graphs[building] = graph
+        return graph
+
+    # ----------------- Anfragen -----------------
+
+    async def route(self, building: str, start_id: str, goal_id: str,
+                    profile: str = "default") -> Tuple[Optional[List[str]], Optional[float], int]:
+        """(Pfad-IDs, Kosten, Größe des Batches, in dem die Anfrage gelöst wurde)."""
+        if profile != "default" and profile not in PROFILES:
+            raise ValueError(f"Unknown routing profile: {profile}")
+        graph = self.graph(building)
+        start, goal = graph.idx(start_id), graph.idx(goal_id)
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise RuntimeError("Service overloaded, retry later.")
+
+        key = (building, profile, start)
+        fut = asyncio.get_running_loop().create_future()
+        waiting = self._pending.get(key)
+        if waiting is None:
+            self._pending[key] = waiting = []
+            loop = asyncio.get_running_loop()
+            if self.batch_window > 0:
+                loop.call_later(self.batch_window, self._mark_ready, key)
+            else:
+                loop.call_soon(self._mark_ready, key)
+        else:
+            self.coalesced += 1
+        waiting.append((goal, fut))
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            path, cost, batch = await fut
+        finally:
+            self.queue_depth -= 1
+        return ([graph.id(i) for i in path] if path is not None else None), cost, batch
+
+    def _mark_ready(self, key: Tuple[str, str, int]):
+        self._ready.append(key)
+        self._dispatch()
+
+    def _dispatch(self):
+        # Höchstens ein Job pro Worker und einer pro Start: der Rest sammelt
+        # weiter in _pending
+        blocked = deque()
+        while self._ready and self.inflight < self.slots:
+            key = self._ready.popleft()
+            if key in self._running:
+                blocked.append(key)
+            else:
+                self._flush(key)
+        blocked.extend(self._ready)
+        self._ready = blocked
+
+    def _flush(self, key: Tuple[str, str, int]):
+        waiting = self._pending.pop(key)
+        building, profile, start = key
+        self.batches += 1
+        self.inflight += 1
+        self._running.add(key)
+        goals = list(dict.fromkeys(goal for goal, _ in waiting))
+        job = asyncio.get_running_loop().run_in_executor(
+            self.pool, solve_batch, building, profile, start, goals)
+
+        def done(job_fut: asyncio.Future):
+            self.inflight -= 1
+            self._running.discard(key)
+            self._dispatch()
+            try:
+                by_goal = dict(zip(goals, job_fut.result()))
+            except Exception as exc:  # Worker-Fehler an alle Wartenden weitergeben
+                for _, fut in waiting:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                return
+            for goal, fut in waiting:
+                if not fut.done():
+                    fut.set_result((*by_goal[goal], len(waiting)))
+
+        job.add_done_callback(done)
+
+    async def handle(self, request: Dict) -> Dict:
+        """Beantwortet eine dekodierte Anfrage (auch ohne Netzwerk nutzbar)."""
+        rid = request.get("id")
+        op = request.get("op", "route")
+        t0 = time.perf_counter()
+        try:
+            if op == "route":
+                self.requests += 1
+                path, cost, batch = await self.route(request["building"], request["start"],
+                                                     request["goal"], request.get("profile", "default"))
+                latency = time.perf_counter() - t0
+                self._latencies.append(latency)
+                return {"id": rid, "path": path, "cost": cost, "batch": batch,
+                        "latency_ms": latency * 1000}
+            if op == "metrics":
+                return {"id": rid, "metrics": self.metrics()}
+            if op == "buildings":
+                return {"id": rid, "buildings": list(self.paths)}
+            if op == "sample":
+                graph = self.graph(request["building"])
+                rnd = random.Random(request.get("seed", 0))
+                k = min(int(request.get("k", 100)), graph.num_nodes())
+                return {"id": rid, "nodes": [graph.id(i) for i in rnd.sample(range(graph.num_nodes()), k)]}
+            raise ValueError(f"Unknown op: {op}")
+        except Exception as exc:
+            self.errors += 1
+            return {"id": rid, "error": f"{type(exc).__name__}: {exc}"}
+
+    def metrics(self) -> Dict[str, float]:
+        lat = np.asarray(self._latencies, dtype=np.float64) * 1000
+        p50, p95, p99 = np.percentile(lat, [50, 95, 99]) if len(lat) else (0.0, 0.0, 0.0)
+        uptime = time.perf_counter() - self._started
+        return {
+            "uptime_s": uptime,
+            "requests": self.requests,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "coalesced": self.coalesced,
+            "queue_depth": self.queue_depth,
+            "inflight_batches": self.inflight,
+            "max_queue_depth": self.max_queue_depth,
+            "latency_p50_ms": float(p50),
+            "latency_p95_ms": float(p95),
+            "latency_p99_ms": float(p99),
+            "requests_per_s": self.requests / uptime if uptime > 0 else 0.0,
+            "buildings_loaded": len(self.graphs),
+        }
+
+    # ----------------- Netzwerk -----------------
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks = set()
+
+        async def answer(line: bytes):
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object.")
+            except ValueError as exc:
+                self.errors += 1
+                response = {"id": None, "error": f"Invalid request: {exc}"}
+            else:
+                response = await self.handle(request)
+            writer.write(json.dumps(response, separators=(",", ":")).encode("utf8") + b"\n")
+
+        try:
+            # Anfragen einer Verbindung werden nebenläufig beantwortet (Pipelining)
+            while line := await reader.readline():
+                if line.strip():
+                    task = asyncio.create_task(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                await writer.drain()
+            if tasks:
+                await asyncio.gather(*tasks)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # Herunterfahren bei offener Verbindung: still beenden (asyncio < 3.12
+            # meldet sonst pro Verbindung einen Traceback im Stream-Callback)
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        """Startet den Server (port=0: freier Port, siehe server.sockets)."""
+        return await asyncio.start_server(self._client, host, port, limit=1 << 20)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        server = await self.start(host, port)
+        print(f"Routing-Dienst: {len(self.paths)} Gebäude, {host}:{port} (JSON-Lines)")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Lokaler Routing-Dienst (asyncio, JSON-Lines)")
+    ap.add_argument("--dir", default="generated_buildings")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=None, help="Prozesse (0: Thread im Dienst)")
+    ap.add_argument("--batch-window", type=float, default=0.002, help="Sekunden zum Sammeln gleicher Starts")
+    ap.add_argument("--max-queue", type=int, default=10000)
+    ap.add_argument("--penalty", type=float, default=FLOOR_TRANSITION_PENALTY, help="floor_transition_penalty")
+    args = ap.parse_args()
+
+    service = RoutingService(args.dir, args.workers, args.batch_window, args.max_queue, args.penalty)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
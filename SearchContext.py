@@ -0,0 +1,100 @@
+from array import array
+from typing import List
+from weakref import WeakKeyDictionary
+
+from BuildingGraph import BuildingGraph
+from custom_dataclasses import SearchStats
+
+INF = float("inf")
+
+# Ein Kontext pro Graph, wird von allen Suchen auf diesem Graphen geteilt
+_contexts: "WeakKeyDictionary[BuildingGraph, SearchContext]" = WeakKeyDictionary()
+
+
+class SearchContext:
+    """
+    Wiederverwendbarer Suchzustand (g-Werte, Vorgänger) mit Epochen-Stempeln.
+
+    Die Arrays werden einmal pro Graph angelegt. Ein Eintrag gilt nur, wenn
+    sein Stempel der aktuellen Epoche entspricht; reset() erhöht nur die
+    Epoche und kostet damit O(1) statt O(|V|).
+
+    Zähler der letzten Suche:
+      expanded      – Expansionen (inkl. Ziel und Wieder-Expansionen)
+      pushes        – Einträge in die Open-List
+      stale_pops    – veraltete Einträge (g über dem aktuellen g), übersprungen
+      reexpansions  – erneute Expansionen bereits geschlossener Knoten nach
+                      einer g-Verbesserung (Hinweis auf eine inkonsistente
+                      Heuristik)
+    """
+
+    def __init__(self, n_nodes: int):
+        self.n_nodes = n_nodes
+        self.g = array("d", [INF]) * n_nodes
+        self.parent = array("l", [-1]) * n_nodes
+        self.stamp = array("L", [0]) * n_nodes
+        self.closed = array("L", [0]) * n_nodes
+        self.epoch = 0
+
+        self.expanded = 0
+        self.pushes = 0
+        self.stale_pops = 0
+        self.reexpansions = 0
+
+    @classmethod
+    def for_graph(cls, graph: BuildingGraph) -> "SearchContext":
+        """Gibt den (gecachten) Kontext für einen kompilierten Graphen zurück."""
+        n = graph.num_nodes()
+        ctx = _contexts.get(graph)
+        if ctx is None or ctx.n_nodes != n:
+            ctx = cls(n)
+            _contexts[graph] = ctx
+        return ctx
+
+    def reset(self):
+        """Startet eine neue Suche."""
+        self.epoch += 1
+        if self.epoch > 0xFFFFFFFF:
+            # Überlauf des Stempel-Typs: einmalig alles zurücksetzen
+            self.stamp = array("L", [0]) * self.n_nodes
+            self.closed = array("L", [0]) * self.n_nodes
+            self.epoch = 1
+
+        self.expanded = 0
+        self.pushes = 0
+        self.stale_pops = 0
+        self.reexpansions = 0
+
+    # ----------------- Zugriff -----------------
+
+    def g_of(self, idx: int) -> float:
+        return self.g[idx] if self.stamp[idx] == self.epoch else INF
+
+    def set_g(self, idx: int, value: float, parent: int = -1):
+        self.g[idx] = value
+        self.parent[idx] = parent
+        self.stamp[idx] = self.epoch
+
+    def touched(self, idx: int) -> bool:
+        return self.stamp[idx] == self.epoch
+
+    def is_closed(self, idx: int) -> bool:
+        return self.closed[idx] == self.epoch
+
+    def stats(self) -> SearchStats:
+        return SearchStats(
+            expanded=self.expanded,
+            pushes=self.pushes,
+            stale_pops=self.stale_pops,
+            reexpansions=self.reexpansions,
+        )
+
+    def path_to(self, idx: int) -> List[int]:
+        """Rekonstruiert den Pfad (Indizes) vom Start bis idx."""
+        path = [idx]
+        parent = self.parent
+        while parent[idx] != -1:
+            idx = parent[idx]
+            path.append(idx)
+        path.reverse()
+        return path
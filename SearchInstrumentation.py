@@ -0,0 +1,215 @@
+from array import array
+from collections import Counter
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from BuildingGraph import BuildingGraph
+
+# Ereignis-Codes (kompakte Traces, siehe TraceRecorder)
+EV_POP, EV_STALE, EV_EXPAND, EV_RELAX, EV_PUSH, EV_GOAL = range(6)
+EVENT_NAMES = ("pop", "stale", "expand", "relax", "push", "goal")
+
+
+class SearchObserver:
+    """
+    Schnittstelle für Such-Ereignisse (astar_search(..., observer=...)).
+
+    Ohne Observer kostet jeder Hook in astar_search nur die Prüfung eines
+    lokalen Flags; mit Observer wird pro Ereignis die passende Methode
+    aufgerufen. Alle Methoden sind hier No-ops, Unterklassen überschreiben
+    nur, was sie brauchen.
+    """
+
+    def on_start(self, start_idx: int, goal_idx: int):
+        pass
+
+    def on_pop(self, idx: int, f: float):
+        """Eintrag aus der Open-List entnommen (noch vor der Prüfung auf veraltet)."""
+
+    def on_stale(self, idx: int):
+        """Veralteter Eintrag, g über dem aktuellen g des Knotens (Lazy Deletion)."""
+
+    def on_expand(self, idx: int, g: float):
+        pass
+
+    def on_relax(self, fr_idx: int, to_idx: int, slot: int, g: float):
+        """g-Wert von to_idx über Slot slot verbessert."""
+
+    def on_push(self, idx: int, f: float):
+        pass
+
+    def on_goal(self, idx: int, cost: float):
+        pass
+
+    def on_finish(self, cost):
+        """Ende der Suche (cost None: Ziel nicht erreichbar)."""
+
+
+class CompositeObserver(SearchObserver):
+    """Verteilt jedes Ereignis an mehrere Observer."""
+
+    def __init__(self, observers: Sequence[SearchObserver]):
+        self.observers = list(observers)
+
+    def on_start(self, start_idx, goal_idx):
+        for o in self.observers:
+            o.on_start(start_idx, goal_idx)
+
+    def on_pop(self, idx, f):
+        for o in self.observers:
+            o.on_pop(idx, f)
+
+    def on_stale(self, idx):
+        for o in self.observers:
+            o.on_stale(idx)
+
+    def on_expand(self, idx, g):
+        for o in self.observers:
+            o.on_expand(idx, g)
+
+    def on_relax(self, fr_idx, to_idx, slot, g):
+        for o in self.observers:
+            o.on_relax(fr_idx, to_idx, slot, g)
+
+    def on_push(self, idx, f):
+        for o in self.observers:
+            o.on_push(idx, f)
+
+    def on_goal(self, idx, cost):
+        for o in self.observers:
+            o.on_goal(idx, cost)
+
+    def on_finish(self, cost):
+        for o in self.observers:
+            o.on_finish(cost)
+
+
+# --------------------------------------------------------
+# Eingebaute Collectors
+# --------------------------------------------------------
+
+class EventCounter(SearchObserver):
+    """Zählt alle Ereignisse (über mehrere Suchen kumulativ, reset() setzt zurück)."""
+
+    def __init__(self):
+        self.counts = [0] * len(EVENT_NAMES)
+        self.searches = 0
+
+    def reset(self):
+        self.counts = [0] * len(EVENT_NAMES)
+        self.searches = 0
+
+    def on_start(self, start_idx, goal_idx):
+        self.searches += 1
+
+    def on_pop(self, idx, f):
+        self.counts[EV_POP] += 1
+
+    def on_stale(self, idx):
+        self.counts[EV_STALE] += 1
+
+    def on_expand(self, idx, g):
+        self.counts[EV_EXPAND] += 1
+
+    def on_relax(self, fr_idx, to_idx, slot, g):
+        self.counts[EV_RELAX] += 1
+
+    def on_push(self, idx, f):
+        self.counts[EV_PUSH] += 1
+
+    def on_goal(self, idx, cost):
+        self.counts[EV_GOAL] += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(zip(EVENT_NAMES, self.counts))
+
+
+class LevelHistogram(SearchObserver):
+    """Expansionen pro Level (wo verbringt die Suche ihre Zeit?)."""
+
+    def __init__(self, graph: BuildingGraph):
+        self.levels = graph.node_levels
+        self.expanded: Counter = Counter()
+
+    def on_expand(self, idx, g):
+        self.expanded[self.levels[idx]] += 1
+
+    def as_dict(self) -> Dict[int, int]:
+        return dict(sorted(self.expanded.items()))
+
+
+class ExpansionCounter(SearchObserver):
+    """Expansionen pro Knoten über beliebig viele Suchen (für visualize.render_heatmap)."""
+
+    def __init__(self, graph: BuildingGraph):
+        self.counts = array("L", [0]) * graph.num_nodes()
+        self.searches = 0
+
+    def on_start(self, start_idx, goal_idx):
+        self.searches += 1
+
+    def on_expand(self, idx, g):
+        self.counts[idx] += 1
+
+
+class TraceRecorder(SearchObserver):
+    """
+    Zeichnet die Ereignisse der letzten Suche kompakt auf, als parallele
+    arrays: Code, Knoten, Wert (f bzw. g) und Vorgänger (nur bei Relax,
+    sonst -1). Grundlage für visualize.render_trace.
+    """
+
+    def __init__(self, record_relax: bool = True):
+        self.record_relax = record_relax
+        self.start_idx = -1
+        self.goal_idx = -1
+        self.cost = None
+        self._clear()
+
+    def _clear(self):
+        self.codes = array("B")
+        self.nodes = array("l")
+        self.values = array("d")
+        self.parents = array("l")
+
+    def _add(self, code, idx, value, parent=-1):
+        self.codes.append(code)
+        self.nodes.append(idx)
+        self.values.append(value)
+        self.parents.append(parent)
+
+    def on_start(self, start_idx, goal_idx):
+        self._clear()
+        self.start_idx, self.goal_idx, self.cost = start_idx, goal_idx, None
+
+    def on_pop(self, idx, f):
+        self._add(EV_POP, idx, f)
+
+    def on_stale(self, idx):
+        self._add(EV_STALE, idx, 0.0)
+
+    def on_expand(self, idx, g):
+        self._add(EV_EXPAND, idx, g)
+
+    def on_relax(self, fr_idx, to_idx, slot, g):
+        if self.record_relax:
+            self._add(EV_RELAX, to_idx, g, fr_idx)
+
+    def on_push(self, idx, f):
+        self._add(EV_PUSH, idx, f)
+
+    def on_goal(self, idx, cost):
+        self._add(EV_GOAL, idx, cost)
+
+    def on_finish(self, cost):
+        self.cost = cost
+
+    def __len__(self):
+        return len(self.codes)
+
+    def events(self) -> Iterator[Tuple[str, int, float, int]]:
+        """(Ereignis, Knoten, Wert, Vorgänger) in Aufzeichnungsreihenfolge."""
+        for code, idx, value, parent in zip(self.codes, self.nodes, self.values, self.parents):
+            yield EVENT_NAMES[code], idx, value, parent
+
+    def expansion_order(self) -> List[int]:
+        return [idx for code, idx in zip(self.codes, self.nodes) if code == EV_EXPAND]
@@ -0,0 +1,94 @@
+import random
+import statistics
+import time
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from ContractionHierarchy import ContractionHierarchy
+from SearchContext import SearchContext
+from benchmark_core import building_files, load_building
+from layered_a_star_ChatGPT import astar_search
+from shortest_paths import one_to_many
+
+
+def run_ch_benchmark(buildings_dir, queries_per_building=20, seed=0):
+    """
+    Contraction Hierarchies vs. Layered A* pro Gebäudeklasse (K1–K5):
+    Vorverarbeitungszeit, Anzahl Shortcuts und Beschleunigung der Anfragen.
+    Die CH-Kosten werden gegen Dijkstra (one_to_many) geprüft, nicht gegen
+    Layered A* (dessen Heuristik ist nicht zulässig).
+    """
+    rnd = random.Random(seed)
+    rows = []
+
+    for file in sorted(building_files(buildings_dir)):
+        graph, model = load_building(str(file))
+        ch = ContractionHierarchy(graph, model)
+        ctx = SearchContext.for_graph(graph)
+        n_nodes = graph.num_nodes()
+
+        t_astar, t_ch, mismatches = [], [], 0
+        for _ in range(queries_per_building):
+            si, gi = rnd.sample(range(n_nodes), 2)
+
+            t0 = time.perf_counter()
+            a_cost = astar_search(graph, model, si, gi, context=ctx)
+            t_astar.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            ch_cost, _ = ch.query_idx(si, gi)
+            t_ch.append(time.perf_counter() - t0)
+
+            exact = one_to_many(graph, model, si, [gi]).dist[gi]
+            if (ch_cost is None) != (exact == float("inf")) or (
+                    ch_cost is not None and abs(ch_cost - exact) > 1e-9):
+                mismatches += 1
+
+        rows.append({
+            "Class": file.name.split('_')[0],
+            "n_nodes": n_nodes,
+            "preprocess_s": ch.preprocess_s,
+            "shortcuts": ch.n_shortcuts,
+            "shortcuts_per_edge": ch.n_shortcuts / max(1, graph.num_edges()),
+            "speedup": statistics.mean(t_astar) / max(statistics.mean(t_ch), 1e-12),
+            "mismatches": mismatches,
+        })
+
+    if not rows:
+        print(f"Keine Gebäude in {buildings_dir} gefunden.")
+        return pd.DataFrame()
+
+    df = pd.DataFrame(rows)
+    stats = df.groupby("Class").agg(
+        preprocess_s=("preprocess_s", "mean"),
+        shortcuts=("shortcuts", "mean"),
+        shortcuts_per_edge=("shortcuts_per_edge", "mean"),
+        speedup=("speedup", "mean"),
+        mismatches=("mismatches", "sum"),
+    )
+
+    print("\n" + "=" * 70)
+    print("CONTRACTION HIERARCHIES VS. LAYERED A*")
+    print("=" * 70)
+    print(stats.round(3).to_string())
+    print("-" * 70)
+    print("mismatches: CH-Kosten != Dijkstra-Kosten oder abweichende Erreichbarkeit (sollte 0 sein)")
+    print("=" * 70 + "\n")
+
+    plt.figure(figsize=(10, 6))
+    stats['speedup'].plot(kind='barh', color='steelblue', edgecolor='black')
+    plt.title("Ø Beschleunigung der Anfragen durch CH pro Klasse", fontsize=14)
+    plt.xlabel("Faktor (A*-Zeit / CH-Zeit)")
+    plt.ylabel("Gebäudeklasse")
+    plt.grid(axis='x', linestyle='--', alpha=0.6)
+    plt.tight_layout()
+    plt.savefig("ch_speedup.png", dpi=300)
+    plt.show()
+
+    return stats
+
+
+if __name__ == "__main__":
+    data_dir = "generated_buildings"
+    run_ch_benchmark(data_dir, queries_per_building=20)
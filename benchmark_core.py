@@ -1,13 +1,19 @@
-import json
+import hashlib
 import random
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from heapq import heappush, heappop
 from typing import Dict, List, Tuple, Callable, Optional
 
+import numpy as np
+
 from BuildingGraph import BuildingGraph
+from ResultStore import ResultStore
 from RoutingModel import RoutingModel
-from custom_dataclasses import Node, Edge, Meta
+from SearchContext import SearchContext
+from SearchInstrumentation import SearchObserver
+from graph_cache import load_cached, source_digest
+from layered_a_star_ChatGPT import astar_search, bidirectional_astar_search
 
 
 # --------------------------------------------------------
@@ -19,39 +25,30 @@ def run_astar(
         model: RoutingModel,
         start_idx: int,
         goal_idx: int,
-        heuristic_fn: Callable[[int, int], float]
+        heuristic_fn: Callable[[int, int], float],
+        observer: Optional[SearchObserver] = None
 ) -> Tuple[int, float]:
     """
     Führt A* aus und gibt (Anzahl expandierter Knoten, Pfadkosten) zurück.
+    Nutzt denselben Suchkern wie layered_a_star (astar_search); Details
+    (Level-Histogramm, Trace, ...) über einen observer aus SearchInstrumentation.
     """
-    open_set = []
-    heappush(open_set, (0.0, start_idx))
-
-    g_score = {start_idx: 0.0}
-    closed_set = set()
-    expanded_count = 0
-
-    while open_set:
-        _, current = heappop(open_set)
-        if current in closed_set: continue
-
-        expanded_count += 1
-        closed_set.add(current)
-
-        if current == goal_idx:
-            # Hier geben wir nun beides zurück: Effizienz und Qualität
-            return expanded_count, g_score[goal_idx]
-
-        for edge in graph.neighbors(current):
-            neighbor = edge.target
-            tentative_g = g_score[current] + model.edge_cost(current, edge)
+    ctx = SearchContext.for_graph(graph)
+    cost = astar_search(graph, model, start_idx, goal_idx, heuristic_fn, ctx, observer=observer)
+    # Hier geben wir nun beides zurück: Effizienz und Qualität
+    return ctx.expanded, (cost if cost is not None else float('inf'))
 
-            if tentative_g < g_score.get(neighbor, float("inf")):
-                g_score[neighbor] = tentative_g
-                f_score = tentative_g + heuristic_fn(neighbor, goal_idx)
-                heappush(open_set, (f_score, neighbor))
 
-    return expanded_count, float('inf')
+def run_bidirectional_astar(
+        graph: BuildingGraph,
+        model: RoutingModel,
+        start_idx: int,
+        goal_idx: int,
+        heuristic_fn: Callable[[int, int], float]
+) -> Tuple[int, float]:
+    """Wie run_astar, aber mit bidirektionalem A* (expandierte Knoten beider Richtungen)."""
+    cost, _, expanded = bidirectional_astar_search(graph, model, start_idx, goal_idx, heuristic_fn)
+    return expanded, (cost if cost is not None else float('inf'))
 
 
 # --------------------------------------------------------
@@ -61,12 +58,13 @@ def run_astar(
 def get_baseline_heuristic(graph: BuildingGraph):
     """Gibt eine reine 3D-Distanz Funktion zurück (Baseline)."""
 
+    # Positionen aus dem gepackten Array (keine RoutingNode-Objekte nötig)
+    pos = graph.node_pos
+
     def h(idx, goal_idx):
-        a = graph.routing_nodes[idx]
-        b = graph.routing_nodes[goal_idx]
-        if a.pos and b.pos:
-            return math.dist(a.pos, b.pos)
-        return 0.0
+        i, j = 3 * idx, 3 * goal_idx
+        d = math.hypot(pos[i] - pos[j], pos[i + 1] - pos[j + 1], pos[i + 2] - pos[j + 2])
+        return d if d == d else 0.0
 
     return h
 
@@ -75,78 +73,199 @@ def get_baseline_heuristic(graph: BuildingGraph):
 # Hilfsfunktionen
 # --------------------------------------------------------
 
-def load_building(filepath: str) -> Tuple[BuildingGraph, RoutingModel]:
-    with open(filepath, "r", encoding="utf8") as f:
-        data = json.load(f)
+BENCHMARK_PENALTY = 10.0
+MANIFEST_NAME = "manifest.json"  # siehe generator.main
 
-    meta = Meta(**data["meta"])
-    nodes = {n["id"]: Node(id=n["id"], type=n["type"], level=n["level"],
-                           pos=tuple(n["pos"]) if n.get("pos") else None,
-                           attrs=n.get("attrs", {}), name=n.get("name"))
-             for n in data["nodes"]}
-    edges = [Edge(a=e["a"], b=e["b"], weight=e["weight"], attrs=e.get("attrs", {}))
-             for e in data["edges"]]
 
-    graph = BuildingGraph(meta, nodes, edges)
-    graph.compile_for_routing()
+def load_building(filepath: str) -> Tuple[BuildingGraph, RoutingModel]:
+    # Kompilierter Graph aus dem Binär-Cache neben der JSON-Datei
+    # (wird beim ersten Lauf bzw. nach Änderungen der JSON-Datei neu erzeugt)
+    graph = load_cached(filepath, compact=True)
 
     # Standard-Konfiguration für Benchmarks
-    model = RoutingModel(graph, floor_transition_penalty=10.0)
+    model = RoutingModel(graph, floor_transition_penalty=BENCHMARK_PENALTY)
     return graph, model
 
 
-import math  # Für math.dist in der Baseline
+import math  # Für math.hypot in der Baseline
+
+
+# Versionen der gemessenen Algorithmen: erhöhen, wenn sich Suche oder
+# Heuristik ändern, damit gecachte Ergebnisse (ResultStore) neu berechnet werden
+ALGORITHM_VERSIONS = {
+    "baseline": 2,
+    "layered": 2,
+    "alt": 2,
+    "bidirectional": 2,
+}
+
+
+def building_files(buildings_dir: str) -> List[Path]:
+    """Gebäude-JSONs eines Verzeichnisses (ohne das Manifest des Generators)."""
+    return [f for f in Path(buildings_dir).glob("*.json") if f.name != MANIFEST_NAME]
+
+
+def building_seed(file_name: str, seed: int = 0) -> int:
+    """Deterministischer Seed pro Gebäude (unabhängig von Reihenfolge und Prozess)."""
+    digest = hashlib.sha256(f"{seed}:{file_name}".encode("utf8")).digest()
+    return int.from_bytes(digest[:8], "little")
 
 
 def collect_benchmark_data(
         buildings_dir: str,
         pairs_per_building: int = 20,
-        force_different_floors: float = 0.8
+        force_different_floors: float = 0.8,
+        with_alt: bool = False,
+        with_bidirectional: bool = False,
+        workers: int = 1,
+        seed: int = 0,
+        cache_dir: Optional[str] = None
 ) -> Dict[str, Dict]:
     """
     Erhebt Daten pro Gebäude.
     Rückgabe: { "dateiname": { "n_nodes": int, "n_floors": int, "baseline": [], "layered": [] } }
+    Mit with_alt=True zusätzlich "alt": [] (Landmark-Heuristik) und
+    "alt_preprocess_s" (Vorberechnungszeit der Landmark-Tabellen).
+    Mit with_bidirectional=True zusätzlich "bidirectional": [] (bidirektionaler
+    A* mit ALT-Potentialen, die Layered-Heuristik ist dafür nicht konsistent).
+
+    Die Anfragepaare jedes Gebäudes kommen aus einem eigenen Zufallsgenerator
+    (building_seed aus Dateiname und seed), die Ergebnisse sind daher
+    reproduzierbar und unabhängig von workers. Mit workers > 1 werden die
+    Gebäude auf einen Prozess-Pool verteilt (workers=None: alle Kerne).
+
+    Mit cache_dir werden die Rohmessungen in einem ResultStore abgelegt;
+    berechnet wird nur, was für (Gebäudeinhalt, Algorithmus-Version,
+    Parameter) dort noch fehlt.
     """
+    files = building_files(buildings_dir)
+    args = (pairs_per_building, force_different_floors, with_alt, with_bidirectional, seed, cache_dir)
+
+    if workers == 1 or len(files) <= 1:
+        return {file.name: _benchmark_building(str(file), *args) for file in files}
+
+    # Große Gebäude zuerst einreichen, damit am Ende kein Nachzügler übrig bleibt
+    by_size = sorted(files, key=lambda f: f.stat().st_size, reverse=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {f.name: pool.submit(_benchmark_building, str(f), *args) for f in by_size}
+        # Gleiche Reihenfolge wie im sequentiellen Modus
+        return {file.name: futures[file.name].result() for file in files}
+
+
+def _benchmark_building(
+        filepath: str,
+        pairs_per_building: int,
+        force_different_floors: float,
+        with_alt: bool,
+        with_bidirectional: bool,
+        seed: int,
+        cache_dir: Optional[str] = None
+) -> Dict:
+    """Messungen für ein Gebäude (läuft ggf. in einem Worker-Prozess)."""
+    name = Path(filepath).name
+    b_seed = building_seed(name, seed)
+    algorithms = ["baseline", "layered"]
+    if with_alt:
+        algorithms.append("alt")
+    if with_bidirectional:
+        algorithms.append("bidirectional")
+
+    store, keys, found = None, {}, {}
+    if cache_dir is not None:
+        store = ResultStore(cache_dir)
+        digest = source_digest(filepath)
+        params = (pairs_per_building, force_different_floors, b_seed, BENCHMARK_PENALTY)
+        for algo in algorithms:
+            keys[algo] = store.key(digest, algo, ALGORITHM_VERSIONS[algo], params)
+            entry = store.get(keys[algo])
+            if entry is not None:
+                found[algo] = entry
+
+    missing = [algo for algo in algorithms if algo not in found]
+    if missing:
+        computed = _measure_building(filepath, missing, pairs_per_building,
+                                     force_different_floors, b_seed)
+        for algo, (columns, meta) in computed.items():
+            meta["name"] = name
+            if store is not None:
+                store.put(keys[algo], columns, meta)
+            found[algo] = (columns, meta)
+
+    meta = found[algorithms[0]][1]
+    result = {
+        "n_nodes": int(meta["n_nodes"]),
+        "n_floors": int(meta["n_floors"]),
+    }
+    for algo in algorithms:
+        columns, algo_meta = found[algo]
+        result[algo] = list(zip(columns["expanded"].tolist(), columns["cost"].tolist()))
+        if "preprocess_s" in algo_meta:
+            result[f"{algo}_preprocess_s"] = float(algo_meta["preprocess_s"])
+    return result
+
+
+def _measure_building(
+        filepath: str,
+        algorithms: List[str],
+        pairs_per_building: int,
+        force_different_floors: float,
+        b_seed: int
+) -> Dict[str, Tuple[Dict[str, np.ndarray], Dict[str, float]]]:
+    """Führt die Anfragen für die gegebenen Algorithmen aus: {Algorithmus: (Spalten, Metadaten)}."""
+    graph, model = load_building(filepath)
+    node_ids = graph.node_ids
+    rnd = random.Random(b_seed)
+
+    # Sampling-Vorbereitung
+    nodes_by_lvl = {}
+    for nid, lvl in zip(node_ids, graph.node_levels):
+        nodes_by_lvl.setdefault(lvl, []).append(nid)
+    levels = list(nodes_by_lvl.keys())
+
+    # Paare zuerst ziehen: gleiche Paare, egal welche Algorithmen fehlen
+    pairs = []
+    for _ in range(pairs_per_building):
+        if len(levels) > 1 and rnd.random() < force_different_floors:
+            l1, l2 = rnd.sample(levels, 2)
+            s_id, g_id = rnd.choice(nodes_by_lvl[l1]), rnd.choice(nodes_by_lvl[l2])
+        else:
+            s_id, g_id = rnd.sample(node_ids, 2)
+        pairs.append((graph.idx(s_id), graph.idx(g_id)))
+
+    # Heuristiken (Layered Heuristik aus dem Modell nutzen)
+    h_baseline = get_baseline_heuristic(graph)
+    h_layered = model.heuristic
+
+    # Metadaten extrahieren (n_floors: Anzahl Etagen aus dem BuildingGraph)
+    base_meta = {"n_nodes": graph.num_nodes(), "n_floors": len(graph.level_index), "seed": b_seed}
     results = {}
-    path = Path(buildings_dir)
-
-    for file in path.glob("*.json"):
-        graph, model = load_building(str(file))
-        node_ids = list(graph.raw_nodes.keys())
-
-        # Metadaten extrahieren
-        n_nodes = len(node_ids)
-        n_floors = len(graph.level_index)  # Anzahl Etagen aus dem BuildingGraph
-
-        results[file.name] = {
-            "n_nodes": n_nodes,
-            "n_floors": n_floors,
-            "baseline": [],
-            "layered": []
-        }
-
-        # Sampling-Vorbereitung
-        nodes_by_lvl = {}
-        for nid in node_ids:
-            lvl = graph.raw_nodes[nid].level
-            nodes_by_lvl.setdefault(lvl, []).append(nid)
-        levels = list(nodes_by_lvl.keys())
-
-        # Heuristiken (Layered Heuristik aus dem Modell nutzen)
-        h_baseline = get_baseline_heuristic(graph)
-        h_layered = model.heuristic
-
-        for _ in range(pairs_per_building):
-            if len(levels) > 1 and random.random() < force_different_floors:
-                l1, l2 = random.sample(levels, 2)
-                s_id, g_id = random.choice(nodes_by_lvl[l1]), random.choice(nodes_by_lvl[l2])
+    for algo in algorithms:
+        meta = dict(base_meta)
+        if algo in ("alt", "bidirectional"):
+            t0 = time.perf_counter()
+            model.prepare_landmarks()
+            meta["preprocess_s"] = time.perf_counter() - t0
+
+        expanded, costs, wall = [], [], []
+        for si, gi in pairs:
+            t0 = time.perf_counter()
+            if algo == "baseline":
+                exp, cost = run_astar(graph, model, si, gi, h_baseline)
+            elif algo == "layered":
+                exp, cost = run_astar(graph, model, si, gi, h_layered)
+            elif algo == "alt":
+                exp, cost = run_astar(graph, model, si, gi, model.bind_alt(si, gi))
             else:
-                s_id, g_id = random.sample(node_ids, 2)
-
-            si, gi = graph.idx(s_id), graph.idx(g_id)
-
-            # Messungen durchführen
-            results[file.name]["baseline"].append(run_astar(graph, model, si, gi, h_baseline))
-            results[file.name]["layered"].append(run_astar(graph, model, si, gi, h_layered))
-
-    return results
\ No newline at end of file
+                exp, cost = run_bidirectional_astar(graph, model, si, gi, model.heuristic_alt)
+            wall.append(time.perf_counter() - t0)
+            expanded.append(exp)
+            costs.append(cost)
+
+        results[algo] = ({
+            "start": np.array([p[0] for p in pairs], dtype=np.int64),
+            "goal": np.array([p[1] for p in pairs], dtype=np.int64),
+            "expanded": np.array(expanded, dtype=np.int64),
+            "cost": np.array(costs, dtype=np.float64),
+            "wall_s": np.array(wall, dtype=np.float64),
+        }, meta)
+    return results
@@ -6,12 +6,14 @@ from benchmark_core import collect_benchmark_data
 
 
 def run_h1(raw_results):
-    bins, all_base_exp, all_layer_exp = {}, [], []
+    bins, all_base_exp, all_layer_exp, all_bidi_exp = {}, [], [], []
+    # Dritter Algorithmus nur, wenn mit with_bidirectional=True erhoben
+    with_bidi = all("bidirectional" in b for b in raw_results.values())
 
     for b_data in raw_results.values():
         n_nodes = b_data["n_nodes"]
         bin_center = 10 ** round(math.log10(n_nodes), 1) if n_nodes > 0 else 0
-        bins.setdefault(bin_center, {"baseline": [], "layered": []})
+        bins.setdefault(bin_center, {"baseline": [], "layered": [], "bidirectional": []})
 
         # Extraktion der Expansionen (Index 0)
         base_exp = [res[0] for res in b_data["baseline"]]
@@ -22,6 +24,11 @@ def run_h1(raw_results):
         all_base_exp.extend(base_exp)
         all_layer_exp.extend(layer_exp)
 
+        if with_bidi:
+            bidi_exp = [res[0] for res in b_data["bidirectional"]]
+            bins[bin_center]["bidirectional"].extend(bidi_exp)
+            all_bidi_exp.extend(bidi_exp)
+
     xs = sorted(bins.keys())
     mean_base = [statistics.mean(bins[x]["baseline"]) for x in xs]
     mean_layer = [statistics.mean(bins[x]["layered"]) for x in xs]
@@ -30,6 +37,9 @@ def run_h1(raw_results):
     plt.figure(figsize=(10, 6))
     plt.plot(xs, mean_base, "bo-", label="A* (klassisch)", linewidth=1.5, markersize=5)
     plt.plot(xs, mean_layer, "gs-", label="Layered A*", linewidth=1.5, markersize=5)
+    if with_bidi:
+        mean_bidi = [statistics.mean(bins[x]["bidirectional"]) for x in xs]
+        plt.plot(xs, mean_bidi, "m^-", label="Bidirektionaler A*", linewidth=1.5, markersize=5)
 
     plt.xscale("log")
     plt.yscale("log")
@@ -56,10 +66,14 @@ def run_h1(raw_results):
     print(f"p-Wert: {p:.2e}")
     if p < 0.05:
         print("Status: Statistisch signifikant")
+    if with_bidi:
+        bidi_ratios = [b / d if d > 0 else 1.0 for b, d in zip(all_base_exp, all_bidi_exp)]
+        print(f"Ø Verbesserung bidirektional: Faktor {statistics.mean(bidi_ratios):.2f}")
     print("=" * 30)
 
 
 if __name__ == "__main__":
     data_dir = "generated_buildings"
-    results = collect_benchmark_data(data_dir, pairs_per_building=20)
+    results = collect_benchmark_data(data_dir, pairs_per_building=20, with_bidirectional=True,
+                                     cache_dir="benchmark_results")
     run_h1(results)
\ No newline at end of file
@@ -36,5 +36,5 @@ def run_h2(raw_results):
 
 if __name__ == "__main__":
     data_dir = "generated_buildings"
-    results = collect_benchmark_data(data_dir, pairs_per_building=20)
+    results = collect_benchmark_data(data_dir, pairs_per_building=20, cache_dir="benchmark_results")
     run_h2(results)
\ No newline at end of file
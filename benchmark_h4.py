@@ -10,6 +10,7 @@ def run_h4(raw_results):
     exp_ratios = []  # Verhältnis Expansionen: Layered / Baseline
     cost_diffs = []  # Prozentuale Kostendifferenz
     n_nodes_list = []  # Anzahl der Knoten (für die neue x-Achse)
+    bidi_ratios, bidi_diffs, bidi_nodes = [], [], []  # Bidirektionaler A* (optional)
 
     for b_data in raw_results.values():
         n_nodes = b_data["n_nodes"]
@@ -21,17 +22,27 @@ def run_h4(raw_results):
                 cost_diffs.append(((l_cost - b_cost) / b_cost) * 100)
                 n_nodes_list.append(n_nodes)
 
+        for (b_exp, b_cost), (d_exp, d_cost) in zip(b_data["baseline"], b_data.get("bidirectional", [])):
+            if b_exp > 0 and b_cost > 0 and d_cost != float("inf"):
+                bidi_ratios.append(d_exp / b_exp)
+                bidi_diffs.append(((d_cost - b_cost) / b_cost) * 100)
+                bidi_nodes.append(n_nodes)
+
     # --------------------------------------------------------
-    # PLOT 1: EFFIZIENZ (Boxplot) - Unverändert
+    # PLOT 1: EFFIZIENZ (Boxplot)
     # --------------------------------------------------------
     plt.figure(figsize=(10, 5))
-    plt.boxplot(exp_ratios, vert=False, patch_artist=True,
+    boxes = [exp_ratios] + ([bidi_ratios] if bidi_ratios else [])
+    plt.boxplot(boxes, vert=False, patch_artist=True,
                 boxprops=dict(facecolor="skyblue", alpha=0.6))
     plt.axvline(1.0, color='red', linestyle='--', label='Baseline-Niveau (1.0)')
 
     plt.title("H4: Effizienzgewinn (Knotenexpansionen)")
-    plt.xlabel("Verhältnis Layered/Baseline (Werte < 1.0 sind effizienter)")
-    plt.yticks([])
+    plt.xlabel("Verhältnis zu Baseline (Werte < 1.0 sind effizienter)")
+    if bidi_ratios:
+        plt.yticks([1, 2], ["Layered", "Bidirektional"])
+    else:
+        plt.yticks([])
     plt.grid(axis='x', linestyle='--', alpha=0.7)
     plt.legend()
     plt.tight_layout()
@@ -45,6 +56,9 @@ def run_h4(raw_results):
 
     # Scatter Plot mit Knotenzahl auf der X-Achse
     plt.scatter(n_nodes_list, cost_diffs, alpha=0.4, color='purple', edgecolors='none', s=25)
+    if bidi_diffs:
+        plt.scatter(bidi_nodes, bidi_diffs, alpha=0.4, color='orange', edgecolors='none', s=25,
+                    label="Bidirektionaler A*")
 
     plt.axhline(0, color='black', linestyle='-', linewidth=1.5, label="Optimal (0% Abweichung)")
 
@@ -86,11 +100,15 @@ def run_h4(raw_results):
         print(f"Wilcoxon p-Wert (Kosten):      {p:.3e}")
     else:
         print("Alle Pfade sind zu 100% optimal.")
+    if bidi_ratios:
+        print(f"Ø Suchraum-Reduktion (bidir.): {(1 - statistics.mean(bidi_ratios)) * 100:.2f}%")
+        print(f"Ø Abweichung (bidir.):         {statistics.mean(bidi_diffs):.4f}%")
     print("=" * 40)
 
 
 if __name__ == "__main__":
     # Stelle sicher, dass der Pfad korrekt ist
     data_dir = "stress_test_set"
-    results = collect_benchmark_data(data_dir, pairs_per_building=20)
+    results = collect_benchmark_data(data_dir, pairs_per_building=20, with_bidirectional=True,
+                                     cache_dir="benchmark_results")
     run_h4(results)
\ No newline at end of file
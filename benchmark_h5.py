@@ -43,5 +43,5 @@ def run_efficiency_benchmark(raw_data):
 
 if __name__ == "__main__":
     data_dir = "generated_buildings"
-    results = collect_benchmark_data(data_dir, pairs_per_building=20)
+    results = collect_benchmark_data(data_dir, pairs_per_building=20, cache_dir="benchmark_results")
     run_efficiency_benchmark(results)
\ No newline at end of file
@@ -0,0 +1,102 @@
+import random
+import statistics
+import time
+
+import matplotlib.pyplot as plt
+
+from RoutingModel import RoutingModel
+from SearchContext import SearchContext
+from generator import gen_building
+from layered_a_star_ChatGPT import astar_search, build_graph
+
+
+# --------------------------------------------------------
+# Skalare vs. vektorisierte (zielgebundene) Heuristik
+# --------------------------------------------------------
+
+def time_queries(graph, model, pairs, mode, block_size=256):
+    """Mittlere Zeit pro Anfrage (ms) inkl. Aufbau der Heuristik."""
+    ctx = SearchContext.for_graph(graph)
+    times = []
+    for si, gi in pairs:
+        t0 = time.perf_counter()
+        if mode == "scalar":
+            h = model.heuristic
+        elif mode == "vector":
+            h = model.bind_goal(gi)
+        else:
+            h = model.bind_goal(gi, block_size=block_size)
+        astar_search(graph, model, si, gi, h, ctx)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.mean(times)
+
+
+def break_even(rows, mode):
+    """
+    Kleinste gemessene Größe, ab der mode bei allen größeren Größen schneller
+    ist als skalar (ein einzelner Gewinn bei kleinen Gebäuden zählt nicht).
+    None, wenn mode bei der größten Größe nicht gewinnt.
+    """
+    threshold = None
+    for r in sorted(rows, key=lambda r: r["n_nodes"]):
+        if r[mode] < r["scalar"]:
+            if threshold is None:
+                threshold = r["n_nodes"]
+        else:
+            threshold = None
+    return threshold
+
+
+def run_heuristic_benchmark(sizes, b_class="K3", n_pairs=50, seed=0):
+    rnd = random.Random(seed)
+    rows = []
+    for n in sizes:
+        graph = build_graph(gen_building(n, seed, b_class), compact=True)
+        model = RoutingModel(graph, floor_transition_penalty=5.0)
+        n_nodes = graph.num_nodes()
+        pairs = [tuple(rnd.sample(range(n_nodes), 2)) for _ in range(n_pairs)]
+
+        rows.append({
+            "n_nodes": n_nodes,
+            "scalar": time_queries(graph, model, pairs, "scalar"),
+            "vector": time_queries(graph, model, pairs, "vector"),
+            "block": time_queries(graph, model, pairs, "block"),
+        })
+
+    print("\n" + "=" * 60)
+    print(f"{'|V|':>8} | {'skalar (ms)':>12} | {'NumPy voll':>12} | {'NumPy Block':>12}")
+    print("-" * 60)
+    for r in rows:
+        print(f"{r['n_nodes']:>8} | {r['scalar']:>12.3f} | {r['vector']:>12.3f} | {r['block']:>12.3f}")
+    print("-" * 60)
+
+    for mode in ("vector", "block"):
+        threshold = break_even(rows, mode)
+        label = "NumPy voll" if mode == "vector" else "NumPy Block"
+        if threshold is not None:
+            print(f"Break-even {label}: ab ca. |V| = {threshold} (durchgehend schneller)")
+        else:
+            print(f"Break-even {label}: im gemessenen Bereich nicht erreicht")
+    print("=" * 60)
+
+    xs = [r["n_nodes"] for r in rows]
+    plt.figure(figsize=(9, 6))
+    plt.plot(xs, [r["scalar"] for r in rows], "bo-", label="skalar (RoutingModel.heuristic)")
+    plt.plot(xs, [r["vector"] for r in rows], "gs-", label="NumPy, alle Knoten")
+    plt.plot(xs, [r["block"] for r in rows], "mv-", label="NumPy, lazy Blöcke")
+    plt.xscale("log")
+    plt.yscale("log")
+    plt.xlabel("Anzahl Knoten |V| (log)")
+    plt.ylabel("Zeit pro Anfrage in ms (log)")
+    plt.title(f"Heuristik: Break-even skalar vs. vektorisiert ({b_class})")
+    plt.legend()
+    plt.grid(True, which="both", linestyle="--", alpha=0.5)
+    plt.savefig("heuristic_breakeven.png", dpi=300, bbox_inches='tight')
+    print("Grafik 'heuristic_breakeven.png' wurde erstellt.")
+    plt.show()
+
+    return rows
+
+
+if __name__ == "__main__":
+    run_heuristic_benchmark([300, 1000, 3000, 10000, 30000])
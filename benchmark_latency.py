@@ -0,0 +1,281 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import mannwhitneyu
+
+from BuildingGraph import BuildingGraph
+from RoutingModel import RoutingModel
+from SearchContext import SearchContext
+from benchmark_core import BENCHMARK_PENALTY, building_files, building_seed
+from layered_a_star_ChatGPT import astar_search, parse_building
+
+# --------------------------------------------------------
+# Latenz-Benchmark (Wall-Clock) mit Baselines
+#
+# Phasen pro Gebäude, getrennt gemessen:
+#   load          JSON lesen + Node/Edge-Records (parse_building)
+#   compile       BuildingGraph.compile_for_routing (kompakt)
+#   setup_model   RoutingModel (gebackene Gewichte)
+#   setup_alt     Landmark-Tabellen (prepare_landmarks)
+#   search_layered / search_alt   eine Anfrage (astar_search)
+# Gruppiert nach Klasse und Größenstufe aus dem Dateinamen (K3_s07_i1).
+# --------------------------------------------------------
+
+PHASES = ("load", "compile", "setup_model", "setup_alt", "search_layered", "search_alt")
+_NAME = re.compile(r"^(K\d+)_s(\d+)_i\d+$")
+
+
+def _group(path: Path):
+    m = _NAME.match(path.stem)
+    return (m.group(1), int(m.group(2))) if m else (path.stem, 0)
+
+
+def _time_ns(fn: Callable[[], object], repeats: int, warmup: int) -> List[int]:
+    """Laufzeiten von fn in ns (perf_counter_ns), ohne GC während der Messung."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            t0 = time.perf_counter_ns()
+            fn()
+            samples.append(time.perf_counter_ns() - t0)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def measure_file(path: Path, queries: int, repeats: int, warmup: int, rnd: random.Random,
+                 max_nodes: Optional[int] = None) -> Optional[Tuple[int, Dict[str, List[int]]]]:
+    """(|V|, Rohmessungen in ns je Phase) für ein Gebäude; None, wenn größer als max_nodes."""
+    text = path.read_text(encoding="utf8")
+    samples: Dict[str, List[int]] = {}
+
+    def load():
+        return parse_building(json.loads(text))
+
+    meta, nodes, edges = load()
+    if max_nodes is not None and len(nodes) > max_nodes:
+        return None
+    samples["load"] = _time_ns(load, repeats, warmup)
+
+    def compile_graph():
+        graph = BuildingGraph(meta, nodes, edges)
+        graph.compile_for_routing(compact=True)
+        return graph
+
+    samples["compile"] = _time_ns(compile_graph, repeats, warmup)
+    graph = compile_graph()
+
+    def setup_model():
+        return RoutingModel(graph, floor_transition_penalty=BENCHMARK_PENALTY)
+
+    samples["setup_model"] = _time_ns(setup_model, repeats, warmup)
+    model = setup_model()
+
+    def setup_alt():
+        graph.landmark_tables.clear()  # sonst nur ein Cache-Treffer
+        model.landmarks = None
+        model.prepare_landmarks()
+
+    samples["setup_alt"] = _time_ns(setup_alt, repeats, warmup)
+
+    ctx = SearchContext.for_graph(graph)
+    n = graph.num_nodes()
+    pairs = [tuple(rnd.sample(range(n), 2)) for _ in range(queries)] if n >= 2 else []
+    samples["search_layered"], samples["search_alt"] = [], []
+    for si, gi in pairs:
+        samples["search_layered"] += _time_ns(
+            lambda: astar_search(graph, model, si, gi, context=ctx), repeats, warmup)
+        samples["search_alt"] += _time_ns(
+            lambda: astar_search(graph, model, si, gi, model.bind_alt(si, gi), ctx), repeats, warmup)
+    return n, samples
+
+
+def summarize(samples: List[int]) -> Dict[str, float]:
+    a = np.asarray(samples, dtype=np.float64)
+    p50, p95, p99 = np.percentile(a, [50, 95, 99])
+    return {
+        "count": len(a),
+        "p50_ns": float(p50),
+        "p95_ns": float(p95),
+        "p99_ns": float(p99),
+        "mean_ns": float(a.mean()),
+        "ops_per_s": 1e9 / a.mean() if a.mean() > 0 else float("inf"),
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_latency_benchmark(buildings_dir: str, out: str = "latency_baseline.json",
+                          queries: int = 20, repeats: int = 5, warmup: int = 1,
+                          classes: Optional[List[str]] = None, max_nodes: Optional[int] = None,
+                          seed: int = 0) -> pd.DataFrame:
+    """
+    Misst alle Phasen für jedes Gebäude in buildings_dir und speichert
+    Rohmessungen + Kennzahlen (p50/p95/p99, Durchsatz) als JSON-Baseline.
+    """
+    raw: Dict[str, List[int]] = {}
+    n_nodes: Dict[str, List[int]] = {}
+
+    for path in sorted(building_files(buildings_dir)):
+        b_class, size = _group(path)
+        if classes and b_class not in classes:
+            continue
+        # Seed pro Datei: gleiche Anfragen in jedem Lauf, auch mit Filtern
+        rnd = random.Random(building_seed(path.name, seed))
+        measured = measure_file(path, queries, repeats, warmup, rnd, max_nodes)
+        if measured is None:
+            continue
+        n, file_samples = measured
+        for phase, values in file_samples.items():
+            key = f"{phase}/{b_class}/s{size:02d}"
+            raw.setdefault(key, []).extend(values)
+            n_nodes.setdefault(key, []).append(n)
+
+    results = {
+        key: {**summarize(values), "n_nodes": float(np.mean(n_nodes[key])), "samples_ns": values}
+        for key, values in raw.items() if values
+    }
+    baseline = {
+        "meta": {
+            "commit": _commit(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "buildings_dir": str(buildings_dir),
+            "queries": queries, "repeats": repeats, "warmup": warmup, "seed": seed,
+        },
+        "results": results,
+    }
+    with open(out, "w", encoding="utf8") as f:
+        json.dump(baseline, f)
+
+    df = _frame(results)
+    print("\n" + "=" * 90)
+    print(f"LATENZ (perf_counter_ns, {repeats} Wiederholungen, Warm-up {warmup}), Commit {baseline['meta']['commit']}")
+    print("=" * 90)
+    print(df.to_string())
+    print("-" * 90)
+    print(f"Baseline gespeichert: {out}")
+    print("=" * 90 + "\n")
+    return df
+
+
+def _frame(results: Dict[str, dict]) -> pd.DataFrame:
+    rows = []
+    for key, r in results.items():
+        phase, b_class, size = key.split("/")
+        rows.append({"Phase": phase, "Class": b_class, "Size": size, "n_nodes": round(r["n_nodes"]),
+                     "p50_us": r["p50_ns"] / 1e3, "p95_us": r["p95_ns"] / 1e3,
+                     "p99_us": r["p99_ns"] / 1e3, "ops_per_s": r["ops_per_s"]})
+    if not rows:
+        return pd.DataFrame()
+    df = pd.DataFrame(rows)
+    df["Phase"] = pd.Categorical(df["Phase"], PHASES, ordered=True)
+    return df.sort_values(["Phase", "Class", "Size"]).set_index(["Phase", "Class", "Size"]).round(1)
+
+
+# --------------------------------------------------------
+# Vergleich zweier Baselines
+# --------------------------------------------------------
+
+def compare_baselines(base_path: str, new_path: str, alpha: float = 0.01,
+                      min_change: float = 0.05) -> pd.DataFrame:
+    """
+    Vergleicht zwei Baselines pro (Phase, Klasse, Größe).
+    Regression: Mann-Whitney-U (einseitig) signifikant auf Niveau alpha
+    UND Median mindestens min_change (relativ) langsamer; analog "faster".
+    """
+    with open(base_path, encoding="utf8") as f:
+        base = json.load(f)
+    with open(new_path, encoding="utf8") as f:
+        new = json.load(f)
+
+    rows = []
+    for key in sorted(set(base["results"]) & set(new["results"])):
+        a, b = base["results"][key]["samples_ns"], new["results"][key]["samples_ns"]
+        ratio = float(np.median(b) / np.median(a)) if np.median(a) > 0 else float("inf")
+        p_slower = mannwhitneyu(a, b, alternative="less").pvalue
+        p_faster = mannwhitneyu(a, b, alternative="greater").pvalue
+        if p_slower < alpha and ratio > 1 + min_change:
+            verdict = "REGRESSION"
+        elif p_faster < alpha and ratio < 1 - min_change:
+            verdict = "faster"
+        else:
+            verdict = ""
+        phase, b_class, size = key.split("/")
+        rows.append({"Phase": phase, "Class": b_class, "Size": size,
+                     "base_p50_us": np.median(a) / 1e3, "new_p50_us": np.median(b) / 1e3,
+                     "ratio": ratio, "p_value": min(p_slower, p_faster), "verdict": verdict})
+
+    df = pd.DataFrame(rows)
+    print("\n" + "=" * 90)
+    print(f"VERGLEICH {base['meta'].get('commit')} -> {new['meta'].get('commit')} "
+          f"(Mann-Whitney-U, alpha={alpha}, min. Änderung {min_change:.0%})")
+    print("=" * 90)
+    if df.empty:
+        print("Keine gemeinsamen Messpunkte.")
+    else:
+        print(df.set_index(["Phase", "Class", "Size"]).round(4).to_string())
+        print("-" * 90)
+        print(f"{(df['verdict'] == 'REGRESSION').sum()} Regression(en), "
+              f"{(df['verdict'] == 'faster').sum()} Verbesserung(en)")
+    print("=" * 90 + "\n")
+    return df
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Wall-Clock-Latenzen (Laden, Kompilieren, Setup, Suche)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    run = sub.add_parser("run", help="messen und als Baseline speichern")
+    run.add_argument("--dir", default="generated_buildings")
+    run.add_argument("--out", default=None, help="Standard: latency_<commit>.json")
+    run.add_argument("--queries", type=int, default=20, help="Anfragen pro Gebäude")
+    run.add_argument("--repeats", type=int, default=5)
+    run.add_argument("--warmup", type=int, default=1)
+    run.add_argument("--classes", nargs="+", default=None)
+    run.add_argument("--max-nodes", type=int, default=None)
+    run.add_argument("--seed", type=int, default=0)
+
+    cmp = sub.add_parser("compare", help="zwei Baselines vergleichen (Exit-Code 1 bei Regression)")
+    cmp.add_argument("base")
+    cmp.add_argument("new")
+    cmp.add_argument("--alpha", type=float, default=0.01)
+    cmp.add_argument("--min-change", type=float, default=0.05)
+
+    args = ap.parse_args()
+    if args.cmd == "run":
+        out = args.out or f"latency_{_commit() or 'worktree'}.json"
+        run_latency_benchmark(args.dir, out, args.queries, args.repeats, args.warmup,
+                              args.classes, args.max_nodes, args.seed)
+    else:
+        df = compare_baselines(args.base, args.new, args.alpha, args.min_change)
+        if not df.empty and (df["verdict"] == "REGRESSION").any():
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
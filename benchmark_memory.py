@@ -0,0 +1,104 @@
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from generator import gen_building
+from layered_a_star_ChatGPT import parse_building
+from stream_loader import stream_building
+
+
+# --------------------------------------------------------
+# Speicherbedarf pro Knoten / Kante (tracemalloc)
+# --------------------------------------------------------
+
+def _retained(fn):
+    """Führt fn unter tracemalloc aus; Rückgabe (Ergebnis, danach belegte Bytes)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_building(text: str, json_path: str):
+    """
+    Bytes pro Knoten/Kante für raw_nodes/raw_edges (Node/Edge aus
+    parse_building) und für den kompakt kompilierten Graphen.
+    Das JSON wird innerhalb der Messung geparst, damit die von den
+    Records referenzierten Strings mitzählen.
+    """
+    def parse():
+        _, nodes, edges = parse_building(json.loads(text))
+        return nodes, edges
+
+    # Aufwärmen (einmalige Allokationen, z.B. Wachstum der Intern-Tabelle)
+    parse()
+
+    # Nacheinander messen, damit keine internierten IDs aus dem vorherigen
+    # Lauf geteilt werden: erst nur die Knoten behalten, dann beides
+    nodes, node_bytes = _retained(lambda: parse()[0])
+    n_nodes = len(nodes)
+    del nodes
+    (nodes, edges), raw_bytes = _retained(parse)
+    n_edges = len(edges)
+    del nodes, edges
+
+    graph, compiled_bytes = _retained(lambda: stream_building(json_path, lazy_raw=False))
+    csr_bytes = sum(a.itemsize * len(a) for a in (
+        graph.csr_targets, graph.csr_weights, graph.csr_flags))
+
+    return {
+        "n_nodes": n_nodes,
+        "n_edges": n_edges,
+        "raw_bytes_per_node": node_bytes / n_nodes,
+        "raw_bytes_per_edge": (raw_bytes - node_bytes) / max(1, n_edges),
+        "compiled_bytes_per_node": (compiled_bytes - csr_bytes) / n_nodes,
+        "compiled_bytes_per_edge": csr_bytes / max(1, n_edges),
+    }
+
+
+def run_memory_benchmark(n_nodes=2000, classes=("K1", "K2", "K3", "K4", "K5"), seed=0):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for b_class in classes:
+            text = json.dumps(gen_building(n_nodes, seed, b_class))
+            path = os.path.join(tmp, f"{b_class}_{n_nodes}.json")
+            with open(path, "w", encoding="utf8") as f:
+                f.write(text)
+            rows.append({"Class": b_class, **measure_building(text, path)})
+
+    df = pd.DataFrame(rows).set_index("Class")
+
+    print("\n" + "=" * 80)
+    print(f"SPEICHER PRO KNOTEN / KANTE (tracemalloc, {n_nodes} Knoten pro Gebäude)")
+    print("=" * 80)
+    print(df.round(1).to_string())
+    print("-" * 80)
+    print("raw_*: Node/Edge-Records (raw_nodes/raw_edges), inkl. IDs, Positionen und attrs")
+    print("compiled_*: kompakter BuildingGraph (Knoten-Arrays + Index bzw. CSR-Slots)")
+    print("=" * 80 + "\n")
+
+    ax = df[["raw_bytes_per_node", "raw_bytes_per_edge",
+             "compiled_bytes_per_node", "compiled_bytes_per_edge"]].plot(
+        kind="bar", figsize=(10, 6), edgecolor="black")
+    ax.set_title("Speicher pro Knoten / Kante je Gebäudeklasse", fontsize=14)
+    ax.set_ylabel("Bytes")
+    ax.set_xlabel("Gebäudeklasse")
+    ax.grid(axis="y", linestyle="--", alpha=0.6)
+    plt.tight_layout()
+    plt.savefig("memory_per_entity.png", dpi=300)
+    plt.show()
+
+    return df
+
+
+if __name__ == "__main__":
+    run_memory_benchmark()
@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from RoutingService import RoutingService
+
+
+# --------------------------------------------------------
+# Last-Client für den Routing-Dienst (Durchsatz / Latenz)
+# --------------------------------------------------------
+
+class _Connection:
+    """Eine JSON-Lines-Verbindung, eine Anfrage zur Zeit."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader, self.writer = reader, writer
+        self.next_id = 0
+
+    async def call(self, request: Dict) -> Dict:
+        self.next_id += 1
+        request = {**request, "id": self.next_id}
+        self.writer.write(json.dumps(request, separators=(",", ":")).encode("utf8") + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Service closed the connection.")
+        return json.loads(line)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def _connect(host: str, port: int) -> _Connection:
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    return _Connection(reader, writer)
+
+
+async def run_load(host: str, port: int, building: Optional[str] = None, requests: int = 2000,
+                   concurrency: int = 32, hot_sources: int = 0, seed: int = 0) -> Dict[str, float]:
+    """
+    Schickt requests Routing-Anfragen über concurrency Verbindungen.
+    hot_sources > 0: Starts nur aus so vielen Knoten (Anteil zusammengefasster
+    Anfragen steigt), sonst zufällige Start/Ziel-Paare; dann fällt kaum ein
+    Start doppelt an und mean_batch bleibt in jedem Modus nahe 1.
+    """
+    admin = await _connect(host, port)
+    if building is None:
+        building = (await admin.call({"op": "buildings"}))["buildings"][0]
+    sample = await admin.call({"op": "sample", "building": building, "k": 1000, "seed": seed})
+    if "error" in sample:
+        raise RuntimeError(sample["error"])
+    nodes: List[str] = sample["nodes"]
+
+    rnd = random.Random(seed)
+    sources = rnd.sample(nodes, min(hot_sources, len(nodes))) if hot_sources > 0 else nodes
+    work = [(rnd.choice(sources), rnd.choice(nodes)) for _ in range(requests)]
+
+    latencies, batches, errors = [], [], 0
+
+    async def client():
+        nonlocal errors
+        conn = await _connect(host, port)
+        try:
+            while work:
+                start, goal = work.pop()
+                t0 = time.perf_counter()
+                resp = await conn.call({"building": building, "start": start, "goal": goal})
+                latencies.append(time.perf_counter() - t0)
+                if "error" in resp:
+                    errors += 1
+                else:
+                    batches.append(resp["batch"])
+        finally:
+            await conn.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    server = (await admin.call({"op": "metrics"}))["metrics"]
+    await admin.close()
+
+    lat = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99]) if len(lat) else (0.0, 0.0, 0.0)
+    return {
+        "building": building,
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "requests_per_s": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "client_p50_ms": float(p50),
+        "client_p95_ms": float(p95),
+        "client_p99_ms": float(p99),
+        "mean_batch": float(np.mean(batches)) if batches else 0.0,
+        "server_batches": server["batches"],
+        "server_coalesced": server["coalesced"],
+        "server_max_queue_depth": server["max_queue_depth"],
+    }
+
+
+async def _main(args):
+    service, server = None, None
+    host, port = args.host, args.port
+    if args.dir:
+        # Dienst im selben Prozess starten (freier Port), z.B. für schnelle Vergleiche
+        service = RoutingService(args.dir, args.workers, args.batch_window)
+        server = await service.start("127.0.0.1", 0)
+        host, port = "127.0.0.1", server.sockets[0].getsockname()[1]
+    try:
+        result = await run_load(host, port, args.building, args.requests, args.concurrency,
+                                args.hot_sources, args.seed)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+            service.close()
+
+    print("\n" + "=" * 60)
+    print("ROUTING-DIENST UNTER LAST")
+    print("=" * 60)
+    for key, value in result.items():
+        print(f"{key:<24} {value:.3f}" if isinstance(value, float) else f"{key:<24} {value}")
+    print("=" * 60 + "\n")
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Last-Client für RoutingService")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--dir", default=None, help="Dienst selbst starten (Gebäude-Verzeichnis)")
+    ap.add_argument("--workers", type=int, default=None, help="nur mit --dir")
+    ap.add_argument("--batch-window", type=float, default=0.002, help="nur mit --dir")
+    ap.add_argument("--building", default=None)
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--hot-sources", type=int, default=0)
+    ap.add_argument("--seed", type=int, default=0)
+    asyncio.run(_main(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
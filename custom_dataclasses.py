@@ -1,24 +1,53 @@
+import sys
+from array import array
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Any
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Any
 import math
 
+# Gemeinsames (read-only) attrs-Objekt für alle Knoten/Kanten ohne Attribute
+EMPTY_ATTRS: Mapping[str, Any] = MappingProxyType({})
 
-@dataclass
+
+@dataclass(slots=True)
 class Node:
     id: str
     type: str
     level: int
-    pos: Optional[Tuple[float, float, float]]
-    attrs: Dict[str, Any]
+    pos: Optional[Sequence[float]]  # array("d") mit x, y, z
+    attrs: Mapping[str, Any]
     name: Optional[str] = None
 
+    @classmethod
+    def from_json(cls, n: Dict[str, Any]) -> "Node":
+        """Kompakter Knoten: IDs/Typen interniert, Position gepackt, leere attrs geteilt."""
+        name = n.get("name")
+        return cls(
+            id=sys.intern(n["id"]),
+            type=sys.intern(n["type"]),
+            level=n["level"],
+            pos=array("d", n["pos"]) if n.get("pos") else None,
+            attrs=n.get("attrs") or EMPTY_ATTRS,
+            name=sys.intern(name) if name else name
+        )
 
-@dataclass
+
+@dataclass(slots=True)
 class Edge:
     a: str
     b: str
     weight: float
-    attrs: Dict[str, Any]
+    attrs: Mapping[str, Any]
+
+    @classmethod
+    def from_json(cls, e: Dict[str, Any]) -> "Edge":
+        # Interniert: a/b teilen sich das ID-Objekt mit dem Node
+        return cls(
+            a=sys.intern(e["a"]),
+            b=sys.intern(e["b"]),
+            weight=e["weight"],
+            attrs=e.get("attrs") or EMPTY_ATTRS
+        )
 
 
 @dataclass
@@ -29,14 +58,14 @@ class Meta:
     group: str
 
 
-@dataclass
+@dataclass(slots=True)
 class RoutingNode:
     id: str
     level: int
     pos: Optional[Tuple[float, float, float]]
 
 
-@dataclass
+@dataclass(slots=True)
 class RoutingEdge:
     target: int
     weight: float
@@ -44,3 +73,19 @@ class RoutingEdge:
     is_stairs: bool
     is_elevator: bool
     accessible: bool
+
+
+@dataclass
+class SearchStats:
+    expanded: int = 0
+    pushes: int = 0
+    stale_pops: int = 0
+    reexpansions: int = 0
+
+
+@dataclass
+class ShortestPathTree:
+    source: int
+    dist: List[float]
+    parent: List[int]
+    order: List[int]  # settled nodes in order of their final distance
@@ -1,8 +1,16 @@
 from __future__ import annotations
-import argparse, json, math, random
+import argparse, hashlib, json, math, random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
 
+from BuildingGraph import BuildingGraph, _pack_edge_flags
+from custom_dataclasses import Meta
+from graph_cache import SUFFIX as CACHE_SUFFIX, save_compiled
+
+SEPARATORS = (",", ":")
+
 # --------------------------------------------------
 # Helpers
 # --------------------------------------------------
@@ -19,6 +27,10 @@ def sizes_geometric(n, lo, hi):
 # --------------------------------------------------
 
 class GraphBuilder:
+    """
+    Sammelt Knoten/Kanten kompakt als Tupel; as_json() liefert das
+    Gebäude-Dict, write_json() schreibt es direkt (ohne Zwischen-Dicts).
+    """
     def __init__(self, name, b_class):
         self.meta = {
             "building_name": name,
@@ -26,31 +38,74 @@ class GraphBuilder:
             "unit": "meters",
             "format_version": 1
         }
-        self.nodes: Dict[str, Dict[str, Any]] = {}
-        self.edges: List[Dict[str, Any]] = []
+        # id -> (type, level, pos, attrs)
+        self.nodes: Dict[str, Tuple[str, int, Tuple[float, ...], Dict[str, Any]]] = {}
+        # (a, b, weight, attrs)
+        self.edges: List[Tuple[str, str, float, Dict[str, Any]]] = []
 
     def add_node(self, nid, ntype, level, pos, attrs=None):
-        self.nodes[nid] = {
-            "id": nid,
-            "name": nid,
-            "type": ntype,
-            "level": level,
-            "pos": list(pos),
-            "attrs": attrs or {}
-        }
+        self.nodes[nid] = (ntype, level, tuple(pos), attrs or {})
 
     def add_edge(self, a, b, weight=None, attrs=None):
         if a not in self.nodes or b not in self.nodes: return
-        pa, pb = self.nodes[a]["pos"], self.nodes[b]["pos"]
+        pa, pb = self.nodes[a][2], self.nodes[b][2]
         w = weight if weight is not None else euclid(pa, pb)
-        self.edges.append({
-            "a": a, "b": b,
-            "weight": round(w, 3),
-            "attrs": attrs or {}
-        })
+        self.edges.append((a, b, round(w, 3), attrs or {}))
+
+    def level_of(self, nid):
+        return self.nodes[nid][1]
+
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    def num_edges(self) -> int:
+        return len(self.edges)
+
+    def _node_dicts(self):
+        for nid, (ntype, level, pos, attrs) in self.nodes.items():
+            yield {"id": nid, "name": nid, "type": ntype, "level": level,
+                   "pos": list(pos), "attrs": attrs}
+
+    def _edge_dicts(self):
+        for a, b, w, attrs in self.edges:
+            yield {"a": a, "b": b, "weight": w, "attrs": attrs}
 
     def as_json(self):
-        return {"meta": self.meta, "nodes": list(self.nodes.values()), "edges": self.edges}
+        return {"meta": self.meta, "nodes": list(self._node_dicts()), "edges": list(self._edge_dicts())}
+
+    def write_json(self, f, batch=4096):
+        """Schreibt kompaktes JSON (ohne Einrückung) blockweise nach f (Textmodus)."""
+        f.write('{"meta":' + json.dumps(self.meta, separators=SEPARATORS))
+        for key, items in (("nodes", self._node_dicts()), ("edges", self._edge_dicts())):
+            f.write(f',"{key}":[')
+            chunk, first = [], True
+            for item in items:
+                chunk.append(json.dumps(item, separators=SEPARATORS))
+                if len(chunk) == batch:
+                    f.write(("" if first else ",") + ",".join(chunk))
+                    chunk, first = [], False
+            if chunk:
+                f.write(("" if first else ",") + ",".join(chunk))
+            f.write("]")
+        f.write("}")
+
+    def compile(self) -> BuildingGraph:
+        """Kompakt kompilierter BuildingGraph direkt aus den Tupeln (für das Binärformat)."""
+        index = {nid: i for i, nid in enumerate(self.nodes)}
+        levels, pos = array("l"), array("d")
+        for ntype, level, p, attrs in self.nodes.values():
+            levels.append(level)
+            pos.extend(p)
+        edge_a, edge_b, edge_w, edge_f = array("l"), array("l"), array("d"), array("B")
+        for a, b, w, attrs in self.edges:
+            edge_a.append(index[a])
+            edge_b.append(index[b])
+            edge_w.append(w)
+            edge_f.append(_pack_edge_flags(attrs))
+        graph = BuildingGraph(Meta(**self.meta), None, None)
+        graph.compile_from_arrays(list(self.nodes), levels, pos, edge_a, edge_b, edge_w, edge_f,
+                                  compact=True, node_index=index)
+        return graph
 
 # --------------------------------------------------
 # Class-Specific Generators
@@ -75,12 +130,15 @@ def add_elevators(gb: GraphBuilder, floors: int, floor_nodes: Dict[int, List[str
             gb.add_edge(door, cabin, weight=5.0, attrs={"action": "enter_elevator"})
 
             if prev_cabin:
-                dist = abs(gb.nodes[prev_cabin]["level"] - f)
+                dist = abs(gb.level_of(prev_cabin) - f)
                 # Nicht-euklidische Kosten: Wartezeit (10s) + Fahrtzeit
                 gb.add_edge(prev_cabin, cabin, weight=10.0 + dist * 2.5, attrs={"elevator_move": True})
             prev_cabin = cabin
 
 def gen_building(target_nodes: int, seed: int, b_class: str) -> Dict[str, Any]:
+    return build_building(target_nodes, seed, b_class).as_json()
+
+def build_building(target_nodes: int, seed: int, b_class: str) -> GraphBuilder:
     rnd = random.Random(seed)
     gb = GraphBuilder(f"B_{b_class}_{target_nodes}_{seed}", b_class)
     floor_nodes: Dict[int, List[str]] = {}
@@ -164,14 +222,68 @@ def gen_building(target_nodes: int, seed: int, b_class: str) -> Dict[str, Any]:
 
     # Überall Aufzüge hinzufügen
     add_elevators(gb, floors, floor_nodes, rnd)
-    return gb.as_json()
+    return gb
 
 # --------------------------------------------------
 # Main Loop
 # --------------------------------------------------
 
+def instance_seed(base_seed: int, b_class: str, s_idx: int, inst: int) -> int:
+    """Reproduzierbarer Seed pro Gebäude (unabhängig von Worker und Reihenfolge)."""
+    digest = hashlib.sha256(f"{base_seed}:{b_class}:{s_idx}:{inst}".encode("utf8")).digest()
+    return int.from_bytes(digest[:4], "little")
+
+class _HashingWriter:
+    """Text-Sink: hasht den Inhalt (SHA-256 wie graph_cache.source_digest) und schreibt ihn optional."""
+    def __init__(self, f=None):
+        self.f = f
+        self.sha = hashlib.sha256()
+
+    def write(self, text):
+        data = text.encode("utf8")
+        self.sha.update(data)
+        if self.f is not None:
+            self.f.write(data)
+
+def generate_one(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Erzeugt und schreibt ein Gebäude (läuft in einem Worker); Rückgabe = Manifest-Eintrag."""
+    out, fname = Path(task["out"]), task["name"]
+    if task.get("engine") == "numpy":
+        from generator_np import gen_building_np
+        gb = gen_building_np(task["target_nodes"], task["seed"], task["class"])
+    else:
+        gb = build_building(task["target_nodes"], task["seed"], task["class"])
+    gb.meta["building_name"] = fname
+
+    files = []
+    if "json" in task["formats"]:
+        with (out / f"{fname}.json").open("wb") as f:
+            sink = _HashingWriter(f)
+            gb.write_json(sink)
+        files.append(f"{fname}.json")
+    else:
+        # Nur hashen: der Cache bleibt für eine später erzeugte JSON-Datei gültig
+        sink = _HashingWriter()
+        gb.write_json(sink)
+    if "bgc" in task["formats"]:
+        save_compiled(gb.compile(), str(out / f"{fname}{CACHE_SUFFIX}"), sink.sha.digest())
+        files.append(f"{fname}{CACHE_SUFFIX}")
+
+    return {
+        "name": fname,
+        "class": task["class"],
+        "size_index": task["size_index"],
+        "instance": task["instance"],
+        "target_nodes": task["target_nodes"],
+        "seed": task["seed"],
+        "engine": task.get("engine", "python"),
+        "n_nodes": gb.num_nodes(),
+        "n_edges": gb.num_edges(),
+        "sha256": sink.sha.hexdigest(),
+        "files": files,
+    }
+
 def main():
-    classes = ["K1", "K2", "K3", "K4", "K5"]
     n_sizes = 20
     n_instances = 3
     
@@ -179,30 +291,61 @@ def main():
     ap.add_argument("--out", default="generated_buildings")
     ap.add_argument("--nmin", type=int, default=300)
     ap.add_argument("--nmax", type=int, default=10000)
+    ap.add_argument("--seed", type=int, default=0, help="Basis-Seed (reproduzierbare Gebäude)")
+    ap.add_argument("--workers", type=int, default=None, help="Prozesse (Standard: alle Kerne)")
+    ap.add_argument("--format", choices=["json", "bgc", "both"], default="json",
+                    help="kompaktes JSON, Binärformat (graph_cache) oder beides")
+    ap.add_argument("--engine", choices=["python", "numpy"], default="python",
+                    help="numpy: vektorisierter Generator (generator_np) für sehr große Gebäude")
+    ap.add_argument("--classes", nargs="+", default=["K1", "K2", "K3", "K4", "K5"],
+                    help="Gebäudeklassen; K6 (Campus) nur mit --engine numpy")
     args = ap.parse_args()
+    classes = args.classes
+    if "K6" in classes and args.engine != "numpy":
+        ap.error("K6 (Campus) requires --engine numpy.")
 
     out = Path(args.out)
     out.mkdir(parents=True, exist_ok=True)
     
     sizes = sizes_geometric(n_sizes, args.nmin, args.nmax)
-    total_count = 0
+    formats = ("json", "bgc") if args.format == "both" else (args.format,)
 
-    for c_idx, b_class in enumerate(classes, 1):
+    tasks = []
+    for b_class in classes:
         for s_idx, n in enumerate(sizes, 1):
             for inst in range(n_instances):
-                seed = random.randint(0, 10**9)
-                data = gen_building(n, seed, b_class)
-                
-                # Dateiname: K{1..5}_S{01..20}_I{0..2}
-                fname = f"{b_class}_s{s_idx:02d}_i{inst}"
-                data["meta"]["building_name"] = fname
-                
-                with (out / f"{fname}.json").open("w") as f:
-                    json.dump(data, f, indent=2)
-                total_count += 1
-
-    print(f"Done! 5 Klassen × 20 Größen × 3 Instanzen = {total_count} Gebäude.")
-    print(f"Speicherort: {out.resolve()}")
+                tasks.append({
+                    "out": str(out),
+                    # Dateiname: K{1..6}_S{01..20}_I{0..2}
+                    "name": f"{b_class}_s{s_idx:02d}_i{inst}",
+                    "class": b_class,
+                    "size_index": s_idx,
+                    "instance": inst,
+                    "target_nodes": n,
+                    "seed": instance_seed(args.seed, b_class, s_idx, inst),
+                    "formats": formats,
+                    "engine": args.engine,
+                })
+
+    # Große Gebäude zuerst, damit die Worker gleichmäßig ausgelastet sind
+    order = sorted(range(len(tasks)), key=lambda k: -tasks[k]["target_nodes"])
+    entries = [None] * len(tasks)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for k, entry in zip(order, pool.map(generate_one, [tasks[k] for k in order])):
+            entries[k] = entry
+
+    manifest = {
+        "generator": {"nmin": args.nmin, "nmax": args.nmax, "seed": args.seed,
+                      "n_sizes": n_sizes, "n_instances": n_instances, "format": args.format,
+                      "engine": args.engine, "classes": classes},
+        "buildings": entries,
+    }
+    # Gleicher Name wie benchmark_core.MANIFEST_NAME (wird dort ignoriert)
+    with (out / "manifest.json").open("w") as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"Done! {len(classes)} Klassen × {n_sizes} Größen × {n_instances} Instanzen = {len(entries)} Gebäude.")
+    print(f"Speicherort: {out.resolve()} (Manifest: manifest.json)")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,378 @@
+from __future__ import annotations
+import json, math
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from BuildingGraph import EDGE_LEVEL_CHANGE, BuildingGraph, _pack_edge_flags
+from custom_dataclasses import Meta
+
+# --------------------------------------------------
+# Vektorisierter Generator (NumPy) für K1–K5 und den Campus (K6)
+#
+# Gleiche Struktur wie generator.gen_building, aber Positionen, Levels und
+# Kanten werden blockweise als Arrays erzeugt. Nicht bitgleich zum
+# Python-Generator (anderer Zufallsgenerator), statistisch gleich aufgebaut.
+# --------------------------------------------------
+
+NODE_TYPES = ["path", "room", "corridor", "node", "elevator_cabin", "elevator_door", "outdoor"]
+T_PATH, T_ROOM, T_CORRIDOR, T_NODE, T_CABIN, T_DOOR, T_OUTDOOR = range(len(NODE_TYPES))
+
+# Kanten-Attribute als Codes (ein Byte pro Kante)
+EDGE_ATTRS = [{}, {"stairs": True}, {"action": "enter_elevator"}, {"elevator_move": True}]
+A_NONE, A_STAIRS, A_ENTER, A_MOVE = range(len(EDGE_ATTRS))
+
+CAMPUS_BUILDING_NODES = 20000  # Zielgröße eines Campus-Gebäudes
+CAMPUS_GAP = 50.0              # Abstand zwischen Gebäuden (m)
+
+FloorNodes = Dict[int, np.ndarray]
+
+
+def clamp(x, lo, hi): return max(lo, min(hi, x))
+
+
+class ArrayBuilding:
+    """
+    Gebäude als Arrays: Knoten (IDs, Typ-Codes, Levels, Positionen) und
+    Kanten (Endpunkt-Indizes, Gewichte, Attribut-Codes). Gleiche
+    Schnittstelle wie generator.GraphBuilder (write_json, compile).
+    """
+    def __init__(self, name, b_class):
+        self.meta = {
+            "building_name": name,
+            "group": b_class,
+            "unit": "meters",
+            "format_version": 1
+        }
+        self.ids: List[str] = []
+        self.node_attrs: Dict[int, Dict[str, Any]] = {}
+        self._types, self._levels, self._pos = [], [], []
+        self._ea, self._eb, self._ew, self._ecode = [], [], [], []
+        self.n = 0
+        self._final = False
+
+    # ----------------- Aufbau -----------------
+
+    def add_nodes(self, ids: List[str], ntype, levels, pos) -> np.ndarray:
+        """Hängt Knoten an; Rückgabe: ihre Indizes."""
+        k = len(ids)
+        idx = np.arange(self.n, self.n + k, dtype=np.int64)
+        self.ids.extend(ids)
+        self._types.append(np.broadcast_to(np.asarray(ntype, dtype=np.uint8), (k,)))
+        self._levels.append(np.broadcast_to(np.asarray(levels, dtype=np.int64), (k,)))
+        self._pos.append(np.asarray(pos, dtype=np.float64).reshape(k, 3))
+        self.n += k
+        return idx
+
+    def add_edges(self, a, b, weight=None, code=A_NONE):
+        """
+        weight=None (oder NaN): euklidische Länge (wird in finalize() berechnet).
+        weight und code: ein Wert für alle Kanten oder einer pro Kante.
+        """
+        a = np.asarray(a, dtype=np.int64)
+        b = np.broadcast_to(np.asarray(b, dtype=np.int64), a.shape)
+        w = np.full(a.shape, np.nan) if weight is None else np.broadcast_to(
+            np.asarray(weight, dtype=np.float64), a.shape)
+        self._ea.append(a)
+        self._eb.append(b)
+        self._ew.append(w)
+        self._ecode.append(np.broadcast_to(np.asarray(code, dtype=np.uint8), a.shape))
+
+    def shift(self, idx: np.ndarray, offset):
+        """Verschiebt bereits angelegte Knoten (für die Campus-Anordnung)."""
+        pos = self._concat_pos()
+        pos[idx] += offset
+
+    def bbox(self, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        pos = self._concat_pos()[idx]
+        return pos.min(axis=0), pos.max(axis=0)
+
+    def _concat_pos(self) -> np.ndarray:
+        if len(self._pos) != 1:
+            self._pos = [np.concatenate(self._pos)] if self._pos else [np.empty((0, 3))]
+        return self._pos[0]
+
+    def finalize(self):
+        if self._final:
+            return
+        self.types = np.concatenate(self._types) if self._types else np.empty(0, np.uint8)
+        self.levels = np.concatenate(self._levels) if self._levels else np.empty(0, np.int64)
+        self.pos = self._concat_pos()
+        self.edge_a = np.concatenate(self._ea) if self._ea else np.empty(0, np.int64)
+        self.edge_b = np.concatenate(self._eb) if self._eb else np.empty(0, np.int64)
+        self.edge_code = np.concatenate(self._ecode) if self._ecode else np.empty(0, np.uint8)
+        w = np.concatenate(self._ew) if self._ew else np.empty(0)
+        missing = np.isnan(w)
+        d = self.pos[self.edge_a[missing]] - self.pos[self.edge_b[missing]]
+        w[missing] = np.sqrt(np.einsum("ij,ij->i", d, d))
+        self.edge_w = np.round(w, 3)
+        self._types = self._levels = self._ea = self._eb = self._ew = self._ecode = None
+        self._final = True
+
+    def num_nodes(self) -> int:
+        return self.n
+
+    def num_edges(self) -> int:
+        self.finalize()
+        return len(self.edge_a)
+
+    # ----------------- Ausgabe -----------------
+
+    def write_json(self, f, batch=65536):
+        """Kompaktes JSON wie GraphBuilder.write_json (blockweise)."""
+        self.finalize()
+        sep = (",", ":")
+        types = [json.dumps(t) for t in NODE_TYPES]
+        attrs = [json.dumps(a, separators=sep) for a in EDGE_ATTRS]
+        f.write('{"meta":' + json.dumps(self.meta, separators=sep) + ',"nodes":[')
+        ids = [json.dumps(nid) for nid in self.ids]
+        levels, tcodes, pos = self.levels.tolist(), self.types.tolist(), self.pos.tolist()
+        for lo in range(0, self.n, batch):
+            parts = []
+            for i in range(lo, min(lo + batch, self.n)):
+                nid = ids[i]
+                na = json.dumps(self.node_attrs[i], separators=sep) if i in self.node_attrs else "{}"
+                x, y, z = pos[i]
+                parts.append(f'{{"id":{nid},"name":{nid},"type":{types[tcodes[i]]},'
+                             f'"level":{levels[i]},"pos":[{x!r},{y!r},{z!r}],"attrs":{na}}}')
+            f.write(("," if lo else "") + ",".join(parts))
+        f.write('],"edges":[')
+        ea, eb, ew, ec = (self.edge_a.tolist(), self.edge_b.tolist(),
+                          self.edge_w.tolist(), self.edge_code.tolist())
+        for lo in range(0, len(ea), batch):
+            parts = [f'{{"a":{ids[ea[i]]},"b":{ids[eb[i]]},"weight":{ew[i]!r},"attrs":{attrs[ec[i]]}}}'
+                     for i in range(lo, min(lo + batch, len(ea)))]
+            f.write(("," if lo else "") + ",".join(parts))
+        f.write("]}")
+
+    def as_json(self):
+        """Gebäude-Dict wie generator.gen_building (nur für kleine Instanzen sinnvoll)."""
+        import io
+        buf = io.StringIO()
+        self.write_json(buf)
+        return json.loads(buf.getvalue())
+
+    def compile(self) -> BuildingGraph:
+        """Kompakt kompilierter BuildingGraph; CSR-Aufbau vektorisiert, gleiche Slot-Reihenfolge."""
+        self.finalize()
+        n, m = self.n, len(self.edge_a)
+        flags = np.array([_pack_edge_flags(a) for a in EDGE_ATTRS], dtype=np.uint8)[self.edge_code]
+        flags = np.where(self.levels[self.edge_a] != self.levels[self.edge_b],
+                         flags | EDGE_LEVEL_CHANGE, flags).astype(np.uint8)
+        # Slots wie compile_from_arrays: Kante für Kante, erst a->b, dann b->a
+        fr = np.empty(2 * m, dtype=np.int64)
+        to = np.empty(2 * m, dtype=np.int64)
+        fr[0::2], fr[1::2] = self.edge_a, self.edge_b
+        to[0::2], to[1::2] = self.edge_b, self.edge_a
+        order = np.argsort(fr, kind="stable")
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(fr, minlength=n), out=offsets[1:])
+
+        graph = BuildingGraph(Meta(**self.meta), None, None)
+        graph.node_ids = self.ids
+        graph.node_index = {nid: i for i, nid in enumerate(self.ids)}
+        graph.node_levels = _to_array("l", self.levels)
+        graph.node_pos = _to_array("d", self.pos.ravel())
+        graph.csr_offsets = _to_array("l", offsets)
+        graph.csr_targets = _to_array("l", to[order])
+        graph.csr_weights = _to_array("d", np.repeat(self.edge_w, 2)[order])
+        graph.csr_flags = _to_array("B", np.repeat(flags, 2)[order])
+        graph.level_index = {
+            int(lvl): np.flatnonzero(self.levels == lvl).tolist() for lvl in np.unique(self.levels)
+        }
+        graph.routing_nodes = None
+        graph.routing_edges = []
+        graph.landmark_tables = {}
+        graph._profile_views = {}
+        graph.compact = True
+        graph.compiled = True
+        graph.version += 1
+        return graph
+
+
+def _to_array(code: str, values: np.ndarray) -> array:
+    out = array(code)
+    out.frombytes(np.ascontiguousarray(values, dtype=np.dtype(code)).tobytes())
+    return out
+
+
+# --------------------------------------------------
+# Klassen (gleiche Struktur wie generator.gen_building)
+# --------------------------------------------------
+
+def _k1(ab: ArrayBuilding, n: int, rng, p: str) -> Tuple[int, FloorNodes]:
+    floors, per = 2, n // 2
+    i = np.arange(per)
+    floor_nodes = {}
+    for f in range(floors):
+        pos = np.column_stack([i * 3.0, np.full(per, f * 10.0), np.full(per, f * 3.0)])
+        idx = ab.add_nodes([f"{p}n_f{f}_{k}" for k in range(per)], T_PATH, f, pos)
+        ab.add_edges(idx[:-1], idx[1:])
+        floor_nodes[f] = idx
+    ab.add_edges(floor_nodes[0][-1:], floor_nodes[1][0], weight=10.0)
+    return floors, floor_nodes
+
+
+def _k2(ab: ArrayBuilding, n: int, rng, p: str) -> Tuple[int, FloorNodes]:
+    floors, per = 3, 20
+    c = n // per
+    f = rng.integers(0, floors, c)
+    centers = rng.uniform(0, 100, (c, 2))
+    xy = np.repeat(centers, per, axis=0) + rng.uniform(-2, 2, (c * per, 2))
+    levels = np.repeat(f, per)
+    idx = ab.add_nodes([f"{p}c{k}_n{i}" for k in range(c) for i in range(per)],
+                       T_ROOM, levels, np.column_stack([xy, levels * 3.0]))
+    # Zufallsbaum pro Cluster: Knoten i hängt an einem früheren Knoten des Clusters
+    i = np.arange(1, per)
+    parent = (rng.random((c, per - 1)) * i).astype(np.int64)
+    base = idx[::per][:, None]
+    ab.add_edges((base + parent).ravel(), (base + i).ravel())
+    # Weite Brücken: erster Knoten jedes Clusters an einen früheren Knoten
+    if c > 1:
+        first = idx[per::per]
+        ab.add_edges(idx[0] + (rng.random(c - 1) * (first - idx[0])).astype(np.int64), first, weight=50.0)
+    return floors, {int(fl): idx[levels == fl] for fl in np.unique(f)}
+
+
+def _k3(ab: ArrayBuilding, n: int, rng, p: str) -> Tuple[int, FloorNodes]:
+    floors = clamp(n // 100, 2, 5)
+    per = n // floors // 2
+    i = np.arange(per)
+    floor_nodes = {}
+    for f in range(floors):
+        # Korridor und Raum abwechselnd (wie im Python-Generator)
+        pos = np.empty((2 * per, 3))
+        pos[0::2] = np.column_stack([i * 4.0, np.zeros(per), np.full(per, f * 3.0)])
+        pos[1::2] = np.column_stack([i * 4.0, rng.choice([-3.0, 3.0], per), np.full(per, f * 3.0)])
+        ids = [f"{p}{kind}_f{f}_{k}" for k in range(per) for kind in ("corr", "room")]
+        types = np.tile(np.array([T_CORRIDOR, T_ROOM], dtype=np.uint8), per)
+        idx = ab.add_nodes(ids, types, f, pos)
+        corr, room = idx[0::2], idx[1::2]
+        ab.add_edges(corr[:-1], corr[1:])
+        ab.add_edges(corr, room)
+        floor_nodes[f] = corr
+    a = np.array([rng.choice(floor_nodes[f]) for f in range(floors - 1)], dtype=np.int64)
+    b = np.array([rng.choice(floor_nodes[f + 1]) for f in range(floors - 1)], dtype=np.int64)
+    ab.add_edges(a, b, code=A_STAIRS)
+    return floors, floor_nodes
+
+
+def _k4(ab: ArrayBuilding, n: int, rng, p: str) -> Tuple[int, FloorNodes]:
+    floors = clamp(n // 20, 5, 40)
+    per = n // floors
+    levels = np.repeat(np.arange(floors), per)
+    pos = np.column_stack([rng.uniform(0, 10, (floors * per, 2)), levels * 3.0])
+    idx = ab.add_nodes([f"{p}n_f{f}_{i}" for f in range(floors) for i in range(per)],
+                       T_NODE, levels, pos)
+    chain = np.ones(len(idx), dtype=bool)
+    chain[::per] = False  # erster Knoten jeder Etage hat keinen Vorgänger
+    ab.add_edges(idx[chain] - 1, idx[chain])
+    floor_nodes = {f: idx[f * per:(f + 1) * per] for f in range(floors)}
+    if per:
+        ab.add_edges(idx[::per][:-1] + rng.integers(0, per, floors - 1),
+                     idx[::per][1:] + rng.integers(0, per, floors - 1))
+    return floors, floor_nodes
+
+
+def _k5(ab: ArrayBuilding, n: int, rng, p: str) -> Tuple[int, FloorNodes]:
+    floors = 5
+    levels = rng.integers(0, floors, n)
+    pos = np.column_stack([rng.uniform(0, 100, (n, 2)), levels * 3.0])
+    idx = ab.add_nodes([f"{p}rand_{i}" for i in range(n)], T_NODE, levels, pos)
+    # Mit Wahrscheinlichkeit 0.7 an einen zufälligen früheren Knoten
+    i = np.arange(1, n)
+    keep = rng.random(n - 1) > 0.3
+    ab.add_edges(idx[0] + (rng.random(n - 1) * i).astype(np.int64)[keep], idx[1:][keep])
+    return floors, {int(f): idx[levels == f] for f in np.unique(levels)}
+
+
+CLASSES = {"K1": _k1, "K2": _k2, "K3": _k3, "K4": _k4, "K5": _k5}
+
+
+def _elevators(ab: ArrayBuilding, floors: int, floor_nodes: FloorNodes, rng, p: str = ""):
+    """Wie generator.add_elevators: nicht-euklidische Aufzugskosten."""
+    for s in range(int(rng.integers(1, max(1, floors // 3) + 1))):
+        shaft = f"{p}E{s}"
+        served = np.sort(rng.choice(floors, int(rng.integers(2, floors + 1)), replace=False))
+        k = len(served)
+        # Kabine und Tür pro Etage abwechselnd (Knotenreihenfolge wie im Python-Generator)
+        pos = np.empty((2 * k, 3))
+        pos[0::2, :2] = rng.uniform(-10, -5, (k, 2))
+        pos[1::2, :2] = rng.uniform(-4, -2, (k, 2))
+        pos[:, 2] = np.repeat(served * 3.0, 2)
+        types = np.tile(np.array([T_CABIN, T_DOOR], dtype=np.uint8), k)
+        idx = ab.add_nodes([f"{kind}_{shaft}_F{f}" for f in served for kind in ("elev", "door")],
+                           types, np.repeat(served, 2), pos)
+        cabins, doors = idx[0::2], idx[1::2]
+        for c in cabins:
+            ab.node_attrs[int(c)] = {"shaft": shaft}
+
+        # Pro Etage: Stockwerk -> Tür, Tür -> Kabine, vorige Kabine -> Kabine
+        # (Kantenreihenfolge wie im Python-Generator, damit die Slots gleich liegen)
+        ea = np.full((k, 3), -1, dtype=np.int64)
+        eb = np.full((k, 3), -1, dtype=np.int64)
+        for j, f in enumerate(served):
+            nodes = floor_nodes.get(int(f), ())
+            if len(nodes):
+                ea[j, 0], eb[j, 0] = rng.choice(nodes), doors[j]
+        ea[:, 1], eb[:, 1] = doors, cabins
+        ea[1:, 2], eb[1:, 2] = cabins[:-1], cabins[1:]
+        w = np.full((k, 3), np.nan)
+        w[:, 1] = 5.0
+        # Wartezeit (10s) + Fahrtzeit
+        w[1:, 2] = 10.0 + np.diff(served) * 2.5
+        code = np.tile(np.array([A_NONE, A_ENTER, A_MOVE], dtype=np.uint8), (k, 1))
+        used = ea >= 0
+        ab.add_edges(ea[used], eb[used], w[used], code[used])
+    return ab
+
+
+def _campus(ab: ArrayBuilding, n: int, rng) -> None:
+    """
+    K6: mehrere Gebäude (K2–K4) in einem Raster, deren Eingänge über ein
+    Netz aus Außenwegen (Level 0) verbunden sind.
+    """
+    n_buildings = clamp(n // CAMPUS_BUILDING_NODES, 2, 64)
+    per = n // n_buildings
+    cols = math.ceil(math.sqrt(n_buildings))
+    x, y, row_h = 0.0, 0.0, 0.0
+    outdoor = []
+    for k in range(n_buildings):
+        p = f"b{k}_"
+        start = ab.n
+        floors, floor_nodes = CLASSES[rng.choice(["K2", "K3", "K4"])](ab, per, rng, p)
+        _elevators(ab, floors, floor_nodes, rng, p)
+        idx = np.arange(start, ab.n)
+        lo, hi = ab.bbox(idx)
+        if k % cols == 0 and k:
+            x, y, row_h = 0.0, y + row_h + CAMPUS_GAP, 0.0
+        ab.shift(idx, np.array([x - lo[0], y - lo[1], 0.0]))
+        # Außenknoten vor dem Gebäude, verbunden mit einem Knoten im Erdgeschoss
+        o = ab.add_nodes([f"{p}outdoor"], T_OUTDOOR, 0, [[x - CAMPUS_GAP / 2, y - CAMPUS_GAP / 2, 0.0]])
+        ground = floor_nodes.get(0, floor_nodes[min(floor_nodes)])
+        ab.add_edges(o, rng.choice(ground))
+        outdoor.append(o[0])
+        x += hi[0] - lo[0] + CAMPUS_GAP
+        row_h = max(row_h, hi[1] - lo[1])
+    # Wege zwischen benachbarten Gebäuden (rechts und unten im Raster)
+    outdoor = np.array(outdoor, dtype=np.int64)
+    k = np.arange(n_buildings)
+    right = (k % cols != cols - 1) & (k + 1 < n_buildings)
+    ab.add_edges(outdoor[right], outdoor[k[right] + 1])
+    down = k + cols < n_buildings
+    ab.add_edges(outdoor[down], outdoor[k[down] + cols])
+
+
+def gen_building_np(target_nodes: int, seed: int, b_class: str, name: Optional[str] = None) -> ArrayBuilding:
+    """Vektorisiertes Gegenstück zu generator.build_building (zusätzlich Klasse K6: Campus)."""
+    rng = np.random.default_rng(seed)
+    ab = ArrayBuilding(name or f"B_{b_class}_{target_nodes}_{seed}", b_class)
+    if b_class == "K6":
+        _campus(ab, target_nodes, rng)
+    else:
+        # Unbekannte Klassen wie im Python-Generator als K5
+        floors, floor_nodes = CLASSES.get(b_class, _k5)(ab, target_nodes, rng, "")
+        _elevators(ab, floors, floor_nodes, rng)
+    ab.finalize()
+    return ab
@@ -0,0 +1,192 @@
+import dataclasses
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from functools import partial
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from BuildingGraph import BuildingGraph
+from custom_dataclasses import Meta
+from stream_loader import CHUNK_SIZE, read_raw, stream_building
+
+# Binärformat des kompilierten Graphen (little endian), liegt als
+# <name>.bgc neben der JSON-Datei:
+#   Header (HEADER_SIZE Bytes): Magic, Version, |V|, Anzahl CSR-Slots,
+#                               Längen von Meta/ID-Tabelle, SHA-256 der JSON-Datei
+#   Meta          JSON (utf8)
+#   ID-Tabelle    Knoten-IDs (utf8), durch \0 getrennt, in Indexreihenfolge
+#   node_levels   int64   [|V|]
+#   node_pos      float64 [|V| x 3]  (NaN ohne pos)
+#   csr_offsets   int64   [|V| + 1]
+#   csr_targets   int64   [Slots]
+#   csr_weights   float64 [Slots]
+#   csr_flags     uint8   [Slots]
+# Jeder Abschnitt beginnt an einer 8-Byte-Grenze.
+MAGIC = b"BGGRPH"
+VERSION = 1
+HEADER = struct.Struct("<6sHQQQQ32s")
+HEADER_SIZE = 96
+SUFFIX = ".bgc"
+
+
+def cache_path(json_path: str) -> str:
+    return json_path.rsplit(".", 1)[0] + SUFFIX
+
+
+def source_digest(json_path: str) -> bytes:
+    """SHA-256 über den Inhalt der JSON-Datei (Validierung des Caches)."""
+    h = hashlib.sha256()
+    with open(json_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.digest()
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _layout(n: int, m: int, meta_len: int, ids_len: int) -> List[Tuple[str, str, int, int]]:
+    """(Name, Typcode, Offset, Anzahl Elemente) aller Array-Abschnitte."""
+    sections = []
+    offset = _align(HEADER_SIZE + meta_len + ids_len)
+    for name, code, count in (("node_levels", "q", n),
+                              ("node_pos", "d", 3 * n),
+                              ("csr_offsets", "q", n + 1),
+                              ("csr_targets", "q", m),
+                              ("csr_weights", "d", m),
+                              ("csr_flags", "B", m)):
+        sections.append((name, code, offset, count))
+        offset = _align(offset + count * array(code).itemsize)
+    return sections
+
+
+# --------------------------------------------------------
+# Schreiben
+# --------------------------------------------------------
+
+def save_compiled(graph: BuildingGraph, path: str, digest: bytes):
+    """Schreibt die kompilierten Arrays von graph (Profil "default") nach path."""
+    if not graph.compiled or graph.profile_name != "default":
+        raise ValueError("Only compiled default-profile graphs can be cached.")
+    n, m = graph.num_nodes(), len(graph.csr_targets)
+    meta = json.dumps(dataclasses.asdict(graph.meta)).encode("utf8")
+    ids = "\0".join(graph.node_ids).encode("utf8")
+
+    # Zuerst in eine temporäre Datei: parallele Leser sehen nie halbe Caches
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, n, m, len(meta), len(ids), digest).ljust(HEADER_SIZE, b"\0"))
+        f.write(meta)
+        f.write(ids)
+        for name, code, offset, _ in _layout(n, m, len(meta), len(ids)):
+            f.write(b"\0" * (offset - f.tell()))
+            data = array(code, getattr(graph, name))
+            if sys.byteorder != "little":
+                data.byteswap()
+            f.write(data.tobytes())
+    os.replace(tmp, path)
+
+
+# --------------------------------------------------------
+# Lesen
+# --------------------------------------------------------
+
+def read_header(path: str) -> Tuple[int, int, int, int, bytes]:
+    """(|V|, Slots, Meta-Länge, ID-Länge, SHA-256 der Quelle); ValueError bei fremden Dateien."""
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{path}: truncated graph cache.")
+    magic, version, n, m, meta_len, ids_len, digest = HEADER.unpack(raw[:HEADER.size])
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a compiled graph (version {VERSION}).")
+    return n, m, meta_len, ids_len, digest
+
+
+def load_compiled(path: str, use_mmap: bool = True,
+                  json_path: Optional[str] = None) -> BuildingGraph:
+    """
+    Lädt einen kompilierten Graphen ohne RoutingNode/RoutingEdge-Objekte.
+
+    Mit use_mmap werden die Arrays als memoryviews direkt auf die gemappte
+    Datei gelegt (read-only, die Seiten teilen sich alle Prozesse), sonst
+    in eigene arrays kopiert. raw_nodes/raw_edges werden bei Bedarf aus
+    json_path nachgeladen.
+    """
+    n, m, meta_len, ids_len, _ = read_header(path)
+    with open(path, "rb") as f:
+        if use_mmap and sys.byteorder == "little":
+            buf = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            buf = memoryview(f.read())
+            use_mmap = False
+
+    meta = Meta(**json.loads(bytes(buf[HEADER_SIZE:HEADER_SIZE + meta_len])))
+    graph = BuildingGraph(meta, None, None)
+    ids_start = HEADER_SIZE + meta_len
+    graph.node_ids = bytes(buf[ids_start:ids_start + ids_len]).decode("utf8").split("\0") if n else []
+    graph.node_index = dict(zip(graph.node_ids, range(n)))
+
+    for name, code, offset, count in _layout(n, m, meta_len, ids_len):
+        view = buf[offset:offset + count * array(code).itemsize].cast(code)
+        if not use_mmap:
+            data = array(code, view)
+            if sys.byteorder != "little":
+                data.byteswap()
+            view = data
+        setattr(graph, name, view)
+
+    # Level-Index ohne Python-Schleife über die Knoten
+    levels = np.frombuffer(graph.node_levels, dtype=np.int64)
+    order = np.argsort(levels, kind="stable")
+    bounds = np.flatnonzero(np.diff(levels[order])) + 1
+    graph.level_index = {
+        int(levels[chunk[0]]): chunk.tolist()
+        for chunk in np.split(order, bounds) if len(chunk)
+    }
+
+    graph.routing_nodes = None  # erst bei Zugriff erzeugt
+    graph.routing_edges = []
+    graph.compact = True
+    graph.compiled = True
+    graph.version = 1
+    if json_path is not None:
+        graph._raw_loader = partial(read_raw, json_path, CHUNK_SIZE)
+    return graph
+
+
+def load_cached(json_path: str, compact: bool = False, use_mmap: bool = True) -> BuildingGraph:
+    """
+    Kompilierter Graph zu json_path: aus dem Binär-Cache, falls dessen
+    SHA-256 zum Inhalt der JSON-Datei passt, sonst aus der JSON-Datei
+    (der Cache wird dabei neu geschrieben).
+    raw_nodes/raw_edges werden in beiden Fällen erst bei Zugriff gelesen.
+    """
+    path = cache_path(json_path)
+    digest = source_digest(json_path)
+    try:
+        if read_header(path)[4] == digest:
+            graph = load_compiled(path, use_mmap, json_path)
+            if not compact:
+                graph.routing_edges = [
+                    [graph._edge_at(slot) for slot in graph.edge_slots(i)]
+                    for i in range(graph.num_nodes())
+                ]
+                graph.compact = False
+            return graph
+    except (OSError, ValueError):
+        pass
+
+    graph = stream_building(json_path, compact=compact)
+    try:
+        save_compiled(graph, path, digest)
+    except OSError:
+        pass  # z.B. schreibgeschütztes Verzeichnis: ohne Cache weiter
+    return graph
@@ -1,24 +1,25 @@
 import json
 import time
 from heapq import heappush, heappop
-from typing import Optional, Tuple, List, Dict
-import itertools
+from typing import Callable, Optional, Tuple, List, Dict
 
 from BuildingGraph import BuildingGraph
-from RoutingModel import RoutingModel
+from RoutingModel import FLOOR_TRANSITION_PENALTY, RoutingModel
+from SearchContext import SearchContext
+from SearchInstrumentation import CompositeObserver, SearchObserver, TraceRecorder
+from shortest_paths import one_to_many, tree_hops, tree_path
 from custom_dataclasses import Node, Edge, Meta
-from visualize import visualize_step
+from visualize import render_trace
+
+INF = float("inf")
 
 
 # --------------------------------------------------------
 # Load and parse building JSON
 # --------------------------------------------------------
 
-def load_building(filepath="building.json") -> Tuple[BuildingGraph, RoutingModel]:
-    """Load building data and return compiled graph with routing model."""
-    with open(filepath, "r", encoding="utf8") as f:
-        data = json.load(f)
-
+def parse_building(data: Dict) -> Tuple[Meta, Dict[str, Node], List[Edge]]:
+    """Parse building JSON data into Meta, Node and Edge dataclasses."""
     # Parse meta
     meta = Meta(
         building_name=data["meta"]["building_name"],
@@ -30,33 +31,49 @@ def load_building(filepath="building.json") -> Tuple[BuildingGraph, RoutingModel
     # Parse nodes
     nodes = {}
     for n in data["nodes"]:
-        nodes[n["id"]] = Node(
-            id=n["id"],
-            type=n["type"],
-            level=n["level"],
-            pos=tuple(n["pos"]) if n.get("pos") else None,
-            attrs=n.get("attrs", {}),
-            name=n.get("name")
-        )
+        node = Node.from_json(n)
+        nodes[node.id] = node
 
     # Parse edges
-    edges = []
-    for e in data["edges"]:
-        edges.append(Edge(
-            a=e["a"],
-            b=e["b"],
-            weight=e["weight"],
-            attrs=e.get("attrs", {})
-        ))
-
-    # Build and compile graph
-    graph = BuildingGraph(meta, nodes, edges)
-    graph.compile_for_routing()
+    edges = [Edge.from_json(e) for e in data["edges"]]
+
+    return meta, nodes, edges
+
+
+def build_graph(data: Dict, compact: bool = False) -> BuildingGraph:
+    """Build and compile a BuildingGraph from parsed building JSON data."""
+    graph = BuildingGraph(*parse_building(data))
+    graph.compile_for_routing(compact=compact)
+    return graph
+
+
+def load_building(filepath="building.json",
+                  compact: bool = False,
+                  cache: bool = False,
+                  streaming: bool = False) -> Tuple[BuildingGraph, RoutingModel]:
+    """Load building data and return compiled graph with routing model.
+
+    With compact=True the graph keeps only its CSR arrays (no RoutingEdge lists).
+    With cache=True the compiled graph is read from (or written to) the binary
+    cache next to the JSON file, see graph_cache.py.
+    With streaming=True the JSON is parsed incrementally straight into the
+    compiled arrays (stream_loader.py); raw_nodes/raw_edges load on first access.
+    """
+    if cache:
+        from graph_cache import load_cached
+        graph = load_cached(filepath, compact=compact)
+    elif streaming:
+        from stream_loader import stream_building
+        graph = stream_building(filepath, compact=compact)
+    else:
+        with open(filepath, "r", encoding="utf8") as f:
+            data = json.load(f)
+        graph = build_graph(data, compact=compact)
 
     # Create routing model
     model = RoutingModel(
         graph,
-        floor_transition_penalty=5.0,
+        floor_transition_penalty=FLOOR_TRANSITION_PENALTY,
         use_3d_heuristic=True
     )
 
@@ -67,74 +84,269 @@ def load_building(filepath="building.json") -> Tuple[BuildingGraph, RoutingModel
 # Layered A* using RoutingModel
 # --------------------------------------------------------
 
+def astar_search(
+        graph: BuildingGraph,
+        model: RoutingModel,
+        start_idx: int,
+        goal_idx: int,
+        heuristic_fn: Optional[Callable[[int, int], float]] = None,
+        context: Optional[SearchContext] = None,
+        on_step: Optional[Callable[[List[Tuple[float, int, float]], int, int], None]] = None,
+        observer: Optional[SearchObserver] = None
+) -> Optional[float]:
+    """
+    A* core shared by layered_a_star and benchmark_core.run_astar.
+
+    Heap entries carry the g they were pushed with; an entry whose g is above
+    the node's current g is stale and skipped (lazy deletion). A closed node
+    whose g improves is reopened and expanded again (counted as a
+    re-expansion). Costs therefore match a search without closed set even
+    for an inconsistent heuristic such as RoutingModel.heuristic, and are
+    optimal whenever the heuristic is admissible.
+    Returns the goal cost (None if unreachable); path and counters stay in the
+    context (ctx.path_to(goal_idx), ctx.stats()).
+
+    There is a single loop for instrumented and plain searches. An observer
+    (SearchInstrumentation) receives every event through `if observed:`
+    guards, and on_step is called once per expansion. Without them each hook
+    costs one test of a local flag; there is no separate uninstrumented loop.
+    """
+    h = heuristic_fn if heuristic_fn is not None else model.heuristic
+    # Goal-bound heuristic (RoutingModel.bind_goal): index the table directly
+    h_values = getattr(h, "values", None)
+    targets = graph.csr_targets
+    weights = model.weights
+
+    ctx = context if context is not None else SearchContext.for_graph(graph)
+    ctx.reset()
+    epoch = ctx.epoch
+    g_score, came_from, stamp, closed = ctx.g, ctx.parent, ctx.stamp, ctx.closed
+    ctx.set_g(start_idx, 0.0)
+
+    observed = observer is not None or on_step is not None
+    if observed and observer is None:
+        observer = SearchObserver()
+
+    f_start = h(start_idx, goal_idx)
+    open_set = [(f_start, start_idx, 0.0)]
+    pushes, stale_pops, expanded, reexpansions = 1, 0, 0, 0
+    step = 0
+    cost = None
+    if observed:
+        observer.on_start(start_idx, goal_idx)
+        observer.on_push(start_idx, f_start)
+
+    try:
+        while open_set:
+            f_current, current, g_current = heappop(open_set)
+            if observed:
+                observer.on_pop(current, f_current)
+            if g_current > g_score[current]:
+                stale_pops += 1
+                if observed:
+                    observer.on_stale(current)
+                continue
+
+            if closed[current] == epoch:
+                reexpansions += 1
+            closed[current] = epoch
+            expanded += 1
+            if observed:
+                observer.on_expand(current, g_current)
+
+            if current == goal_idx:
+                cost = g_current
+                if observed:
+                    observer.on_goal(current, cost)
+                return cost
+
+            # Explore neighbors (CSR slots, weights baked by RoutingModel)
+            for slot in graph.edge_slots(current):
+                neighbor = targets[slot]
+                tentative = g_current + weights[slot]
+
+                # Gesperrte Kanten (Gewicht inf) werden nie relaxiert;
+                # geschlossene Knoten werden bei Verbesserung wieder geöffnet
+                if tentative < (g_score[neighbor] if stamp[neighbor] == epoch else INF):
+                    g_score[neighbor] = tentative
+                    came_from[neighbor] = current
+                    stamp[neighbor] = epoch
+                    hn = h_values[neighbor] if h_values is not None else h(neighbor, goal_idx)
+                    heappush(open_set, (tentative + hn, neighbor, tentative))
+                    pushes += 1
+                    if observed:
+                        observer.on_relax(current, neighbor, slot, tentative)
+                        observer.on_push(neighbor, tentative + hn)
+
+            if observed and on_step is not None:
+                on_step(open_set, current, step)
+            step += 1
+
+        return None
+    finally:
+        ctx.expanded = expanded
+        ctx.pushes = pushes
+        ctx.stale_pops = stale_pops
+        ctx.reexpansions = reexpansions
+        if observed:
+            observer.on_finish(cost)
+
+
 def layered_a_star(
         graph: BuildingGraph,
         model: RoutingModel,
         start_id: str,
         goal_id: str,
-        visualize: bool = False
+        visualize: bool = False,
+        context: Optional[SearchContext] = None,
+        goal_bound: bool = False,
+        block_size: int = 0,
+        observer: Optional[SearchObserver] = None
 ) -> Tuple[Optional[List[str]], Optional[float], float]:
-    """A* search using RoutingModel for cost and heuristic calculations."""
-    start_time = time.time()
+    """A* search using RoutingModel for cost and heuristic calculations.
+
+    Per-node state lives in a reusable SearchContext (one per graph by default),
+    so a query only pays for the nodes it actually touches. Search counters
+    (expansions, pushes, stale pops, re-expansions) are available afterwards
+    via context.stats().
+
+    With goal_bound=True the heuristic is evaluated vectorized against the goal
+    (RoutingModel.bind_goal), for all nodes or lazily per block_size nodes.
+
+    An observer (SearchInstrumentation: EventCounter, LevelHistogram,
+    TraceRecorder) receives pop/expand/relax/push/stale/goal events.
+    """
+    start_time = time.perf_counter()
 
     start_idx = graph.idx(start_id)
     goal_idx = graph.idx(goal_id)
+    ctx = context if context is not None else SearchContext.for_graph(graph)
 
-    open_set = []
-    heappush(open_set, (0.0, start_idx))
+    # visualize: nur einen kompakten Trace aufzeichnen, gerendert wird nach der Suche
+    trace = TraceRecorder(record_relax=False) if visualize else None
+    if trace is not None:
+        observer = CompositeObserver([trace, observer]) if observer is not None else trace
 
-    closed_set = set()
-    step = 0
+    heuristic_fn = model.bind_goal(goal_idx, block_size=block_size) if goal_bound else None
+
+    cost = astar_search(graph, model, start_idx, goal_idx, heuristic_fn,
+                        context=ctx, observer=observer)
+    elapsed = time.perf_counter() - start_time
+    path = ctx.path_to(goal_idx) if cost is not None else None
+    if trace is not None:
+        render_trace(graph, trace, path=path)
+    if cost is None:
+        return None, None, elapsed
 
-    came_from = {}
-    g_score = {i: float("inf") for i in range(len(graph.routing_nodes))}
-    g_score[start_idx] = 0.0
-
-    f_score = {i: float("inf") for i in range(len(graph.routing_nodes))}
-    f_score[start_idx] = model.heuristic(start_idx, goal_idx)
-
-    while open_set:
-        _, current = heappop(open_set)
-
-        if current == goal_idx:
-            # Reconstruct path
-            path_indices = [current]
-            while current in came_from:
-                current = came_from[current]
-                path_indices.append(current)
-            path_indices.reverse()
-
-            # Convert to IDs
-            path_ids = [graph.id(idx) for idx in path_indices]
-            total_time = time.time() - start_time
-            return path_ids, g_score[goal_idx], total_time
-
-        # Explore neighbors using RoutingModel
-        for edge in graph.neighbors(current):
-            neighbor = edge.target
-            tentative = g_score[current] + model.edge_cost(current, edge)
-
-            if tentative < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative
-                f_score[neighbor] = tentative + model.heuristic(neighbor, goal_idx)
-                heappush(open_set, (f_score[neighbor], neighbor))
-
-        if visualize:
-            visualize_step(
-            graph,
-            open_set,
-            closed_set,
-            current,
-            start_idx,
-            goal_idx,
-            step
-        )
-
-        closed_set.add(current)
-        step += 1
-
-    return None, None, time.time() - start_time
+    # Reconstruct path and convert to IDs
+    path_ids = [graph.id(idx) for idx in path]
+    return path_ids, cost, elapsed
+
+
+# --------------------------------------------------------
+# Bidirectional A*
+# --------------------------------------------------------
+
+def bidirectional_astar_search(
+        graph: BuildingGraph,
+        model: RoutingModel,
+        start_idx: int,
+        goal_idx: int,
+        heuristic_fn: Optional[Callable[[int, int], float]] = None
+) -> Tuple[Optional[float], Optional[List[int]], int]:
+    """
+    Bidirectional A* with average potentials (Ikeda et al.).
+
+    Forward potential p(v) = (h(v, goal) - h(v, start)) / 2, backward -p(v),
+    so both searches see the same non-negative reduced costs as long as h is
+    consistent. The default is the ALT bound (RoutingModel.heuristic_alt);
+    a constant h gives plain bidirectional Dijkstra. RoutingModel.heuristic
+    and heuristic_3d_only are not consistent on the generated buildings
+    (non-Euclidean elevator and floor edges) and can return wrong costs here.
+    The search stops once the smallest forward key plus the smallest
+    backward key reaches the best meeting cost.
+
+    The backward search walks the same CSR slots as the forward search, so
+    the graph must be symmetric: BuildingGraph stores every edge in both
+    directions and the RoutingModel overlay always changes both.
+
+    Returns (cost, path indices, expanded nodes); (None, None, expanded) if
+    the goal is unreachable.
+    """
+    h = heuristic_fn if heuristic_fn is not None else model.heuristic_alt
+    targets = graph.csr_targets
+    weights = model.weights
+
+    def potential(v: int) -> float:
+        return (h(v, goal_idx) - h(v, start_idx)) * 0.5
+
+    # Side 0: forward from start, side 1: backward from goal
+    g = ({start_idx: 0.0}, {goal_idx: 0.0})
+    parent = ({start_idx: -1}, {goal_idx: -1})
+    closed = (set(), set())
+    heaps = ([(potential(start_idx), start_idx)], [(-potential(goal_idx), goal_idx)])
+    sign = (1.0, -1.0)
+
+    best = 0.0 if start_idx == goal_idx else float("inf")
+    meet = start_idx if start_idx == goal_idx else -1
+    expanded = 0
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        _, current = heappop(heaps[side])
+        if current in closed[side]:
+            continue
+        closed[side].add(current)
+        expanded += 1
+
+        g_side, g_other = g[side], g[1 - side]
+        g_current = g_side[current]
+        for slot in graph.edge_slots(current):
+            neighbor = targets[slot]
+            tentative = g_current + weights[slot]
+
+            other = g_other.get(neighbor)
+            if other is not None and tentative + other < best:
+                best = tentative + other
+                meet = neighbor
+
+            if tentative < g_side.get(neighbor, float("inf")):
+                g_side[neighbor] = tentative
+                parent[side][neighbor] = current
+                key = tentative + sign[side] * potential(neighbor)
+                heappush(heaps[side], (key, neighbor))
+
+    if meet == -1:
+        return None, None, expanded
+
+    path = [meet]
+    while parent[0][path[-1]] != -1:
+        path.append(parent[0][path[-1]])
+    path.reverse()
+    v = meet
+    while parent[1][v] != -1:
+        v = parent[1][v]
+        path.append(v)
+    return best, path, expanded
+
+
+def bidirectional_a_star(
+        graph: BuildingGraph,
+        model: RoutingModel,
+        start_id: str,
+        goal_id: str,
+        heuristic_fn: Optional[Callable[[int, int], float]] = None
+) -> Tuple[Optional[List[str]], Optional[float], float]:
+    """Bidirectional variant of layered_a_star with the same return value."""
+    start_time = time.perf_counter()
+    cost, path, _ = bidirectional_astar_search(
+        graph, model, graph.idx(start_id), graph.idx(goal_id), heuristic_fn
+    )
+    if path is None:
+        return None, None, time.perf_counter() - start_time
+    return [graph.id(idx) for idx in path], cost, time.perf_counter() - start_time
 
 
 # --------------------------------------------------------
@@ -156,41 +368,58 @@ def benchmark_all_pairs(
         model: RoutingModel,
         max_pairs: Optional[int] = None
 ) -> Optional[Dict]:
-    """Benchmark pathfinding across all node pairs."""
+    """Benchmark pathfinding across all node pairs.
+
+    Runs one Dijkstra tree per source (shortest_paths.one_to_many) instead of
+    one A* per pair; the per-pair time is the tree time divided by its targets.
+    """
     ids = list(graph.raw_nodes.keys())
-    pairs = list(itertools.permutations(ids, 2))
-
-    if max_pairs:
-        pairs = pairs[:max_pairs]
-
-    results = []
-    for a, b in pairs:
-        path, cost, dt = layered_a_star(graph, model, a, b)
-        if path:
-            results.append({
-                'a': a,
-                'b': b,
-                'path': path,
-                'cost': cost,
-                'time': dt
-            })
-
-    if not results:
+    remaining = max_pairs if max_pairs else len(ids) * (len(ids) - 1)
+
+    count, cost_sum, time_sum, hops_sum = 0, 0.0, 0.0, 0
+    shortest = longest = None
+
+    for a in ids:
+        if remaining <= 0:
+            break
+        # Same pair order as itertools.permutations(ids, 2)
+        targets = [b for b in ids if b != a][:remaining]
+        remaining -= len(targets)
+
+        t0 = time.perf_counter()
+        tree = one_to_many(graph, model, graph.idx(a), [graph.idx(b) for b in targets])
+        dt = (time.perf_counter() - t0) / len(targets)
+        hops = tree_hops(tree)
+
+        for b in targets:
+            bi = graph.idx(b)
+            cost = tree.dist[bi]
+            if cost == float("inf"):
+                continue
+            count += 1
+            cost_sum += cost
+            time_sum += dt
+            hops_sum += hops[bi]
+            if shortest is None or cost < shortest['cost']:
+                shortest = {'a': a, 'b': b, 'tree': tree, 'cost': cost, 'time': dt}
+            if longest is None or cost > longest['cost']:
+                longest = {'a': a, 'b': b, 'tree': tree, 'cost': cost, 'time': dt}
+
+    if not count:
         print("No reachable node pairs found for benchmarking.")
         return None
 
-    costs = [r['cost'] for r in results]
-    times = [r['time'] for r in results]
-
-    shortest = min(results, key=lambda x: x['cost'])
-    longest = max(results, key=lambda x: x['cost'])
+    # Paths only for the two reported pairs
+    for r in (shortest, longest):
+        tree = r.pop('tree')
+        r['path'] = [graph.id(i) for i in tree_path(tree, graph.idx(r['b']))]
 
-    avg_cost = sum(costs) / len(costs)
-    avg_time = sum(times) / len(times)
-    avg_hops = sum(len(r['path']) - 1 for r in results) / len(results)
+    avg_cost = cost_sum / count
+    avg_time = time_sum / count
+    avg_hops = hops_sum / count
 
     stats = {
-        'count': len(results),
+        'count': count,
         'avg_cost': avg_cost,
         'avg_time': avg_time,
         'avg_hops': avg_hops,
@@ -9,7 +9,10 @@ from benchmark_h6 import run_scalability_benchmark
 
 def main():
     data_dir="generated_buildings"
-    raw_results = collect_benchmark_data(data_dir, pairs_per_building=20)
+    # Gebäude parallel auf alle Kerne verteilt (reproduzierbar, siehe building_seed);
+    # bereits gemessene Gebäude/Algorithmen kommen aus dem ResultStore
+    raw_results = collect_benchmark_data(data_dir, pairs_per_building=20, workers=None,
+                                         cache_dir="benchmark_results")
     run_h1(raw_results)
     run_h2(raw_results)
     run_h3(raw_results)
@@ -0,0 +1,167 @@
+from heapq import heappush, heappop
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from BuildingGraph import BuildingGraph
+from custom_dataclasses import ShortestPathTree
+
+if TYPE_CHECKING:  # RoutingModel importiert (über Landmarks) dieses Modul
+    from RoutingModel import RoutingModel
+
+INF = float("inf")
+
+
+# --------------------------------------------------------
+# Dijkstra auf dem kompilierten Graphen (CSR)
+# --------------------------------------------------------
+
+def dijkstra(
+        graph: BuildingGraph,
+        weights: Sequence[float],
+        source: int
+) -> Tuple[List[float], List[int]]:
+    """
+    Vollständiger Kürzeste-Wege-Baum ab source.
+    weights ist ein Gewicht pro CSR-Slot (z.B. RoutingModel.weights).
+    Rückgabe: (Distanzen, Vorgänger) pro Knotenindex; unerreichbar = inf / -1.
+    """
+    tree = _shortest_path_tree(graph, weights, source)
+    return tree.dist, tree.parent
+
+
+def _shortest_path_tree(
+        graph: BuildingGraph,
+        weights: Sequence[float],
+        source: int,
+        targets: Optional[Iterable[int]] = None
+) -> ShortestPathTree:
+    n = len(graph.csr_offsets) - 1
+    offsets, csr_targets = graph.csr_offsets, graph.csr_targets
+    dist = [INF] * n
+    parent = [-1] * n
+    order = []
+    dist[source] = 0.0
+    remaining = set(targets) if targets is not None else None
+
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heappop(heap)
+        if d > dist[u]:
+            continue
+        order.append(u)
+        if remaining is not None:
+            remaining.discard(u)
+            if not remaining:
+                break
+        for slot in range(offsets[u], offsets[u + 1]):
+            v = csr_targets[slot]
+            nd = d + weights[slot]
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heappush(heap, (nd, v))
+    return ShortestPathTree(source=source, dist=dist, parent=parent, order=order)
+
+
+# --------------------------------------------------------
+# Batch-API: one-to-many / many-to-many
+# --------------------------------------------------------
+
+def one_to_many(
+        graph: BuildingGraph,
+        model: "RoutingModel",
+        source: int,
+        targets: Optional[Iterable[int]] = None
+) -> ShortestPathTree:
+    """
+    Ein Dijkstra-Baum ab source beantwortet alle Ziele auf einmal.
+    Mit targets endet die Suche, sobald alle Ziele abgeschlossen sind;
+    Distanzen anderer Knoten sind dann nur obere Schranken.
+    """
+    return _shortest_path_tree(graph, model.weights, source, targets)
+
+
+def many_to_many(
+        graph: BuildingGraph,
+        model: "RoutingModel",
+        sources: Sequence[int],
+        targets: Optional[Sequence[int]] = None,
+        with_predecessors: bool = False
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Distanzmatrix [len(sources) x len(targets)] (inf = unerreichbar), ein
+    Dijkstra-Baum pro Quelle. Ohne targets sind alle Knoten Ziele.
+    Mit with_predecessors zusätzlich die Vorgängermatrix
+    [len(sources) x |V|] (-1 = kein Vorgänger), für tree_path-artige Rekonstruktion.
+    """
+    n = graph.num_nodes()
+    cols = list(targets) if targets is not None else list(range(n))
+    dist = np.full((len(sources), len(cols)), INF)
+    pred = np.full((len(sources), n), -1, dtype=np.int64) if with_predecessors else None
+
+    for row, s in enumerate(sources):
+        tree = one_to_many(graph, model, s, cols if targets is not None else None)
+        dist[row] = [tree.dist[c] for c in cols]
+        if pred is not None:
+            pred[row] = tree.parent
+    return dist, pred
+
+
+def tree_path(tree: ShortestPathTree, target: int) -> Optional[List[int]]:
+    """Pfad (Indizes) von tree.source nach target, None falls unerreichbar."""
+    if tree.dist[target] == INF:
+        return None
+    path = [target]
+    while path[-1] != tree.source:
+        path.append(tree.parent[path[-1]])
+    path.reverse()
+    return path
+
+
+def tree_hops(tree: ShortestPathTree) -> Dict[int, int]:
+    """Kantenanzahl des Baum-Pfads für jeden abgeschlossenen Knoten."""
+    hops = {tree.source: 0}
+    for v in tree.order[1:]:
+        hops[v] = hops[tree.parent[v]] + 1
+    return hops
+
+
+def level_dijkstra(
+        graph: BuildingGraph,
+        weights: Sequence[float],
+        source: int,
+        stop_at: Optional[Set[int]] = None
+) -> Tuple[Dict[int, float], Dict[int, int]]:
+    """
+    Dijkstra nur über Kanten innerhalb des Levels von source.
+    Bricht ab, sobald alle Knoten aus stop_at abgeschlossen sind.
+    Rückgabe: (Distanzen, Vorgänger) als Dicts der erreichten Knoten.
+    """
+    offsets, targets, levels = graph.csr_offsets, graph.csr_targets, graph.node_levels
+    level = levels[source]
+    remaining = set(stop_at) if stop_at is not None else None
+    dist = {source: 0.0}
+    parent = {source: -1}
+    closed = set()
+
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heappop(heap)
+        if u in closed:
+            continue
+        closed.add(u)
+        if remaining is not None:
+            remaining.discard(u)
+            if not remaining:
+                break
+        for slot in range(offsets[u], offsets[u + 1]):
+            v = targets[slot]
+            if levels[v] != level:
+                continue
+            nd = d + weights[slot]
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                parent[v] = u
+                heappush(heap, (nd, v))
+    return dist, parent
@@ -0,0 +1,176 @@
+import json
+import re
+import sys
+from array import array
+from functools import partial
+from typing import Any, Dict, Iterator, List, TextIO, Tuple
+
+from BuildingGraph import BuildingGraph, _pack_edge_flags
+from custom_dataclasses import Edge, Meta, Node
+
+CHUNK_SIZE = 1 << 20
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _JsonStream:
+    """
+    Minimaler inkrementeller Leser für das Gebäude-JSON: navigiert durch das
+    Top-Level-Objekt und dekodiert die Elemente der Arrays einzeln
+    (json.JSONDecoder.raw_decode auf einem nachgeladenen Puffer).
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Verbrauchten Teil verwerfen, damit der Puffer klein bleibt
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Nächstes Nicht-Whitespace-Zeichen ('' am Dateiende)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str):
+        found = self.peek()
+        if found != ch:
+            raise ValueError(f"Invalid building JSON: expected '{ch}', found '{found or 'EOF'}'.")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Dekodiert den nächsten vollständigen JSON-Wert."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Zahl am Pufferende könnte abgeschnitten sein
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def object_keys(self) -> Iterator[str]:
+        """Schlüssel des aktuellen Objekts; der Aufrufer liest jeweils den Wert."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def array_items(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def stream_building(filepath: str, compact: bool = True, lazy_raw: bool = True,
+                    chunk_size: int = CHUNK_SIZE) -> BuildingGraph:
+    """
+    Lädt und kompiliert ein Gebäude, ohne das ganze JSON im Speicher zu halten.
+
+    Knoten und Kanten werden einzeln gelesen und direkt in die Arrays
+    geschrieben, aus denen BuildingGraph.compile_from_arrays die CSR-Struktur
+    baut; es entstehen keine Node/Edge-Objekte. Mit lazy_raw werden
+    raw_nodes/raw_edges beim ersten Zugriff aus der Datei nachgeladen,
+    sonst bleiben sie None.
+    """
+    meta = None
+    seen_nodes = False
+    node_ids: List[str] = []
+    node_index: Dict[str, int] = {}
+    nan = float("nan")
+    levels, pos = array("l"), array("d")
+    edge_a, edge_b = array("l"), array("l")
+    edge_w, edge_f = array("d"), array("B")
+
+    with open(filepath, "r", encoding="utf8") as f:
+        stream = _JsonStream(f, chunk_size)
+        for key in stream.object_keys():
+            if key == "meta":
+                m = stream.value()
+                meta = Meta(building_name=m["building_name"], group=m["group"],
+                            unit=m["unit"], format_version=m["format_version"])
+            elif key == "nodes":
+                seen_nodes = True
+                for n in stream.array_items():
+                    nid = sys.intern(n["id"])
+                    node_index[nid] = len(node_ids)
+                    node_ids.append(nid)
+                    levels.append(n["level"])
+                    pos.extend(n["pos"] if n.get("pos") else (nan, nan, nan))
+            elif key == "edges":
+                if not seen_nodes:
+                    raise ValueError(f"{filepath}: 'nodes' must precede 'edges' for streaming.")
+                for e in stream.array_items():
+                    edge_a.append(node_index[e["a"]])
+                    edge_b.append(node_index[e["b"]])
+                    edge_w.append(e["weight"])
+                    edge_f.append(_pack_edge_flags(e.get("attrs", {})))
+            else:
+                stream.value()
+
+    if meta is None:
+        raise ValueError(f"{filepath}: missing 'meta'.")
+
+    graph = BuildingGraph(meta, None, None)
+    graph.compile_from_arrays(node_ids, levels, pos, edge_a, edge_b, edge_w, edge_f,
+                              compact=compact, node_index=node_index)
+    if lazy_raw:
+        graph._raw_loader = partial(read_raw, filepath, chunk_size)
+    return graph
+
+
+def read_raw(filepath: str, chunk_size: int) -> Tuple[Dict[str, Node], List[Edge]]:
+    """raw_nodes/raw_edges für einen gestreamten Graphen (ebenfalls inkrementell gelesen)."""
+    nodes: Dict[str, Node] = {}
+    edges: List[Edge] = []
+    with open(filepath, "r", encoding="utf8") as f:
+        stream = _JsonStream(f, chunk_size)
+        for key in stream.object_keys():
+            if key == "nodes":
+                for n in stream.array_items():
+                    node = Node.from_json(n)
+                    nodes[node.id] = node
+            elif key == "edges":
+                for e in stream.array_items():
+                    edges.append(Edge.from_json(e))
+            else:
+                stream.value()
+    return nodes, edges
@@ -0,0 +1,44 @@
+import os
+import random
+import sys
+from array import array
+from typing import Dict, List, Tuple
+
+import pytest
+
+# Module liegen flach im Repository-Root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from BuildingGraph import BuildingGraph  # noqa: E402
+from custom_dataclasses import Meta  # noqa: E402
+from generator import build_building  # noqa: E402
+
+CLASSES = ("K1", "K2", "K3", "K4", "K5")
+
+
+def tiny_graph(edges: List[Tuple[int, int, float]], n: int, levels=None) -> BuildingGraph:
+    """Kompakter Graph aus (a, b, Gewicht)-Tripeln, Knoten-IDs "v0".."v{n-1}"."""
+    graph = BuildingGraph(Meta("tiny", "test", "meters", 1), None, None)
+    nan = float("nan")
+    graph.compile_from_arrays(
+        [f"v{i}" for i in range(n)],
+        array("l", levels or [0] * n),
+        array("d", [nan] * (3 * n)),
+        array("l", [a for a, _, _ in edges]),
+        array("l", [b for _, b, _ in edges]),
+        array("d", [w for _, _, w in edges]),
+        array("B", [0] * len(edges)),
+        compact=True,
+    )
+    return graph
+
+
+@pytest.fixture(scope="session")
+def buildings() -> Dict[str, BuildingGraph]:
+    """Ein kleines Gebäude pro Klasse (kompakt kompiliert)."""
+    return {cls: build_building(200, 7, cls).compile() for cls in CLASSES}
+
+
+def query_pairs(graph: BuildingGraph, k: int = 15, seed: int = 0) -> List[Tuple[int, int]]:
+    rnd = random.Random(seed)
+    return [tuple(rnd.sample(range(graph.num_nodes()), 2)) for _ in range(k)]
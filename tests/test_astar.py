@@ -0,0 +1,96 @@
+from heapq import heappop, heappush
+
+import pytest
+
+from RoutingModel import RoutingModel
+from SearchContext import SearchContext
+from SearchInstrumentation import EV_EXPAND, EventCounter, TraceRecorder
+from layered_a_star_ChatGPT import astar_search
+from shortest_paths import dijkstra
+
+from conftest import CLASSES, query_pairs, tiny_graph
+
+
+def _search_without_closed_set(graph, model, s, t):
+    """Referenz: A* wie vor dem SearchContext (jeder Eintrag wird expandiert)."""
+    g = {s: 0.0}
+    heap = [(model.heuristic(s, t), s)]
+    while heap:
+        _, u = heappop(heap)
+        if u == t:
+            return g[u]
+        for slot in graph.edge_slots(u):
+            v = graph.csr_targets[slot]
+            nd = g[u] + model.weights[slot]
+            if nd < g.get(v, float("inf")):
+                g[v] = nd
+                heappush(heap, (nd + model.heuristic(v, t), v))
+    return None
+
+
+def test_reopens_closed_node_for_inconsistent_heuristic():
+    # s=0, a=1, b=2, t=3: h(b) zulässig, aber inkonsistent -> a wird zu früh geschlossen
+    graph = tiny_graph([(0, 1, 4.0), (0, 2, 1.0), (2, 1, 1.0), (1, 3, 5.0)], 4)
+    model = RoutingModel(graph)
+    h = {0: 0.0, 1: 0.0, 2: 5.0, 3: 0.0}
+    ctx = SearchContext.for_graph(graph)
+
+    cost = astar_search(graph, model, 0, 3, lambda v, t: h[v], ctx)
+
+    assert cost == 7.0
+    assert ctx.path_to(3) == [0, 2, 1, 3]
+    assert ctx.reexpansions == 1
+
+
+@pytest.mark.parametrize("cls", CLASSES)
+def test_layered_matches_search_without_closed_set(buildings, cls):
+    graph = buildings[cls]
+    model = RoutingModel(graph, floor_transition_penalty=5.0)
+    ctx = SearchContext.for_graph(graph)
+    for s, t in query_pairs(graph):
+        assert astar_search(graph, model, s, t, context=ctx) == \
+            pytest.approx(_search_without_closed_set(graph, model, s, t))
+
+
+@pytest.mark.parametrize("cls", CLASSES)
+def test_consistent_heuristics_are_optimal(buildings, cls):
+    graph = buildings[cls]
+    model = RoutingModel(graph, floor_transition_penalty=5.0)
+    ctx = SearchContext.for_graph(graph)
+    for s, t in query_pairs(graph):
+        dist, _ = dijkstra(graph, model.weights, s)
+        expected = dist[t] if dist[t] != float("inf") else None
+        assert astar_search(graph, model, s, t, lambda v, g: 0.0, ctx) == pytest.approx(expected)
+        assert astar_search(graph, model, s, t, model.bind_alt(s, t), ctx) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("cls", CLASSES)
+def test_observer_does_not_change_search(buildings, cls):
+    graph = buildings[cls]
+    model = RoutingModel(graph, floor_transition_penalty=5.0)
+    ctx = SearchContext.for_graph(graph)
+    for s, t in query_pairs(graph, k=5):
+        cost = astar_search(graph, model, s, t, context=ctx)
+        stats, path = ctx.stats(), ctx.path_to(t) if cost is not None else None
+
+        counter, trace = EventCounter(), TraceRecorder()
+        assert astar_search(graph, model, s, t, context=ctx, observer=counter) == cost
+        assert ctx.stats() == stats
+        assert counter.counts[EV_EXPAND] == stats.expanded
+        astar_search(graph, model, s, t, context=ctx, observer=trace)
+        if path is not None:
+            assert ctx.path_to(t) == path
+            assert trace.expansion_order()[-1] == t
+
+
+@pytest.mark.parametrize("cls", CLASSES)
+@pytest.mark.parametrize("kind, block_size", [("layered", 0), ("layered", 64), ("3d", 0), ("3d", 64)])
+def test_goal_heuristic_matches_model(buildings, cls, kind, block_size):
+    graph = buildings[cls]
+    model = RoutingModel(graph, floor_transition_penalty=5.0)
+    reference = model.heuristic if kind == "layered" else model.heuristic_3d_only
+    for _, goal in query_pairs(graph, k=5, seed=3):
+        bound = model.bind_goal(goal, kind, block_size)
+        # Rückwärts, damit im Block-Modus auch der kürzere letzte Block zuerst entsteht
+        for idx in reversed(range(graph.num_nodes())):
+            assert bound(idx, goal) == pytest.approx(reference(idx, goal), rel=1e-12, abs=1e-9)
@@ -0,0 +1,30 @@
+import numpy as np
+
+from ResultStore import COLUMNS, ResultStore
+from benchmark_heuristic import break_even
+
+
+def _rows(*wins):
+    return [{"n_nodes": 100 * (i + 1), "scalar": 1.0, "vector": 0.5 if w else 2.0}
+            for i, w in enumerate(wins)]
+
+
+def test_break_even_ignores_isolated_small_wins():
+    assert break_even(_rows(True, False, False, True, True), "vector") == 400
+    assert break_even(_rows(False, True, True), "vector") == 200
+    assert break_even(_rows(True, True, False), "vector") is None
+
+
+def test_result_store_frame_skips_temp_files(tmp_path):
+    store = ResultStore(str(tmp_path))
+    columns = {c: np.arange(3) for c in COLUMNS}
+    key = ResultStore.key(b"\x01" * 32, "astar", 2, (10, 0))
+    store.put(key, columns, {"name": "B_K1", "seed": 0})
+    assert [p.name for p in tmp_path.iterdir()] == [f"{key}.npz"]
+
+    # Reste abgebrochener put()-Aufrufe (alte und neue Endung), vollständig lesbar
+    (tmp_path / f"{key}.123.tmp.npz").write_bytes((tmp_path / f"{key}.npz").read_bytes())
+    (tmp_path / f"{key}.123.tmp").write_bytes((tmp_path / f"{key}.npz").read_bytes())
+    df = store.frame()
+    assert len(df) == 3
+    assert set(df["algorithm"]) == {"astar"} and set(df["version"]) == {2}
@@ -0,0 +1,40 @@
+import math
+
+import pytest
+
+from RoutingModel import RoutingModel
+from layered_a_star_ChatGPT import bidirectional_a_star, bidirectional_astar_search
+from shortest_paths import dijkstra
+
+from conftest import CLASSES, query_pairs
+
+
+def _path_cost(graph, model, path):
+    cost = 0.0
+    for a, b in zip(path, path[1:]):
+        cost += min(model.weights[s] for s in graph.edge_slots(a) if graph.csr_targets[s] == b)
+    return cost
+
+
+@pytest.mark.parametrize("cls", CLASSES)
+@pytest.mark.parametrize("potential", ["alt", "zero"])
+def test_bidirectional_is_optimal(buildings, cls, potential):
+    graph = buildings[cls]
+    model = RoutingModel(graph, floor_transition_penalty=10.0)
+    h = None if potential == "alt" else (lambda v, t: 0.0)
+    for s, t in query_pairs(graph):
+        dist, _ = dijkstra(graph, model.weights, s)
+        cost, path, _ = bidirectional_astar_search(graph, model, s, t, h)
+        if dist[t] == math.inf:
+            assert cost is None and path is None
+            continue
+        assert cost == pytest.approx(dist[t])
+        assert path[0] == s and path[-1] == t
+        assert _path_cost(graph, model, path) == pytest.approx(cost)
+
+
+def test_bidirectional_same_start_and_goal(buildings):
+    graph = buildings["K3"]
+    model = RoutingModel(graph)
+    path, cost, _ = bidirectional_a_star(graph, model, graph.id(5), graph.id(5))
+    assert path == [graph.id(5)] and cost == 0.0
@@ -0,0 +1,32 @@
+import math
+
+import pytest
+
+from ContractionHierarchy import ContractionHierarchy
+from RoutingModel import RoutingModel
+from benchmark_ch import run_ch_benchmark
+from shortest_paths import dijkstra
+
+from conftest import CLASSES, query_pairs
+
+
+@pytest.mark.parametrize("cls", CLASSES)
+def test_ch_is_optimal(buildings, cls):
+    graph = buildings[cls]
+    model = RoutingModel(graph, floor_transition_penalty=10.0)
+    ch = ContractionHierarchy(graph, model)
+    for s, t in query_pairs(graph):
+        dist, _ = dijkstra(graph, model.weights, s)
+        cost, path = ch.query_idx(s, t)
+        if dist[t] == math.inf:
+            assert cost is None
+            continue
+        assert cost == pytest.approx(dist[t])
+        assert path[0] == s and path[-1] == t
+        # Entpackter Pfad besteht nur aus Originalkanten
+        for a, b in zip(path, path[1:]):
+            assert b in {graph.csr_targets[slot] for slot in graph.edge_slots(a)}
+
+
+def test_ch_benchmark_without_buildings(tmp_path):
+    assert run_ch_benchmark(str(tmp_path / "missing")).empty
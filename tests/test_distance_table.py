@@ -0,0 +1,29 @@
+import math
+
+import pytest
+
+from DistanceTable import DistanceTable, build_distance_table
+from RoutingModel import RoutingModel
+from shortest_paths import dijkstra
+
+from conftest import query_pairs
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_table_matches_dijkstra(buildings, tmp_path, quantize):
+    graph = buildings["K5"]
+    model = RoutingModel(graph, floor_transition_penalty=5.0)
+    path = str(tmp_path / "table.apsp")
+    build_distance_table(graph, model, path, quantize=quantize, chunk=64)
+    table = DistanceTable(path, graph, model)
+    # Quantisiert: höchstens ein halber Schritt plus float32-Rundung
+    tol = table.scale * 0.51 if quantize else 1e-3
+
+    for s, t in query_pairs(graph, k=30):
+        dist, _ = dijkstra(graph, model.weights, s)
+        if dist[t] == math.inf:
+            assert table.distance_idx(s, t) is None
+            continue
+        assert table.distance_idx(s, t) == pytest.approx(dist[t], abs=tol)
+        hops = table.path_idx(s, t)
+        assert hops[0] == s and hops[-1] == t
@@ -0,0 +1,25 @@
+import math
+
+import pytest
+
+from LevelOverlay import LevelOverlay
+from RoutingModel import RoutingModel
+from shortest_paths import dijkstra
+
+from conftest import CLASSES, query_pairs
+
+
+@pytest.mark.parametrize("cls", CLASSES)
+def test_level_overlay_is_optimal(buildings, cls):
+    graph = buildings[cls]
+    model = RoutingModel(graph, floor_transition_penalty=5.0)
+    overlay = LevelOverlay(graph, model)
+    for s, t in query_pairs(graph):
+        dist, _ = dijkstra(graph, model.weights, s)
+        cost, path = overlay.query_idx(s, t)
+        if dist[t] == math.inf:
+            assert cost is None
+            continue
+        assert cost == pytest.approx(dist[t])
+        for a, b in zip(path, path[1:]):
+            assert b in {graph.csr_targets[slot] for slot in graph.edge_slots(a)}
@@ -0,0 +1,99 @@
+import json
+import os
+
+import pytest
+
+from RoutingModel import RoutingModel
+from SearchContext import SearchContext
+from graph_cache import cache_path, load_cached
+from generator import build_building
+from layered_a_star_ChatGPT import astar_search, build_graph, load_building
+from stream_loader import stream_building
+from visualize import build_scene
+
+from conftest import CLASSES, query_pairs
+
+
+@pytest.fixture(scope="module", params=CLASSES)
+def building_json(request, tmp_path_factory):
+    path = tmp_path_factory.mktemp("loaders") / f"{request.param}.json"
+    with open(path, "w", encoding="utf8") as f:
+        build_building(150, 11, request.param).write_json(f)
+    return str(path)
+
+
+def _same_compiled(a, b):
+    assert a.node_ids == b.node_ids
+    assert list(a.node_levels) == list(b.node_levels)
+    assert [x if x == x else None for x in a.node_pos] == [x if x == x else None for x in b.node_pos]
+    for name in ("csr_offsets", "csr_targets", "csr_weights", "csr_flags"):
+        assert list(getattr(a, name)) == list(getattr(b, name)), name
+
+
+def test_json_cache_and_stream_round_trip(building_json):
+    with open(building_json, encoding="utf8") as f:
+        reference = build_graph(json.load(f))
+
+    streamed = stream_building(building_json)
+    _same_compiled(reference, streamed)
+
+    written = load_cached(building_json, compact=True)   # schreibt den Cache
+    assert os.path.exists(cache_path(building_json))
+    cached = load_cached(building_json, compact=True)    # liest ihn (mmap)
+    _same_compiled(reference, written)
+    _same_compiled(reference, cached)
+    assert set(cached.raw_nodes) == set(reference.raw_nodes)
+    assert len(cached.raw_edges) == len(reference.raw_edges)
+
+
+@pytest.mark.parametrize("mode", ["json", "cache", "streaming"])
+def test_searches_agree_across_loaders(building_json, mode):
+    graph, model = load_building(building_json)
+    loaded, loaded_model = load_building(building_json, compact=True, cache=mode == "cache",
+                                         streaming=mode == "streaming")
+    ctx, loaded_ctx = SearchContext(graph.num_nodes()), SearchContext(loaded.num_nodes())
+    for s, t in query_pairs(graph, k=10):
+        expected = astar_search(graph, model, s, t, context=ctx)
+        assert astar_search(loaded, loaded_model, s, t, context=loaded_ctx) == expected
+
+
+def test_compact_search_does_not_build_routing_nodes(building_json):
+    for graph in (load_cached(building_json, compact=True), stream_building(building_json)):
+        model = RoutingModel(graph, floor_transition_penalty=5.0)
+        ctx = SearchContext.for_graph(graph)
+        for s, t in query_pairs(graph, k=5):
+            astar_search(graph, model, s, t, context=ctx)
+            model.heuristic_3d_only(s, t)
+        assert graph._routing_nodes is None
+
+
+META = {"building_name": "empty", "group": "K1", "unit": "meters", "format_version": 1}
+
+
+def test_stream_empty_building(tmp_path):
+    path = tmp_path / "empty.json"
+    data = {"meta": META, "nodes": [], "edges": []}
+    path.write_text(json.dumps(data), encoding="utf8")
+
+    streamed = stream_building(str(path))
+    _same_compiled(build_graph(data, compact=True), streamed)
+    assert streamed.num_nodes() == 0 and list(streamed.csr_offsets) == [0]
+
+
+def test_stream_requires_nodes_before_edges(tmp_path):
+    path = tmp_path / "edges_first.json"
+    path.write_text(json.dumps({"meta": META, "edges": [], "nodes": []}), encoding="utf8")
+    with pytest.raises(ValueError, match="'nodes' must precede 'edges'"):
+        stream_building(str(path))
+
+
+def test_build_scene_does_not_load_raw_nodes(building_json):
+    streamed = stream_building(building_json)
+    scene = build_scene(streamed, labels=False)
+    assert streamed._raw_nodes is None
+
+    # Aufzugskabinen und -türen sind ohne raw_nodes als besondere Knoten markiert
+    raw = streamed.raw_nodes
+    for idx, nid in enumerate(streamed.node_ids):
+        if raw[nid].type.startswith(("stair", "elevator")):
+            assert scene["special"][idx], nid
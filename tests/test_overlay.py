@@ -0,0 +1,149 @@
+import math
+import random
+
+import pytest
+
+from BuildingGraph import EDGE_ACCESSIBLE, EDGE_STAIRS
+from RouteCache import RouteCache
+from RoutingModel import RoutingModel
+from SearchContext import SearchContext
+from layered_a_star_ChatGPT import astar_search, bidirectional_astar_search
+from shortest_paths import dijkstra
+
+from conftest import query_pairs
+
+
+def _elevator_cabin(graph):
+    return next(i for i, nid in enumerate(graph.node_ids) if nid.startswith("elev_"))
+
+
+def _check_optimal(graph, model, pairs):
+    ctx = SearchContext.for_graph(graph)
+    for s, t in pairs:
+        dist, _ = dijkstra(graph, model.weights, s)
+        expected = dist[t] if dist[t] != math.inf else None
+        cost = astar_search(graph, model, s, t, model.bind_alt(s, t), ctx)
+        assert cost == pytest.approx(expected)
+        yield cost, (ctx.path_to(t) if cost is not None else None)
+
+
+@pytest.mark.parametrize("block_first", [True, False])
+def test_blocked_node_carries_over_to_profile(buildings, block_first):
+    graph = buildings["K3"]
+    base = RoutingModel(graph, floor_transition_penalty=5.0)
+    cabin = _elevator_cabin(graph)
+
+    if block_first:
+        base.block_node(cabin)
+        model = base.for_profile("accessible")
+    else:
+        model = base.for_profile("accessible")
+        base.block_node(cabin)
+
+    assert sum(model.blocked_nodes) == 1
+    assert all(math.isinf(model.weights[slot]) for slot in model.g.edge_slots(cabin))
+    for _, path in _check_optimal(model.g, model, query_pairs(graph)):
+        assert path is None or cabin not in path[1:-1]
+
+    base.unblock_node(cabin)
+    assert not any(math.isinf(w) for w in model.weights)
+
+
+def test_accessible_profile_has_no_stairs(buildings):
+    graph = buildings["K3"]  # einzige Klasse mit Treppen
+    view = graph.profile("accessible")
+    stairs = sum(1 for f in graph.csr_flags if f & EDGE_STAIRS)
+    assert stairs and len(view.csr_flags) <= len(graph.csr_flags) - stairs
+    assert len(view.csr_flags) and all(f & EDGE_ACCESSIBLE and not f & EDGE_STAIRS for f in view.csr_flags)
+
+    model = RoutingModel(graph, floor_transition_penalty=5.0).for_profile("accessible")
+    for _, path in _check_optimal(view, model, query_pairs(graph, seed=5)):
+        for a, b in zip(path or [], (path or [])[1:]):
+            assert any(view.csr_targets[slot] == b for slot in view.edge_slots(a))
+
+
+@pytest.mark.parametrize("block_first", [True, False])
+def test_blocked_edge_stays_blocked_in_profile(buildings, block_first):
+    graph = buildings["K3"]
+    base = RoutingModel(graph, floor_transition_penalty=5.0)
+    view = graph.profile("accessible")
+    a = next(i for i in range(view.num_nodes()) if len(view.edge_slots(i)))
+    b = view.csr_targets[view.edge_slots(a)[0]]
+
+    if block_first:
+        base.block_edge(a, b)
+        model = base.for_profile("accessible")
+    else:
+        model = base.for_profile("accessible")
+        base.block_edge(a, b)
+
+    for x, y in ((a, b), (b, a)):
+        slots = [s for s in view.edge_slots(x) if view.csr_targets[s] == y]
+        assert slots and all(model.blocked_edges[s] and math.isinf(model.weights[s]) for s in slots)
+    for _, path in _check_optimal(view, model, query_pairs(graph, seed=6)):
+        assert path is None or {a, b} not in [{x, y} for x, y in zip(path, path[1:])]
+
+    base.unblock_edge(a, b)
+    assert not any(model.blocked_edges)
+
+
+def test_edge_block_and_override_carry_over_to_profile(buildings):
+    graph = buildings["K4"]
+    base = RoutingModel(graph, floor_transition_penalty=5.0)
+    # Zwei Kanten: eine gesperrt, eine verbilligt
+    a = 0
+    b = graph.csr_targets[graph.csr_offsets[a]]
+    c = next(graph.csr_targets[s] for s in graph.edge_slots(b) if graph.csr_targets[s] != a)
+    base.block_edge(a, b)
+    base.set_edge_weight(b, c, 0.5)
+
+    model = base.for_profile("no_elevator")
+    slots = {model.g.csr_targets[s]: s for s in model.g.edge_slots(b)}
+    assert math.isinf(model.weights[slots[a]])
+    assert model.weights[slots[c]] == 0.5
+    assert sum(model.blocked_edges) == 2
+    list(_check_optimal(model.g, model, query_pairs(graph, seed=1)))
+
+
+def test_blocked_path_edge_reroutes_and_invalidates_cache(buildings):
+    graph = buildings["K5"]
+    model = RoutingModel(graph, floor_transition_penalty=5.0)
+    unblocked = list(model.weights)
+    cache = RouteCache(graph, model)
+    ctx = SearchContext.for_graph(graph)
+    s, t = next((s, t) for s, t in query_pairs(graph, k=50)
+                if astar_search(graph, model, s, t, context=ctx) is not None
+                and len(ctx.path_to(t)) > 3)
+    path, cost, _ = cache.route(graph.id(s), graph.id(t))
+    assert cache.route(graph.id(s), graph.id(t))[1] == cost and cache.hits == 1
+
+    # Kante auf dem gecachten Pfad sperren: Eintrag fällt weg, neue Route meidet sie
+    a, b = graph.idx(path[1]), graph.idx(path[2])
+    model.block_edge(a, b)
+    list(_check_optimal(graph, model, [(s, t)] + query_pairs(graph)))
+    new_path, new_cost, _ = cache.route(graph.id(s), graph.id(t))
+    assert cache.invalidations == 1
+    assert new_path is None or (path[1], path[2]) not in zip(new_path, new_path[1:])
+
+    model.unblock_edge(a, b)
+    assert list(model.weights) == unblocked
+    list(_check_optimal(graph, model, query_pairs(graph)))
+
+
+def test_lowered_weights_rebuild_landmarks(buildings):
+    graph = buildings["K3"]
+    model = RoutingModel(graph, floor_transition_penalty=5.0)
+    pairs = query_pairs(graph, k=40, seed=2)
+    list(_check_optimal(graph, model, pairs))  # Landmarks für die Basisgewichte
+
+    rnd = random.Random(4)
+    for _ in range(40):
+        a = rnd.randrange(graph.num_nodes())
+        slots = graph.edge_slots(a)
+        if len(slots):
+            model.set_edge_weight(a, graph.csr_targets[rnd.choice(slots)], 0.01)
+    list(_check_optimal(graph, model, pairs))
+    for s, t in pairs:
+        dist, _ = dijkstra(graph, model.weights, s)
+        cost, _, _ = bidirectional_astar_search(graph, model, s, t)
+        assert cost == pytest.approx(dist[t] if dist[t] != math.inf else None)
@@ -0,0 +1,90 @@
+import math
+
+import pytest
+
+from RouteCache import ENTRY_OVERHEAD_BYTES, BYTES_PER_PATH_NODE, RouteCache
+from RoutingModel import RoutingModel
+from shortest_paths import dijkstra
+
+from conftest import query_pairs
+
+
+def _reachable_pairs(graph, model, k, seed=0):
+    pairs = []
+    for s, t in query_pairs(graph, k=k, seed=seed):
+        dist, _ = dijkstra(graph, model.weights, s)
+        if dist[t] != math.inf and s != t:
+            pairs.append((graph.id(s), graph.id(t), dist[t]))
+    return pairs
+
+
+def test_default_search_is_exact(buildings):
+    graph = buildings["K4"]
+    model = RoutingModel(graph, floor_transition_penalty=5.0)
+    cache = RouteCache(graph, model)
+    for s, t, expected in _reachable_pairs(graph, model, 40):
+        path, cost, _ = cache.route(s, t)
+        assert cost == pytest.approx(expected)
+        assert path[0] == s and path[-1] == t
+
+
+def test_lru_evicts_oldest_entry(buildings):
+    graph = buildings["K3"]
+    model = RoutingModel(graph, floor_transition_penalty=5.0)
+    pairs = _reachable_pairs(graph, model, 20)[:3]
+    cache = RouteCache(graph, model, max_bytes=10 ** 9)
+    sizes = [ENTRY_OVERHEAD_BYTES + BYTES_PER_PATH_NODE * len(cache.route(s, t)[0])
+             for s, t, _ in pairs]
+
+    # Platz für pairs[0] und genau einen weiteren Eintrag
+    cache = RouteCache(graph, model, max_bytes=sizes[0] + max(sizes[1], sizes[2]), subpaths=False)
+    for s, t, _ in pairs[:2]:
+        cache.route(s, t)
+    cache.route(*pairs[0][:2])  # pairs[0] wird zuletzt benutzt
+    cache.route(*pairs[2][:2])
+    assert cache.evictions == 1
+    assert cache.bytes <= cache.max_bytes
+    hits, misses = cache.hits, cache.misses
+    cache.route(*pairs[0][:2])
+    cache.route(*pairs[1][:2])
+    assert (cache.hits, cache.misses) == (hits + 1, misses + 1)
+
+
+def test_subpath_hit_matches_dijkstra(buildings):
+    graph = buildings["K5"]
+    model = RoutingModel(graph, floor_transition_penalty=5.0)
+    probe = RouteCache(graph, model)
+    s, t, _ = max(_reachable_pairs(graph, model, 30), key=lambda p: len(probe.route(p[0], p[1])[0]))
+    cache = RouteCache(graph, model)
+    path, _, _ = cache.route(s, t)
+    a, b = path[1], path[-2]
+
+    sub, cost, _ = cache.route(b, a)
+    assert cache.subpath_hits == 1
+    assert sub == path[1:-1][::-1]
+    dist, _ = dijkstra(graph, model.weights, graph.idx(b))
+    assert cost == pytest.approx(dist[graph.idx(a)])
+
+
+def test_overlay_invalidates_only_affected_entries(buildings):
+    graph = buildings["K5"]
+    model = RoutingModel(graph, floor_transition_penalty=5.0)
+    cache = RouteCache(graph, model, subpaths=False)
+    pairs = _reachable_pairs(graph, model, 30)
+    paths = {(s, t): cache.route(s, t)[0] for s, t, _ in pairs}
+    (s, t), path = next(item for item in paths.items() if len(item[1]) > 2)
+    a, b = path[0], path[1]
+    affected = {key for key, p in paths.items()
+                if any({x, y} == {a, b} for x, y in zip(p, p[1:]))}
+
+    model.block_edge(graph.idx(a), graph.idx(b))
+    assert cache.invalidations == len(affected)
+    assert cache.stats()["entries"] == len(paths) - len(affected)
+    for key in set(paths) - affected:
+        assert key in cache._entries
+
+    # Gesenktes Gewicht: alles verwerfen, neue Kosten exakt
+    model.unblock_edge(graph.idx(a), graph.idx(b))
+    assert cache.stats()["entries"] == 0
+    dist, _ = dijkstra(graph, model.weights, graph.idx(s))
+    assert cache.route(s, t)[1] == pytest.approx(dist[graph.idx(t)])
@@ -0,0 +1,49 @@
+import asyncio
+import math
+import random
+
+import pytest
+
+from RoutingModel import RoutingModel
+from RoutingService import RoutingService
+from generator import build_building
+from graph_cache import load_cached
+from shortest_paths import dijkstra
+
+
+@pytest.fixture(scope="module")
+def buildings_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp("service")
+    with open(path / "K3_s00_i0.json", "w", encoding="utf8") as f:
+        build_building(200, 3, "K3").write_json(f)
+    return path
+
+
+@pytest.mark.parametrize("batch_window", [0.0, 0.05])
+def test_costs_do_not_depend_on_coalescing(buildings_dir, batch_window):
+    graph = load_cached(str(buildings_dir / "K3_s00_i0.json"), compact=True)
+    service = RoutingService(str(buildings_dir), workers=0, batch_window=batch_window)
+    model = RoutingModel(graph, floor_transition_penalty=service.penalty)
+    rnd = random.Random(0)
+    sources = rnd.sample(range(graph.num_nodes()), 3)
+    work = [(rnd.choice(sources), rnd.randrange(graph.num_nodes())) for _ in range(30)]
+
+    async def run():
+        return await asyncio.gather(*(
+            service.handle({"building": "K3_s00_i0", "start": graph.id(s), "goal": graph.id(t)})
+            for s, t in work))
+
+    try:
+        responses = asyncio.run(run())
+    finally:
+        service.close()
+
+    if batch_window:
+        assert max(r["batch"] for r in responses) > 1
+    for (s, t), resp in zip(work, responses):
+        dist, _ = dijkstra(graph, model.weights, s)
+        if dist[t] == math.inf:
+            assert resp["cost"] is None
+        else:
+            assert resp["cost"] == pytest.approx(dist[t])
+            assert resp["path"][0] == graph.id(s) and resp["path"][-1] == graph.id(t)
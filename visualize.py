@@ -1,82 +1,299 @@
-from typing import List, Optional, Set, Tuple
-import matplotlib.pyplot as plt
-
-from BuildingGraph import BuildingGraph
-
-
-def visualize_step(
-    graph: BuildingGraph,
-    open_set: List[Tuple[float, int]],
-    closed_set: Set[int],
-    current_idx: int,
-    start_idx: int,
-    goal_idx: int,
-    step: int,
-    path_indices: Optional[List[int]] = None,
-    output_dir: str = "steps"
-):
-    # Gruppiere Nodes nach Level
-    levels = sorted(set(n.level for n in graph.routing_nodes))
-    fig, axes = plt.subplots(1, len(levels), figsize=(5 * len(levels), 5))
-
-    if len(levels) == 1:
-        axes = [axes]
-
-    open_indices = {idx for _, idx in open_set}
-    path_indices = set(path_indices or [])
-
-    for ax, level in zip(axes, levels):
-        ax.set_title(f"Level {level}")
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import LogNorm, to_rgba
+from matplotlib.transforms import Bbox
+from matplotlib.figure import Figure
+
+from BuildingGraph import EDGE_ELEVATOR, EDGE_LEVEL_CHANGE, EDGE_STAIRS, BuildingGraph
+from SearchInstrumentation import EV_EXPAND, EV_PUSH, TraceRecorder
+
+# --------------------------------------------------------
+# Offline-Rendering von Such-Traces
+#
+# Die Suche zeichnet nur einen TraceRecorder auf; gerendert wird danach:
+# Hintergrund (Kanten, Knoten, Labels) einmal pro Level und Worker, pro
+# Schritt werden nur die Zustandsänderungen der Knoten angewendet.
+# --------------------------------------------------------
+
+DEFAULT, OPEN, CLOSED, CURRENT, PATH = range(5)
+STATE_COLORS = np.array([to_rgba(c) for c in ("white", "gold", "gray", "orange", "green")])
+START_COLOR, GOAL_COLOR, SPECIAL_COLOR = to_rgba("blue"), to_rgba("red"), to_rgba("purple")
+LABEL_LIMIT = 500  # mehr Knoten: keine ID-Labels (automatisch)
+
+Frame = Tuple[np.ndarray, np.ndarray]  # (Knoten, neue Zustände)
+
+
+def build_scene(graph: BuildingGraph, labels: Optional[bool] = None) -> Dict:
+    """Statische, picklbare Zeichendaten pro Level (Positionen, Kanten innerhalb des Levels, Labels)."""
+    n = graph.num_nodes()
+    pos = np.asarray(graph.node_pos, dtype=np.float64).reshape(n, 3)
+    levels = np.asarray(graph.node_levels, dtype=np.int64)
+    offsets = np.asarray(graph.csr_offsets, dtype=np.int64)
+    targets = np.asarray(graph.csr_targets, dtype=np.int64)
+    src = np.repeat(np.arange(n), np.diff(offsets))
+    has_pos = ~np.isnan(pos[:, 0])
+    # Jede Kante einmal, nur innerhalb eines Levels
+    same = (src < targets) & (levels[src] == levels[targets]) & has_pos[src] & has_pos[targets]
+
+    # Treppen/Aufzüge aus den Kanten-Flags (kein Zugriff auf raw_nodes, der
+    # bei kompakten/gestreamten Graphen das JSON nachladen würde): Endpunkte
+    # von Treppen-, Aufzugs- und Etagenwechsel-Kanten, dazu die Nachbarn der
+    # Kabinen (Türen, deren Einstiegskante kein Aufzugs-Flag trägt)
+    flags = np.asarray(graph.csr_flags, dtype=np.uint8)
+    cabin = np.zeros(n, dtype=bool)
+    cabin[src[(flags & EDGE_ELEVATOR) != 0]] = True
+    special = cabin.copy()
+    special[src[(flags & (EDGE_STAIRS | EDGE_LEVEL_CHANGE)) != 0]] = True
+    special[targets[cabin[src]]] = True
+    if labels is None:
+        labels = n <= LABEL_LIMIT
+
+    scene = {"n": n, "special": special, "levels": []}
+    for level in sorted(graph.level_index):
+        on_level = np.flatnonzero((levels == level) & has_pos)
+        edge_mask = same & (levels[src] == level)
+        a, b = src[edge_mask], targets[edge_mask]
+        scene["levels"].append({
+            "level": level,
+            "nodes": on_level,
+            "xy": pos[on_level, :2],
+            "segments": np.stack([pos[a, :2], pos[b, :2]], axis=1),
+            "labels": [graph.id(i) for i in on_level] if labels else None,
+        })
+    return scene
+
+
+def trace_frames(trace: TraceRecorder, path: Optional[Sequence[int]] = None) -> List[Frame]:
+    """
+    Zustandsänderungen pro Schritt: Schritt k = k-te Expansion inkl. der
+    dabei eingefügten Knoten (wie früher on_step nach der Expansion).
+    Mit path folgt ein letzter Schritt, der den Pfad markiert.
+    """
+    frames: List[Frame] = []
+    pending: List[Tuple[int, int]] = []
+    current, started = -1, False
+    for code, idx in zip(trace.codes, trace.nodes):
+        if code == EV_PUSH:
+            pending.append((idx, OPEN))
+        elif code == EV_EXPAND:
+            if started:
+                frames.append(_frame(pending))
+                pending = []
+            if current >= 0:
+                pending.append((current, CLOSED))
+            pending.append((idx, CURRENT))
+            current, started = idx, True
+    if started:
+        frames.append(_frame(pending))
+    if path:
+        frames.append(_frame([(current, CLOSED)] + [(idx, PATH) for idx in path]))
+    return frames
+
+
+def _frame(changes: List[Tuple[int, int]]) -> Frame:
+    nodes = np.fromiter((c[0] for c in changes), dtype=np.int64, count=len(changes))
+    states = np.fromiter((c[1] for c in changes), dtype=np.uint8, count=len(changes))
+    return nodes, states
+
+
+def _apply(state: np.ndarray, frame: Frame):
+    nodes, states = frame
+    # "offen" überschreibt keine geschlossenen / aktuellen Knoten
+    keep = (states != OPEN) | (state[nodes] == DEFAULT)
+    state[nodes[keep]] = states[keep]
+
+
+def _colors(scene: Dict, state: np.ndarray, start_idx: int, goal_idx: int) -> np.ndarray:
+    colors = STATE_COLORS[state]
+    colors[scene["special"] & (state == DEFAULT)] = SPECIAL_COLOR
+    if start_idx >= 0:
+        colors[start_idx] = START_COLOR
+    if goal_idx >= 0:
+        colors[goal_idx] = GOAL_COLOR
+    return colors
+
+
+def _background(scene: Dict, title: str):
+    """Figur mit Kanten und Labels; Rückgabe (Figur, Scatter pro Level)."""
+    n_levels = max(1, len(scene["levels"]))
+    fig = Figure(figsize=(5 * n_levels, 5))
+    axes = fig.subplots(1, n_levels, squeeze=False)[0]
+    scatters, texts = [], []
+    for ax, lvl in zip(axes, scene["levels"]):
+        ax.set_title(f"Level {lvl['level']}")
         ax.set_aspect("equal")
         ax.set_xticks([])
         ax.set_yticks([])
+        ax.add_collection(LineCollection(lvl["segments"], colors="lightgray", zorder=1))
+        scatters.append(ax.scatter(lvl["xy"][:, 0], lvl["xy"][:, 1], s=300 if lvl["labels"] else 20,
+                                   c="white", edgecolors="black", linewidths=0.3, zorder=2))
+        if lvl["labels"]:
+            for (x, y), text in zip(lvl["xy"], lvl["labels"]):
+                texts.append(ax.text(x, y + 0.15, text, ha="center", fontsize=7))
+        ax.autoscale_view()
+    suptitle = fig.suptitle(title)
+    fig.tight_layout()
+    return fig, scatters, texts, suptitle
 
-        # Draw edges (nur innerhalb eines Levels)
-        for idx, node in enumerate(graph.routing_nodes):
-            if node.level != level:
-                continue
-            for edge in graph.neighbors(idx):
-                target = graph.routing_nodes[edge.target]
-                if target.level != level:
-                    continue
-
-                x = [node.pos[0], target.pos[0]]
-                y = [node.pos[1], target.pos[1]]
-                ax.plot(x, y, color="lightgray", zorder=1)
-
-        # Draw nodes
-        for idx, node in enumerate(graph.routing_nodes):
-            if node.level != level or node.pos is None:
-                continue
-
-            color = "white"
-            size = 300
-
-            if idx == start_idx:
-                color = "blue"
-            elif idx == goal_idx:
-                color = "red"
-            elif idx == current_idx:
-                color = "orange"
-            elif idx in path_indices:
-                color = "green"
-            elif idx in closed_set:
-                color = "gray"
-            elif idx in open_indices:
-                color = "gold"
-            elif graph.raw_nodes[graph.id(idx)].type in ("stair", "elevator"):
-                color = "purple"
-
-            ax.scatter(node.pos[0], node.pos[1], s=size, c=color, zorder=2)
-            ax.text(
-                node.pos[0],
-                node.pos[1] + 0.15,
-                graph.id(idx),
-                ha="center",
-                fontsize=7
-            )
-
-    plt.suptitle(f"Layered A* – Schritt {step}")
-    plt.tight_layout()
-    plt.savefig(f"{output_dir}/step_{step:03d}.png")
-    plt.close()
+
+def _render_chunk(scene: Dict, frames: List[Frame], k0: int, k1: int, start_idx: int,
+                  goal_idx: int, output_dir: str) -> List[str]:
+    """Rendert die Schritte k0..k1-1 (läuft in einem Worker)."""
+    state = np.zeros(scene["n"], dtype=np.uint8)
+    for frame in frames[:k0]:
+        _apply(state, frame)
+    fig, scatters, texts, suptitle = _background(scene, "")
+
+    # Hintergrund einmal rastern, danach pro Schritt nur Knoten, Labels und Titel (Blitting)
+    canvas = FigureCanvasAgg(fig)
+    dynamic = scatters + texts + [suptitle]
+    for artist in dynamic:
+        artist.set_visible(False)
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+    for artist in dynamic:
+        artist.set_visible(True)
+    # Ohne Labels nur geänderte Levels neu zeichnen (Marker sind auf ihre Achse begrenzt)
+    node_panel = np.full(scene["n"], -1, dtype=np.int64)
+    for k, lvl in enumerate(scene["levels"]):
+        node_panel[lvl["nodes"]] = k
+    partial_redraw = not texts and len(scatters) > 1
+    title_strip = Bbox.from_extents(0, max(sc.axes.bbox.y1 for sc in scatters), fig.bbox.x1, fig.bbox.y1) \
+        if scatters else fig.bbox
+    title_bg = canvas.copy_from_bbox(title_strip)
+    panel_bg = [canvas.copy_from_bbox(sc.axes.bbox) for sc in scatters]
+
+    paths = []
+    for k in range(k0, k1):
+        _apply(state, frames[k])
+        colors = _colors(scene, state, start_idx, goal_idx)
+        if partial_redraw and k > k0:
+            panels = sorted(set(node_panel[frames[k][0]].tolist()) - {-1})
+            for p in panels:
+                canvas.restore_region(panel_bg[p])
+            canvas.restore_region(title_bg)
+            redraw = [scatters[p] for p in panels] + [suptitle]
+        else:
+            canvas.restore_region(background)
+            redraw = dynamic
+        for sc, lvl in zip(scatters, scene["levels"]):
+            sc.set_facecolors(colors[lvl["nodes"]])
+        suptitle.set_text(f"Layered A* – Schritt {k}")
+        for artist in redraw:
+            fig.draw_artist(artist)
+        path = os.path.join(output_dir, f"step_{k:03d}.png")
+        Image.frombuffer("RGBA", canvas.get_width_height(), canvas.buffer_rgba()).save(path, compress_level=1)
+        paths.append(path)
+    return paths
+
+
+def render_trace(graph: BuildingGraph, trace: TraceRecorder, output_dir: str = "steps",
+                 path: Optional[Sequence[int]] = None, workers: Optional[int] = None,
+                 labels: Optional[bool] = None, video: Optional[str] = None,
+                 fps: int = 5) -> List[str]:
+    """
+    Rendert einen aufgezeichneten Trace als step_XXX.png nach output_dir,
+    verteilt auf workers Prozesse (zusammenhängende Schritt-Bereiche).
+    Mit video (*.gif oder *.mp4) werden die Bilder zusätzlich kodiert.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    scene = build_scene(graph, labels)
+    frames = trace_frames(trace, path)
+    if not frames:
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(frames) // 20))  # kleine Traces: kein Pool
+    bounds = np.linspace(0, len(frames), workers + 1).astype(int)
+    chunks = [(int(k0), int(k1)) for k0, k1 in zip(bounds[:-1], bounds[1:]) if k1 > k0]
+    args = (trace.start_idx, trace.goal_idx, output_dir)
+    if workers == 1:
+        paths = _render_chunk(scene, frames, 0, len(frames), *args)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render_chunk, scene, frames, k0, k1, *args) for k0, k1 in chunks]
+            paths = [p for fut in futures for p in fut.result()]
+
+    if video:
+        encode_frames(paths, video, fps)
+    return paths
+
+
+def encode_frames(paths: Sequence[str], out: str, fps: int = 5):
+    """Kodiert Einzelbilder als GIF (Pillow) oder MP4 (ffmpeg muss installiert sein)."""
+    if out.endswith(".gif"):
+        images = [Image.open(p).convert("RGB") for p in paths]
+        images[0].save(out, save_all=True, append_images=images[1:],
+                       duration=int(1000 / fps), loop=0)
+    elif out.endswith(".mp4"):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("MP4 output requires ffmpeg on PATH (use .gif instead).")
+        proc = subprocess.Popen(
+            [ffmpeg, "-y", "-loglevel", "error", "-f", "image2pipe", "-framerate", str(fps),
+             "-i", "-", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", out],
+            stdin=subprocess.PIPE)
+        for p in paths:
+            with open(p, "rb") as f:
+                proc.stdin.write(f.read())
+        proc.stdin.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed with exit code {proc.returncode}.")
+    else:
+        raise ValueError(f"Unsupported video format: {out} (expected .gif or .mp4).")
+
+
+# --------------------------------------------------------
+# Heatmap über viele Anfragen
+# --------------------------------------------------------
+
+def expansion_counts(traces: Sequence[TraceRecorder], n_nodes: int) -> np.ndarray:
+    """Expansionen pro Knoten, summiert über mehrere Traces."""
+    counts = np.zeros(n_nodes, dtype=np.int64)
+    for trace in traces:
+        codes = np.frombuffer(trace.codes, dtype=np.uint8)
+        nodes = np.frombuffer(trace.nodes, dtype=np.dtype(trace.nodes.typecode))
+        counts += np.bincount(nodes[codes == EV_EXPAND], minlength=n_nodes)
+    return counts
+
+
+def render_heatmap(graph: BuildingGraph, counts: Sequence[int], out: str = "search_heatmap.png",
+                   title: str = "Expansionen pro Knoten") -> str:
+    """
+    Eine Abbildung für viele Anfragen: Knoten pro Level nach Anzahl der
+    Expansionen eingefärbt (logarithmisch), z.B. aus ExpansionCounter.counts.
+    """
+    scene = build_scene(graph, labels=False)
+    counts = np.asarray(counts, dtype=np.float64)
+    vmax = max(1.0, counts.max(initial=0.0))
+    norm = LogNorm(vmin=1, vmax=vmax)
+
+    n_levels = max(1, len(scene["levels"]))
+    fig = Figure(figsize=(5 * n_levels, 5))
+    axes = fig.subplots(1, n_levels, squeeze=False)[0]
+    mappable = None
+    for ax, lvl in zip(axes, scene["levels"]):
+        ax.set_title(f"Level {lvl['level']}")
+        ax.set_aspect("equal")
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.add_collection(LineCollection(lvl["segments"], colors="lightgray", linewidths=0.5, zorder=1))
+        c = counts[lvl["nodes"]]
+        hit = c > 0
+        ax.scatter(lvl["xy"][~hit, 0], lvl["xy"][~hit, 1], s=6, c="lightgray", zorder=2)
+        mappable = ax.scatter(lvl["xy"][hit, 0], lvl["xy"][hit, 1], s=12, c=c[hit],
+                              cmap="inferno_r", norm=norm, zorder=3)
+        ax.autoscale_view()
+    if mappable is not None:
+        fig.colorbar(mappable, ax=list(axes), label="Expansionen")
+    fig.suptitle(title)
+    fig.savefig(out, dpi=200)
+    return out